@@ -5,61 +5,129 @@ The following URLs are served:
 
 "/" : just a message hinting to API
 "/next_move" : to compute a next move in the game
+"/next_moves" : to compute the next moves of a batch of game-states
+"/metrics" : the metrics of the app in the Prometheus text format, see module utils.metrics
+
+The module asgi_app serves the same URLs on an asyncio server.
 """
 # todo: distinguish row index (starts at 0) and row number (starts at 1)
 
 
 import json
+import time
 
-from flask import Flask, render_template
+from flask import Flask, Response, g, render_template, request
 # from flask_talisman import Talisman
 
 import logging
-from utils import mylogconfig
+from utils import mylogconfig, metrics
 
-from models import solver, game_states
+from models import solver, game_states, tree_files, rulesets, batches, responses, canonical_tables, \
+    tree_registry
 from models.game_states import GameState  # , GameMove
 from models.game_trees import set_current_tree
 
 app = Flask(__name__)
 # Talisman(app)
 
+logger = logging.getLogger(__name__)
+# The logger of the requests, it is sampled, see utils.mylogconfig.queued.
+
+REQUESTS = metrics.Counter("matchtaker_requests_total", "Number of requests by route and status.", ["route", "status"])
+REQUEST_SECONDS = metrics.Histogram("matchtaker_request_seconds", "Duration of requests by route.", ["route"])
+
+
+def record_request(route: str or None, status: int, seconds: float) -> None:
+    """Record a request in the metrics, route is the endpoint or None if no route matched."""
+    route = route or "none"
+    REQUESTS.inc(route, str(status))
+    REQUEST_SECONDS.observe(seconds, route)
+
+
+@app.before_request
+def start_request():
+    g.start = time.perf_counter()
+
+
+@app.after_request
+def end_request(response: Response) -> Response:
+    record_request(request.endpoint, response.status_code, time.perf_counter() - g.start)
+    return response
+
 
 @app.route('/')
 def home_page():
     """Home page."""
-    logging.info("home_page")
+    logger.info("home_page")
     return render_template('home.html')
 
 
 @app.route('/rules')
 def rules_page():
     """rules page."""
-    logging.info("rules_page")
+    logger.info("rules_page")
     return render_template('rules.html')
 
 
 @app.route('/settings')
 def settings_page():
     """settings page."""
-    logging.info("settings_page")
+    logger.info("settings_page")
     return render_template('settings.html')
 
 
 @app.route('/about')
 def about_page():
     """about page."""
-    logging.info("about_page")
+    logger.info("about_page")
     return render_template('about.html')
 
 
 @app.route('/email')
 def email_page():
     """email page."""
-    logging.info("email_page")
+    logger.info("email_page")
     return render_template('email.html')
 
 
+LOG_SAMPLING_RATE = 0.01
+# The fraction of the requests logged on level info, see mylogconfig.SamplingFilter.
+
+
+@app.route('/metrics')
+def metrics_page():
+    """The metrics of all processes of the app, see module utils.metrics."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+def to_numbers(text: str) -> list:
+    """Convert a sequence of digits or a comma separated sequence of numbers to a list of integers.
+    Items that are not numbers are converted to None.
+    """
+    items = text.split(',') if ',' in text else list(text)
+    return [int(item) if item.isdecimal() else None for item in items]
+
+
+def ruleset_and_root(args) -> (rulesets.Ruleset, GameState or None):
+    """Return the ruleset and the root selected by the query parameters caps, take and root, see next_move.
+    :raise: rulesets.Error or game_states.Error, if the parameters are invalid or the ruleset is too big.
+    """
+    ruleset = rulesets.STANDARD
+    if 'caps' in args or 'take' in args:
+        caps = to_numbers(args.get('caps', '12345'))
+        take = to_numbers(args.get('take', '3'))
+        rulesets.Error.check(len(caps) > 0 and len(take) == 1, "caps and take must be numbers")
+        ruleset = rulesets.Ruleset(caps, take[0])
+        rulesets.Error.check(canonical_tables.raw_state_count(ruleset) <= tree_registry.MAX_RAW_STATES,
+                             f"the ruleset must have at most {tree_registry.MAX_RAW_STATES} game-states")
+    root = None
+    if 'root' in args:
+        root_rows = to_numbers(args['root'])
+        game_states.Error.check(None not in root_rows, "root must contain numbers")
+        root = GameState(root_rows, ruleset).normalized()[0]
+    return ruleset, root
+
+
 @app.route('/next_move', defaults={'rows_state': '12345', 'level': 0})
 @app.route('/next_move/<rows_state>', defaults={'level': 0})
 @app.route('/next_move/<rows_state>/<int:level>')
@@ -69,21 +137,31 @@ def next_move(rows_state, level):
     Method: GET
 
     Request:
-    /next_move [/<rows_state> [/<level>] ]
+    /next_move [/<rows_state> [/<level>] ] [?caps=<row_caps>&take=<max_take>] [&root=<root_state>]
     Examples:
         /next_move
         /next_move/10340
         /next_move/10340/2
+        /next_move/1,0,3,4,0,6,7,8/1?caps=1,2,3,4,5,6,7,8&take=4
     <rows_state> is a sequence of digits of 0..5.
     Digit at index k must be <= k+1 (where first index is k=0).
     <level> is integer in 0..2
+    The query parameters select another ruleset than the standard one, see module rulesets:
+    <row_caps> are the row capacities, <max_take> is the max number of matches taken by a move (default 3).
+    Both are written like <rows_state>. Then <rows_state> must be valid for this ruleset,
+    it may also be a comma separated sequence of numbers.
+    The query parameter root selects the starting position of the game for level 2, <rows_state> must be
+    reachable from it. By default, the game starts with full rows.
+
+    Requests of the standard game without query parameters are answered with precomputed responses,
+    see module responses.
 
     Response: see also doc of return value of solver.solve.
         One of the 3 json strings:
         1. {“gameContinues“:-1}
            Meaning: "You won".
         2. {“gameContinues“:c, "rowIndex":i, "numberOfMatches":n}
-           where c in 0..3, i in 0..4, n in 1..3.
+           where c in 0..3, i in 0..4, n in 1..3 (for the standard ruleset).
            Meaning:
              The move of the app is taking n matches from the row with index i.
              c == 0: "the App won". There is only 1 match left.
@@ -95,34 +173,101 @@ def next_move(rows_state, level):
            Meaning:
            A software error occurred while the app executed the request.
     """
+    return compute_next_move(rows_state, level, request.args)
+
+
+def compute_next_move(rows_state: str, level: int, args) -> str or bytes:
+    """Return the response of /next_move, see next_move.
+    :param args: the query parameters, a MultiDict as request.args.
+    """
+    if not args and _response_table is not None:
+        response = _response_table.lookup(rows_state, level)
+        if response is not None:
+            logger.info("next_move, rows %s, level %s, precomputed", rows_state, level)
+            return response
     result = {}
     try:
         # log
-        logging.info(f"next_move, rows {rows_state}, level {level}")
+        logger.info("next_move, rows %s, level %s", rows_state, level)
         # check and convert input
-        rows = list(rows_state)
-        game_states.Error.check(all([('0' <= rows[k] <= '5') for k in range(len(rows))]),
-                                "rows_state must contain digits in 0..5")
-        rows = [int(rows[k]) for k in range(len(rows))]
-        game_state = GameState(rows)
+        ruleset, root = ruleset_and_root(args)
+        top = ruleset.row_caps[-1]
+        rows = to_numbers(rows_state)
+        game_states.Error.check(all([rows[k] is not None and rows[k] <= top for k in range(len(rows))]),
+                                f"rows_state must contain digits in 0..{top}")
+        game_state = GameState(rows, ruleset)
         # compute next move
-        game_move, game_continues = solver.solve(game_state, level)
+        game_move, game_continues = solver.solve(game_state, level, root)
         # compose result
         result["gameContinues"] = game_continues
         if game_continues >= 0:
             result["rowIndex"] = game_move.row_index
             result["numberOfMatches"] = game_move.match_count
-    except (solver.Error, game_states.Error) as e:
+    except (solver.Error, game_states.Error, rulesets.Error) as e:
+        solver.count_error(e)
         result["error"] = str(e)
     finally:
         pass  # no return here, see PEP 601
     # return result
-    logging.info(f"next_move, result {result}")
+    logger.info("next_move, result %s", result)
     return json.dumps(result)
 
 
-mylogconfig.simplest()
-set_current_tree(GameState([1, 2, 3, 4, 5]))
+@app.route('/next_moves', methods=['POST'])
+def next_moves():
+    """Compute the next moves of a batch of game-states, see module batches.
+
+    Method: POST
+
+    Request:
+    /next_moves [?caps=<row_caps>&take=<max_take>] [&root=<root_state>]
+    The query parameters are the same as for /next_move, they apply to all game-states of the batch.
+    The body is either
+        JSON (content type application/json): an array of items {"rows": <rows_state>, "level": <level>},
+            where <rows_state> is written as for /next_move or is an array of numbers, <level> defaults to 0.
+            Example: [{"rows": "10340", "level": 2}, {"rows": [1, 2, 3, 4, 5]}]
+        or binary (content type application/octet-stream): records of the rows and the level, see module batches.
+
+    Response:
+        JSON: an array with 1 result per item, in the same order. Each result is as returned by /next_move.
+        binary: 1 result record per record of the request, in the same order, see module batches.
+        If the whole batch is invalid, e.g. too big, the response is the json string {"error" : message}.
+    """
+    return compute_next_moves(request.args, request.mimetype, request.get_data())
+
+
+def compute_next_moves(args, mimetype: str, body: bytes) -> str or Response:
+    """Return the response of /next_moves, see next_moves.
+    :param args: the query parameters, a MultiDict as request.args.
+    :param mimetype: the content type of the request, without parameters.
+    """
+    try:
+        ruleset, root = ruleset_and_root(args)
+        if mimetype == 'application/octet-stream':
+            logger.info("next_moves, %d bytes", len(body))
+            return Response(batches.solve_binary(body, ruleset, root), mimetype='application/octet-stream')
+        try:
+            items = json.loads(body)
+        except ValueError:
+            items = None
+        batches.Error.check(isinstance(items, list) and all([isinstance(item, dict) for item in items]),
+                            "the body must be a json array of objects")
+        logger.info("next_moves, %d items", len(items))
+        rows_and_levels = []
+        for item in items:
+            rows = item.get('rows')
+            rows_and_levels.append((to_numbers(rows) if isinstance(rows, str) else rows, item.get('level', 0)))
+        return json.dumps(batches.solve_items(rows_and_levels, ruleset, root))
+    except (batches.Error, game_states.Error, rulesets.Error) as e:
+        solver.count_error(e)
+        return json.dumps({"error": str(e)})
+
+
+mylogconfig.queued(level=logging.INFO, sampling={__name__: LOG_SAMPLING_RATE})
+metrics.share()  # before gunicorn --preload forks the workers
+set_current_tree(GameState([1, 2, 3, 4, 5]), filename=tree_files.DEFAULT_FILENAME, shared=True)
+_response_table: responses.ResponseTable or None = responses.ResponseTable(rulesets.STANDARD)
+# The precomputed responses of /next_move, None to compute all responses, see module responses.
 
 if __name__ == '__main__':
     app.run()
@@ -0,0 +1,143 @@
+"""ASGI variant of matchTaker app, see module app.
+
+The same URLs are served with the same responses, but on an asyncio server, e.g.
+    uvicorn asgi_app:app --workers 4
+uvicorn uses httptools and uvloop if they are installed, which is much faster than its pure Python defaults.
+This module imports app, thus both share
+    the solved tree, see models.game_trees.set_current_tree, and the precomputed responses of /next_move,
+    the computation of /next_move and /next_moves, see app.compute_next_move and app.compute_next_moves,
+    the routing: URLs are matched by the url map of the Flask app, so redirects and errors are the same,
+    the metrics, see app.record_request.
+The pages do not depend on the request, they are rendered once at startup.
+All handlers are pure in-memory work, thus they run directly in the event loop. Static files are read once and
+then served from memory, without the caching headers of Flask.
+"""
+
+from typing import Dict, List, Tuple  # for type annotations
+
+import mimetypes
+import time
+
+from flask import render_template
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException, NotFound
+from werkzeug.security import safe_join
+from werkzeug.urls import url_decode
+from werkzeug.utils import get_content_type
+from werkzeug.wrappers import Response
+
+import app as flask_app
+
+Headers = List[Tuple[bytes, bytes]]
+# The headers of an ASGI message.
+
+HTML = get_content_type('text/html', 'utf-8').encode()
+# The content type of the pages and of the json strings returned by the Flask app.
+
+PAGES = {'home_page': 'home.html', 'rules_page': 'rules.html', 'settings_page': 'settings.html',
+         'about_page': 'about.html', 'email_page': 'email.html'}
+# The templates of the pages by endpoint, see app.
+
+with flask_app.app.test_request_context():
+    _pages: Dict[str, bytes] = {endpoint: render_template(template).encode() for endpoint, template in PAGES.items()}
+    # The rendered pages by endpoint.
+
+_static_files: Dict[str, Tuple[bytes, bytes]] = {}
+# The content type and content of the static files by filename. Misses are not cached, since any filename can be
+# requested, thus the size is limited by the static folder.
+
+
+def static_file(filename: str) -> Tuple[bytes, bytes] or None:
+    """Return the content type and the content of a static file, None if there is no such file."""
+    result = _static_files.get(filename)
+    if result is None:
+        path = safe_join(flask_app.app.static_folder, filename)
+        try:
+            with open(path, 'rb') as file:
+                content = file.read()
+        except (TypeError, OSError):  # path is None or not a file
+            return None
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        result = _static_files[filename] = (get_content_type(mimetype, 'utf-8').encode(), content)
+    return result
+
+
+def dispatch(endpoint: str, values: dict, args: MultiDict, content_type: str, body: bytes) \
+        -> Tuple[int, Headers, bytes]:
+    """Compute the response of the endpoint of the Flask app.
+    :return: status, headers without content length, content.
+    """
+    if endpoint == 'next_move':
+        result = flask_app.compute_next_move(values['rows_state'], values['level'], args)
+    elif endpoint == 'next_moves':
+        result = flask_app.compute_next_moves(args, content_type.split(';')[0].strip().lower(), body)
+    elif endpoint == 'metrics_page':
+        result = flask_app.metrics_page()
+    elif endpoint in _pages:
+        flask_app.logger.info(endpoint)
+        result = _pages[endpoint]
+    elif endpoint == 'static':
+        result = static_file(values['filename'])
+        if result is None:
+            return from_response(NotFound().get_response())
+        return 200, [(b'content-type', result[0])], result[1]
+    else:
+        return from_response(NotFound().get_response())
+    if isinstance(result, Response):
+        return from_response(result)
+    return 200, [(b'content-type', HTML)], result if isinstance(result, bytes) else result.encode()
+
+
+def from_response(response: Response) -> Tuple[int, Headers, bytes]:
+    """Convert a werkzeug response, e.g. of a redirect or an error, see dispatch."""
+    headers = [(key.lower().encode('latin-1'), value.encode('latin-1')) for key, value in response.headers
+               if key.lower() != 'content-length']
+    return response.status_code, headers, response.get_data()
+
+
+async def read_body(receive) -> bytes:
+    """Return the body of the request."""
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        more_body = message.get('more_body', False)
+    return b''.join(chunks)
+
+
+async def app(scope, receive, send):
+    """The ASGI application."""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    assert scope['type'] == 'http'
+    headers = dict(scope['headers'])
+    query_string = scope['query_string'].decode('latin-1')
+    server_name = headers.get(b'host', b'localhost').decode('latin-1')
+    adapter = flask_app.app.url_map.bind(server_name, script_name=scope.get('root_path') or '/',
+                                         url_scheme=scope.get('scheme', 'http'), query_args=query_string)
+    method = scope['method']
+    start = time.perf_counter()
+    endpoint = None
+    try:
+        endpoint, values = adapter.match(scope['path'], method)
+        if method == 'OPTIONS':  # as the automatic options of Flask
+            response = flask_app.app.response_class()
+            response.allow.update(adapter.allowed_methods())
+            status, response_headers, content = from_response(response)
+        else:
+            body = await read_body(receive) if method == 'POST' else b''
+            status, response_headers, content = dispatch(endpoint, values, url_decode(query_string),
+                                                         headers.get(b'content-type', b'').decode('latin-1'), body)
+    except HTTPException as e:  # redirects and errors of routing
+        status, response_headers, content = from_response(e.get_response())
+    flask_app.record_request(endpoint, status, time.perf_counter() - start)
+    response_headers.append((b'content-length', str(len(content)).encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+    await send({'type': 'http.response.body', 'body': content if method != 'HEAD' else b''})
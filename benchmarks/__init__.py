@@ -0,0 +1,8 @@
+"""Package for benchmarks.
+
+To start a benchmark bench_xxx.py from the command line:
+    1. The current dir must be the project dir
+    2. The environment variable PYTHONPATH must contain the working dir
+    3. $ python benchmarks/bench_xxx.py
+The suite of microbenchmarks with baselines is started the same way, see benchmarks/suite.py.
+"""
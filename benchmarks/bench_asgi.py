@@ -0,0 +1,95 @@
+"""Benchmark of the Flask app behind gunicorn sync workers versus the ASGI app behind uvicorn, at high concurrency.
+
+Both servers are started as subprocesses with the same number of workers. The client keeps `concurrency` requests
+of /next_move in flight, each on a new connection (gunicorn sync workers do not keep connections alive), and
+reports requests per second and latency percentiles. The client runs on the same machine, it competes with the
+servers for the CPU.
+
+Usage: PYTHONPATH=. python benchmarks/bench_asgi.py [concurrency] [requests] [workers]
+"""
+
+import asyncio
+import itertools
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+SERVERS = [
+    ('flask/gunicorn', ['gunicorn', '--preload', '--workers', '{workers}', '--bind', '127.0.0.1:{port}', 'app:app']),
+    ('asgi/uvicorn', ['uvicorn', '--workers', '{workers}', '--port', '{port}', '--no-access-log', 'asgi_app:app']),
+]
+# The servers by name, with their command lines.
+
+ROWS_STATES = ["".join([str(x) for x in rows]) for rows in itertools.product(*[range(k + 2) for k in range(5)])
+               if sum(rows) > 0 and rows != (1, 2, 3, 4, 5)]
+# All rows_states of the standard game, except the default one, which is redirected.
+
+URLS = [f"/next_move/{rows_state}{level}" for rows_state in ROWS_STATES for level in ['', '/1', '/2']]
+# The requests: all rows_states with all levels, level 0 is the default and is redirected if given.
+
+
+def wait_for(port: int, timeout: float = 60.0) -> None:
+    """Wait until the server accepts connections."""
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"server on port {port} did not start")
+
+
+async def get(port: int, url: str) -> float:
+    """Send a request and read the whole response, return the latency in seconds."""
+    t = time.perf_counter()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {url} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    assert response.startswith(b'HTTP/1.1 200'), response[:100]
+    return time.perf_counter() - t
+
+
+async def load(port: int, concurrency: int, requests: int) -> (float, list):
+    """Send requests with concurrency requests in flight, return the seconds used and the latencies."""
+    latencies = []
+    counter = itertools.count()
+
+    async def client():
+        k = next(counter)
+        while k < requests:
+            latencies.append(await get(port, URLS[k % len(URLS)]))
+            k = next(counter)
+
+    t = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return time.perf_counter() - t, sorted(latencies)
+
+
+def main(concurrency=256, requests=5000, workers=2, port=8765):
+    print(f"concurrency {concurrency}, requests {requests}, workers {workers}, cpus {os.cpu_count()}")
+    print(f"{'server':<16}{'requests/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, command in SERVERS:
+        command = [arg.format(workers=workers, port=port) for arg in command]
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                   start_new_session=True)
+        try:
+            wait_for(port)
+            asyncio.run(load(port, concurrency, min(requests, 200)))  # warm up
+            seconds, latencies = asyncio.run(load(port, concurrency, requests))
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[len(latencies) * 99 // 100] * 1000
+            print(f"{name:<16}{requests / seconds:>12.0f}{p50:>10.1f}{p99:>10.1f}")
+        finally:
+            os.killpg(process.pid, signal.SIGTERM)  # the server and its workers
+            process.wait()
+        port += 1
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
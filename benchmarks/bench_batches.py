@@ -0,0 +1,41 @@
+"""Benchmark of the throughput of /next_move versus the batch endpoint /next_moves, in positions per second.
+The requests are sent with the Flask test client, i.e. without network.
+"""
+
+import itertools
+import json
+import logging
+import time
+
+from app import app
+from models import batches
+
+POSITIONS = [list(rows) for rows in itertools.product(*[range(k + 2) for k in range(5)]) if sum(rows) > 0]
+# All positions of the standard game.
+
+
+def main(level=2):
+    logging.getLogger().setLevel(logging.WARNING)  # app logs every request on level info
+    client = app.test_client()
+    print(f"{'endpoint':<24}{'positions':>10}{'positions/s':>14}")
+    t = time.perf_counter()
+    for rows in POSITIONS:
+        client.get(f"/next_move/{''.join([str(x) for x in rows])}/{level}")
+    t = time.perf_counter() - t
+    print(f"{'/next_move':<24}{len(POSITIONS):>10}{len(POSITIONS) / t:>14.0f}")
+    body = json.dumps([{"rows": rows, "level": level} for rows in POSITIONS])
+    t = time.perf_counter()
+    response = client.post("/next_moves", data=body, content_type='application/json')
+    t = time.perf_counter() - t
+    assert len(json.loads(response.data)) == len(POSITIONS)
+    print(f"{'/next_moves json':<24}{len(POSITIONS):>10}{len(POSITIONS) / t:>14.0f}")
+    body = b''.join([bytes(rows + [level]) for rows in POSITIONS])
+    t = time.perf_counter()
+    response = client.post("/next_moves", data=body, content_type='application/octet-stream')
+    t = time.perf_counter() - t
+    assert len(response.data) == len(POSITIONS) * batches.RESULT.size
+    print(f"{'/next_moves binary':<24}{len(POSITIONS):>10}{len(POSITIONS) / t:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
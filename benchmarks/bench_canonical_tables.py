@@ -0,0 +1,26 @@
+"""Benchmark of canonicalizing the raw game-states of the standard game: sorting versus table lookup."""
+
+import itertools
+import timeit
+
+from models.game_states import GameState
+from models import canonical_tables
+
+
+def main(number=10):
+    game_states = [GameState(list(rows)) for rows in itertools.product(*[range(k + 2) for k in range(5)])
+                   if sum(rows) > 0]
+    t = timeit.default_timer()
+    table = canonical_tables.get_table(game_states[0].ruleset)
+    t_build = timeit.default_timer() - t
+    t_sort = min(timeit.repeat(lambda: [game_state.normalized() for game_state in game_states],
+                               number=number, repeat=3)) / number / len(game_states)
+    t_lookup = min(timeit.repeat(lambda: [canonical_tables.canonicalize(game_state) for game_state in game_states],
+                                 number=number, repeat=3)) / number / len(game_states)
+    print(f"table of {table.size} states built in {t_build * 1000:.1f} ms")
+    print(f"{'normalized us':>16}{'canonicalize us':>18}{'speedup':>10}")
+    print(f"{t_sort * 1e6:>16.2f}{t_lookup * 1e6:>18.3f}{t_sort / t_lookup:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+"""Benchmark comparing the memory of a GameTree and a CompactTree."""
+
+import tracemalloc
+
+from models.game_states import GameState
+from models.game_trees import GameTree
+from models.compact_trees import CompactTree
+
+
+def traced_size(make):
+    """Return the result of make() and the number of bytes allocated by it that are still alive."""
+    tracemalloc.start()
+    result = make()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    print(f"{'root':<10}{'nodes':>8}{'GameTree B/node':>18}{'CompactTree B/node':>20}")
+    for rows in [[0, 0, 1, 2, 3], [0, 1, 2, 3, 4], [1, 2, 3, 4, 5]]:
+        tree, tree_size = traced_size(lambda: GameTree(GameState(rows), iterative=True))
+        compact_tree, compact_size = traced_size(lambda: CompactTree(tree))
+        n = tree.node_count
+        print(f"{str(GameState(rows)):<10}{n:>8}{tree_size / n:>18.1f}{compact_size / n:>20.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark comparing the hash indexed GameLayer with the former bisect based layer."""
+
+import bisect
+import random
+import timeit
+
+from models.game_states import GameState
+from models.game_trees import GameNode, GameLayer, GameTree
+
+
+class BisectLayer:
+    """The former implementation of GameLayer: a sorted list, maintained with bisect."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.nodes = []
+
+    def insert(self, node: GameNode) -> None:
+        bisect.insort_left(self.nodes, node)
+
+    def find(self, game_state: GameState) -> GameNode or None:
+        test_node = GameNode(game_state)
+        i = bisect.bisect_left(self.nodes, test_node)
+        if i < len(self.nodes) and self.nodes[i] == test_node:
+            return self.nodes[i]
+        else:
+            return None
+
+
+def build(layer_class, node_lists):
+    """Insert the nodes of node_lists[n] into a new layer n of layer_class, return the new layers."""
+    new_layers = [layer_class(n) for n in range(len(node_lists))]
+    for nodes, new_layer in zip(node_lists, new_layers):
+        for node in nodes:
+            new_layer.insert(node)
+    return new_layers
+
+
+def lookup(new_layers, states):
+    """Find all states in new_layers."""
+    for game_state in states:
+        assert new_layers[game_state.get_total_count()].find(game_state) is not None
+
+
+def main(number=20):
+    tree = GameTree(GameState([1, 2, 3, 4, 5]), iterative=True)
+    rand = random.Random(1)
+    node_lists = [rand.sample(layer.nodes, len(layer.nodes)) for layer in tree.layers]  # unordered inserts
+    states = [node.game_state for layer in tree.layers for node in layer.nodes] * 10
+    print(f"{'layer':<10}{'build us':>12}{'lookup us':>12}")
+    for layer_class in [BisectLayer, GameLayer]:
+        t_build = min(timeit.repeat(lambda: build(layer_class, node_lists), number=number, repeat=3)) / number
+        new_layers = build(layer_class, node_lists)
+        t_find = min(timeit.repeat(lambda: lookup(new_layers, states), number=number, repeat=3)) / number
+        print(f"{layer_class.__name__:<10}{t_build * 1e6:>12.1f}{t_find * 1e6:>12.1f}")
+    print(f"nodes: {tree.node_count}, lookups: {len(states)}")
+
+
+if __name__ == '__main__':
+    main()
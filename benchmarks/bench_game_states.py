@@ -0,0 +1,49 @@
+"""Benchmark of game-state operations and of the allocations of a full tree build."""
+
+import sys
+import timeit
+import tracemalloc
+
+from models.rulesets import Ruleset
+from models.game_states import GameState, GameMove
+from models.game_trees import GameTree
+
+RULESETS = [Ruleset.triangle(5, 3), Ruleset.triangle(7, 4)]
+
+
+def allocations(function) -> (int, int):
+    """Return the number of memory blocks held by the result of function and the peak of the traced memory."""
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    result = function()  # keep the result alive while counting
+    count = sys.getallocatedblocks() - blocks
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return count, peak
+
+
+def main(number=100000):
+    game_state = GameState([1, 2, 3, 4, 5])
+    game_move = GameMove(3, 2)
+    print(f"{'operation':<36}{'us':>10}")
+    for name, function in [('GameState(rows)', lambda: GameState([1, 2, 3, 4, 5])),
+                           ('GameState.from_key(key)', lambda: GameState.from_key((1, 2, 3, 4, 5))),
+                           ('make_move', lambda: game_state.make_move(game_move)),
+                           ('normalized_successors', lambda: game_state.normalized_successors()),
+                           ('hash', lambda: hash(game_state)),
+                           ('==', lambda: game_state == game_state.make_move(game_move))]:
+        t = min(timeit.repeat(function, number=number, repeat=3)) / number
+        print(f"{name:<36}{t * 1e6:>10.3f}")
+    print()
+    print(f"{'ruleset':<36}{'nodes':>8}{'build ms':>10}{'live blocks':>14}{'peak MB':>10}")
+    for ruleset in RULESETS:
+        root = GameState(list(ruleset.row_caps), ruleset)
+        tree = GameTree(root)
+        t = min(timeit.repeat(lambda: GameTree(root), number=3, repeat=3)) / 3
+        blocks, peak = allocations(lambda: GameTree(root))
+        print(f"{repr(ruleset):<36}{tree.node_count:>8}{t * 1000:>10.1f}{blocks:>14}{peak / 1e6:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+"""Benchmark comparing the recursive and the iterative construction of game trees."""
+
+import timeit
+
+from models.game_states import GameState
+from models.game_trees import GameTree
+
+ROOTS = [[0, 0, 1, 2, 3], [0, 1, 2, 3, 4], [1, 1, 3, 4, 5], [1, 2, 3, 4, 5]]
+
+
+def main(number=5):
+    print(f"{'root':<12}{'nodes':>8}{'recursive ms':>16}{'iterative ms':>16}{'speedup':>10}")
+    for rows in ROOTS:
+        root = GameState(rows)
+        node_count = GameTree(root).node_count
+        t_rec = min(timeit.repeat(lambda: GameTree(root), number=number, repeat=3)) / number
+        t_it = min(timeit.repeat(lambda: GameTree(root, iterative=True), number=number, repeat=3)) / number
+        print(f"{str(root):<12}{node_count:>8}{t_rec * 1000:>16.2f}{t_it * 1000:>16.2f}{t_rec / t_it:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark of the cost of a log call of the request path, in microseconds per call.
+Compares the handlers of standard_rot called synchronously, the queued handlers and the queued handlers with
+sampling, see utils.mylogconfig. The records are written to a temporary directory.
+caller: time in the logging thread, total: including the time until the listener has written all records.
+On a single CPU, the listener thread competes with the logging thread, thus total is the relevant number there.
+"""
+
+import logging
+import os
+import queue
+import tempfile
+import time
+from logging import handlers
+
+from utils import mylogconfig
+
+
+def measure(log: logging.Logger, n: int) -> float:
+    t = time.perf_counter()
+    for k in range(n):
+        log.info("next_move, rows %s, level %s", "10340", k % 3)
+    return (time.perf_counter() - t) / n * 1e6
+
+
+def main(n=20000):
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'config':<20}{'caller us':>10}{'total us':>10}")
+        for name, rate, use_queue in [('sync', None, False), ('queued', None, True), ('queued 1%', 0.01, True)]:
+            log = logging.getLogger(f"bench.{name}")
+            log.propagate = False
+            log.setLevel(logging.INFO)
+            rot_handlers = mylogconfig.rot_handlers(os.path.join(directory, f"{name}.txt"), logging.INFO,
+                                                    max_bytes=1024 * 1024)
+            listener = None
+            if use_queue:
+                record_queue = queue.SimpleQueue()
+                log.addHandler(mylogconfig.DeferringQueueHandler(record_queue))
+                listener = handlers.QueueListener(record_queue, *rot_handlers, respect_handler_level=True)
+                listener.start()
+            else:
+                for handler in rot_handlers:
+                    log.addHandler(handler)
+            if rate is not None:
+                log.addFilter(mylogconfig.SamplingFilter(rate))
+            t = time.perf_counter()
+            caller = measure(log, n)
+            if listener is not None:
+                listener.stop()
+            total = (time.perf_counter() - t) / n * 1e6
+            print(f"{name:<20}{caller:>10.2f}{total:>10.2f}")
+            for handler in rot_handlers:
+                handler.close()
+
+
+if __name__ == '__main__':
+    main()
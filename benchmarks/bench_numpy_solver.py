@@ -0,0 +1,34 @@
+"""Benchmark of solving a game with GameTree (iterative) and with NumpyTree: build time and speedup."""
+
+import sys
+import time
+
+from models.rulesets import Ruleset
+from models.game_states import GameState
+from models.game_trees import GameTree
+from models.numpy_solver import NumpyTree
+
+RULESETS = [Ruleset.triangle(5, 3), Ruleset.triangle(6, 3), Ruleset.triangle(7, 4), Ruleset.triangle(8, 4),
+            Ruleset.triangle(9, 5)]
+# Pass a number n on the command line to add triangle rulesets up to n rows, e.g. 11 (slow).
+
+
+def main(max_rows=None):
+    rulesets = list(RULESETS)
+    if max_rows is not None:
+        rulesets += [Ruleset.triangle(n, 5) for n in range(10, max_rows + 1)]
+    print(f"{'ruleset':<44}{'nodes':>10}{'GameTree s':>12}{'NumpyTree s':>13}{'speedup':>9}")
+    for ruleset in rulesets:
+        root = GameState(list(ruleset.row_caps), ruleset)
+        t = time.perf_counter()
+        tree = GameTree(root, iterative=True)
+        t_tree = time.perf_counter() - t
+        t = time.perf_counter()
+        numpy_tree = NumpyTree(root)
+        t_numpy = time.perf_counter() - t
+        assert numpy_tree.node_count == tree.node_count
+        print(f"{repr(ruleset):<44}{tree.node_count:>10}{t_tree:>12.3f}{t_numpy:>13.3f}{t_tree / t_numpy:>9.1f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,37 @@
+"""Benchmark of the parallel tree construction: build time by number of worker processes.
+
+The CPU time of the main process is the serial part of the construction, see GameTree._generate_layers_parallel.
+The column bound is the serial build time divided by it, i.e. the speedup possible with enough CPUs (Amdahl).
+"""
+
+import os
+import sys
+import time
+
+from models.rulesets import Ruleset
+from models.game_states import GameState
+from models.game_trees import GameTree
+
+RULESETS = [Ruleset.triangle(8, 4), Ruleset.triangle(9, 5)]
+# Pass a number n on the command line to use the triangle ruleset with n rows instead, e.g. 10.
+
+
+def main(rulesets=RULESETS):
+    cpu_count = os.cpu_count() or 1
+    worker_counts = sorted(set([1, 2, 4, 8, cpu_count]))
+    print(f"cpu count: {cpu_count}")
+    print(f"{'ruleset':<44}{'nodes':>8}{'workers':>9}{'build s':>10}{'speedup':>9}{'main cpu s':>12}{'bound':>7}")
+    for ruleset in rulesets:
+        root = GameState(list(ruleset.row_caps), ruleset)
+        t_serial = None
+        for workers in worker_counts:
+            t, cpu = time.perf_counter(), time.process_time()
+            tree = GameTree(root, iterative=True, workers=workers)
+            t, cpu = time.perf_counter() - t, time.process_time() - cpu
+            t_serial = t_serial or t
+            print(f"{repr(ruleset):<44}{tree.node_count:>8}{workers:>9}{t:>10.2f}{t_serial / t:>9.2f}{cpu:>12.2f}"
+                  f"{t_serial / cpu:>7.2f}")
+
+
+if __name__ == '__main__':
+    main([Ruleset.triangle(int(sys.argv[1]), 5)] if len(sys.argv) > 1 else RULESETS)
@@ -0,0 +1,28 @@
+"""Benchmark of the operations of permutations of 5 elements, tabled and not tabled."""
+
+import timeit
+
+from utils.permutations import Permutation
+
+
+def main(number=100000):
+    p = Permutation([2, 0, 1, 4, 3])
+    q = Permutation([1, 2, 3, 4, 0])
+    operations = [('Permutation(plist)', lambda: Permutation([2, 0, 1, 4, 3])),
+                  ('Permutation(plist, check=False)', lambda: Permutation([2, 0, 1, 4, 3], check=False)),
+                  ('p(k)', lambda: p(3)),
+                  ('inv', lambda: p.inv()),
+                  ('apply', lambda: p.apply([1, 2, 3, 4, 5])),
+                  ('mul', lambda: p.mul(q)),
+                  ('sorted', lambda: Permutation.sorted([3, 1, 4, 1, 5]))]
+    print(f"{'operation':<36}{'us':>10}")
+    for name, function in operations:
+        t = min(timeit.repeat(function, number=number, repeat=3)) / number
+        print(f"{name:<36}{t * 1e6:>10.3f}")
+    Permutation.group(5)
+    t = min(timeit.repeat(lambda: p.mul(q), number=number, repeat=3)) / number
+    print(f"{'mul, tabled':<36}{t * 1e6:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
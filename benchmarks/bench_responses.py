@@ -0,0 +1,44 @@
+"""Benchmark of /next_move with precomputed responses versus computed responses, in requests per second.
+The requests are sent with the Flask test client, i.e. without network. The lookup alone is measured, too.
+"""
+
+import itertools
+import logging
+import time
+
+import app
+from models import responses
+
+ROWS_STATES = ["".join([str(x) for x in rows]) for rows in itertools.product(*[range(k + 2) for k in range(5)])
+               if sum(rows) > 0]
+# All rows_states of the standard game.
+
+
+def main(repeat=3):
+    logging.getLogger().setLevel(logging.WARNING)  # app logs every request on level info
+    client = app.app.test_client()
+    table = app._response_table
+    t = time.perf_counter()
+    responses.ResponseTable()
+    print(f"table build: {time.perf_counter() - t:.3f} s")
+    print(f"{'level':>5}{'lookup/s':>12}{'precomputed/s':>15}{'computed/s':>12}")
+    for level in [0, 1, 2]:
+        n = repeat * len(ROWS_STATES)
+        t = time.perf_counter()
+        for _ in range(repeat):
+            for rows_state in ROWS_STATES:
+                table.lookup(rows_state, level)
+        lookups = n / (time.perf_counter() - t)
+        rates = []
+        for app._response_table in [table, None]:
+            t = time.perf_counter()
+            for _ in range(repeat):
+                for rows_state in ROWS_STATES:
+                    client.get(f"/next_move/{rows_state}/{level}")
+            rates.append(n / (time.perf_counter() - t))
+        app._response_table = table
+        print(f"{level:>5}{lookups:>12.0f}{rates[0]:>15.0f}{rates[1]:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
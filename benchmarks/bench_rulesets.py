@@ -0,0 +1,37 @@
+"""Benchmark of the tree construction for growing rulesets: build time and memory."""
+
+import sys
+import time
+import tracemalloc
+
+from models.rulesets import Ruleset
+from models.game_states import GameState
+from models.game_trees import GameTree
+from models.compact_trees import CompactTree
+
+RULESETS = [Ruleset.triangle(5, 3), Ruleset.triangle(6, 3), Ruleset.triangle(7, 4), Ruleset.triangle(8, 4),
+            Ruleset.triangle(9, 5)]
+# Pass a number n on the command line to add triangle rulesets up to n rows, e.g. 11 (slow).
+# Note: the build times include the overhead of tracemalloc.
+
+
+def main(max_rows=None):
+    rulesets = list(RULESETS)
+    if max_rows is not None:
+        rulesets += [Ruleset.triangle(n, 5) for n in range(10, max_rows + 1)]
+    print(f"{'ruleset':<44}{'nodes':>10}{'build s':>10}{'GameTree MB':>14}{'CompactTree MB':>16}")
+    for ruleset in rulesets:
+        root = GameState(list(ruleset.row_caps), ruleset)
+        tracemalloc.start()
+        t = time.perf_counter()
+        tree = GameTree(root, iterative=True)
+        t = time.perf_counter() - t
+        tree_size = tracemalloc.get_traced_memory()[0]
+        compact_tree = CompactTree(tree)
+        tracemalloc.stop()
+        compact_size = compact_tree.memory_size()
+        print(f"{repr(ruleset):<44}{tree.node_count:>10}{t:>10.2f}{tree_size / 1e6:>14.2f}{compact_size / 1e6:>16.3f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,194 @@
+"""Suite of microbenchmarks of the hot paths, with JSON baselines and a regression check.
+
+Each benchmark measures the seconds per operation, as the minimum over several repeats of timeit.
+The results are saved as a JSON baseline:
+    {"meta": {"python": .., "platform": .., "commit": .., "time": ..}, "results": {<benchmark>: <seconds>, ..}}
+Baselines depend on the machine, thus compare only baselines of the same machine. On a busy machine, 2 runs of
+the same code may differ by much more than the default threshold: use more repeats and a quiet machine.
+
+Usage (see benchmarks/__init__.py):
+    $ python benchmarks/suite.py run [--output baseline.json] [--filter solve] [--repeat 5]
+    $ python benchmarks/suite.py compare baseline.json new.json [--threshold 0.1]
+    $ python benchmarks/suite.py run --output new.json --compare baseline.json
+compare lists the ratio new / base of each benchmark and flags the regressions, i.e. the benchmarks slower by more
+than the threshold. It exits with status 1 if there is a regression.
+"""
+
+from typing import Callable, Dict, List, Tuple  # for type annotations
+
+import argparse
+import datetime
+import itertools
+import json
+import logging
+import platform
+import subprocess
+import sys
+import timeit
+
+from models.game_states import GameState
+from models.game_trees import GameTree, set_current_tree
+from models import solver, tournaments
+
+THRESHOLD = 0.1
+# Default threshold of compare: a benchmark slower by more than 10 % is a regression.
+
+ROOTS = [[0, 0, 1, 2, 3], [0, 1, 2, 3, 4], [1, 1, 3, 4, 5], [1, 2, 3, 4, 5]]
+# The roots of the tree constructions.
+
+Benchmark = Tuple[str, Callable[[], Tuple[Callable[[], object], int]], int]
+# name, setup returning the operation to measure and its number of items, number of operations per repeat.
+# The results are per item, e.g. per game-state for an operation on all game-states.
+
+
+def raw_states() -> List[GameState]:
+    """Return all game-states of the standard game with at least 1 match."""
+    return [GameState(list(rows)) for rows in itertools.product(*[range(k + 2) for k in range(5)]) if sum(rows) > 0]
+
+
+def normalized_states() -> List[GameState]:
+    """Return all normalized game-states of the standard game with at least 1 match."""
+    return sorted(set([game_state.normalized()[0] for game_state in raw_states()]), key=GameState.key)
+
+
+def over(function: Callable, items: list) -> Tuple[Callable[[], object], int]:
+    """Return an operation applying function to all items, and the number of items."""
+    return (lambda: [function(item) for item in items]), len(items)
+
+
+def build(rows: List[int]) -> Callable[[], Tuple[Callable[[], object], int]]:
+    """Return the setup of the construction of the tree of root rows."""
+    root = GameState(rows)
+    return lambda: ((lambda: GameTree(root)), 1)
+
+
+def tree_find() -> Tuple[Callable[[], object], int]:
+    tree = GameTree(GameState([1, 2, 3, 4, 5]))
+    return over(tree.find, [node.game_state for layer in tree.layers for node in layer.nodes])
+
+
+def solve(level: int) -> Callable[[], Tuple[Callable[[], object], int]]:
+    def setup():
+        set_current_tree(GameState([1, 2, 3, 4, 5]))
+        return over(lambda game_state: solver.solve(game_state, level), raw_states())
+
+    return setup
+
+
+def next_move(level: int, query: str = "") -> Callable[[], Tuple[Callable[[], object], int]]:
+    """Return the setup of /next_move through the Flask test client, for all raw game-states."""
+    def setup():
+        import app  # here, since the app builds its tree and configures logging at import
+        logging.getLogger().setLevel(logging.WARNING)  # the app logs every request on level info
+        client = app.app.test_client()
+        return over(client.get, [f"/next_move/{''.join([str(x) for x in game_state.rows])}/{level}{query}"
+                                 for game_state in raw_states()])
+
+    return setup
+
+
+def benchmarks() -> List[Benchmark]:
+    """Return the benchmarks of the suite."""
+    return [(f"tree_build[{''.join([str(x) for x in rows])}]", build(rows), 5) for rows in ROOTS] + [
+        ("tree_find", tree_find, 200),
+        ("normalized", lambda: over(GameState.normalized, raw_states()), 50),
+        ("normalized_successors", lambda: over(GameState.normalized_successors, normalized_states()), 20),
+        ("solve[level=0]", solve(0), 20),
+        ("solve[level=1]", solve(1), 20),
+        ("solve[level=2]", solve(2), 20),
+        ("next_move[level=1]", next_move(1), 1),
+        ("next_move[level=2]", next_move(2), 1),
+        ("next_move[level=1,computed]", next_move(1, "?root=12345"), 1),  # not precomputed, see module responses
+        ("next_move[level=2,computed]", next_move(2, "?root=12345"), 1),
+    ]
+
+
+def run(name_filter: str = "", repeat: int = 5) -> Dict[str, float]:
+    """Run the benchmarks whose name contains name_filter.
+    :return: the seconds per operation by name. Operations on lists of items are measured per item.
+    """
+    results = {}
+    for name, setup, number in benchmarks():
+        if name_filter not in name:
+            continue
+        tournaments.seed(name)  # reproducible random moves
+        operation, items = setup()
+        seconds = min(timeit.repeat(operation, number=number, repeat=repeat)) / number / items
+        results[name] = seconds
+        print(f"{name:<36}{seconds * 1e6:>12.3f} us", flush=True)
+    return results
+
+
+def meta() -> Dict[str, str]:
+    """Return the description of the environment of a run."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"python": platform.python_version(), "platform": platform.platform(), "commit": commit,
+            "time": datetime.datetime.now().isoformat(timespec='seconds')}
+
+
+def save(results: Dict[str, float], filename: str) -> None:
+    """Save results as baseline, see module doc."""
+    with open(filename, 'w') as file:
+        json.dump({"meta": meta(), "results": results}, file, indent=2)
+        file.write("\n")
+
+
+def load(filename: str) -> Dict[str, float]:
+    """Return the results of a baseline."""
+    with open(filename) as file:
+        return json.load(file)["results"]
+
+
+def compare(base: Dict[str, float], new: Dict[str, float], threshold: float = THRESHOLD) -> List[str]:
+    """Print the ratios new / base of the benchmarks in both results.
+    :return: the names of the regressions, i.e. of the benchmarks with ratio > 1 + threshold.
+    """
+    regressions = []
+    print(f"{'benchmark':<36}{'base us':>12}{'new us':>12}{'ratio':>8}")
+    for name in [name for name in base if name in new]:
+        ratio = new[name] / base[name]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold):
+            flag = "  improved"
+        print(f"{name:<36}{base[name] * 1e6:>12.3f}{new[name] * 1e6:>12.3f}{ratio:>8.2f}{flag}")
+    for name in [name for name in base if name not in new] + [name for name in new if name not in base]:
+        print(f"{name:<36} only in {'base' if name in base else 'new'}")
+    print(f"{len(regressions)} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Run the microbenchmarks or compare baselines.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help="run the benchmarks")
+    run_parser.add_argument('--output', help="save the results as baseline to this file")
+    run_parser.add_argument('--filter', default="", help="run only the benchmarks whose name contains this")
+    run_parser.add_argument('--repeat', type=int, default=5, help="number of repeats, the minimum is taken")
+    run_parser.add_argument('--compare', help="compare the results with this baseline")
+    run_parser.add_argument('--threshold', type=float, default=THRESHOLD, help="see compare")
+    compare_parser = subparsers.add_parser('compare', help="compare 2 baselines")
+    compare_parser.add_argument('base', help="the baseline")
+    compare_parser.add_argument('new', help="the new results")
+    compare_parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                                help="relative slow-down flagged as regression, e.g. 0.1 for 10 %%")
+    args = parser.parse_args(args)
+    if args.command == 'run':
+        results = run(args.filter, args.repeat)
+        if args.output:
+            save(results, args.output)
+        if not args.compare:
+            return 0
+        base, new = load(args.compare), results
+    else:
+        base, new = load(args.base), load(args.new)
+    return 1 if compare(base, new, args.threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
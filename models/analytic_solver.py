@@ -0,0 +1,108 @@
+"""Module for solving game-states analytically, i.e. without any search.
+
+The game is a sum of games, one per row: in each row, 1 to 3 matches can be taken (a subtraction game).
+More generally, 1 to m matches can be taken, where m is the max take of the ruleset. Below, 4 stands for m+1.
+The player who must move from a state with exactly 1 match loses. This is equivalent to the misère version
+of the sum, where the player taking the last match loses: taking the last match is never better than leaving it.
+
+By the Sprague-Grundy theory, a row with n matches has the Grundy value n mod 4, and also its misère value
+only depends on n mod 4. Such games are "tame", i.e. their sum behaves like misère Nim with the heaps
+n mod 4 (Conway, On Numbers and Games, ch. 12). Thus, with h[k] = rows[k] mod 4:
+    If all h[k] <= 1, the player to move loses iff the number of h[k] == 1 is odd.
+    Otherwise, the player to move loses iff the xor of all h[k] is 0.
+This gives the winning flag (see module game_trees) of any state in O(number of rows).
+The tests check the flags against GameTree for every state of the standard game.
+
+An AnalyticSolver offers the same operations as a GameTree that are needed for playing: find and select_move.
+It can therefore be used as backend of solver.solve, see solver.set_backend.
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import List, Tuple  # for type annotations
+
+import functools
+import operator
+import random
+
+from models.game_states import GameState, GameMove, Rows
+from models.rulesets import Ruleset
+
+rand = random.Random()
+rand.seed(a=1)  # a=1 for reproducibility
+
+def winning(rows: Rows, max_take: int = 3) -> int:
+    """Return the winning flag of the game-state with rows, which need not be normalized.
+    :param max_take: maximal number of matches taken by a move, see Ruleset.
+    """
+    heaps = [x % (max_take + 1) for x in rows]
+    if all([h <= 1 for h in heaps]):
+        loosing = heaps.count(1) % 2 == 1
+    else:
+        loosing = functools.reduce(operator.xor, heaps) == 0
+    return -1 if loosing else 1
+
+
+def moves(rows: Rows, ruleset: Ruleset) -> List[GameMove]:
+    """Return all possible moves for the game-state with rows."""
+    total_count = sum(rows)
+    return [GameMove(k, count, ruleset) for k in range(len(rows))
+            for count in range(1, min(ruleset.max_take, rows[k], total_count - 1) + 1)]
+
+
+class AnalyticNode:
+    """A node computed by an AnalyticSolver, offering the same interface as GameNode for playing.
+
+    Attributes:
+        rows: Rows
+            The rows of the game-state of the node.
+        ruleset: Ruleset
+            The ruleset of the game-state of the node.
+        winning: int
+            The winning flag of the node.
+    """
+
+    __slots__ = ('rows', 'ruleset', 'winning')
+
+    def __init__(self, rows: Rows, ruleset: Ruleset):
+        self.rows: Rows = rows
+        self.ruleset: Ruleset = ruleset
+        self.winning: int = winning(rows, ruleset.max_take)
+
+    def candidates(self) -> List[GameMove]:
+        """Return the candidates for the next move, see GameNode.select_move."""
+        if self.winning == 1:
+            result = []
+            for game_move in moves(self.rows, self.ruleset):
+                self.rows[game_move.row_index] -= game_move.match_count
+                if winning(self.rows, self.ruleset.max_take) == -1:
+                    result.append(game_move)
+                self.rows[game_move.row_index] += game_move.match_count
+            return result
+        else:
+            return [game_move for game_move in moves(self.rows, self.ruleset) if game_move.match_count == 1]
+
+    def select_move(self) -> Tuple[GameMove, int]:
+        """Select a move leading from self to a new state, see GameNode.select_move.
+        :return: 0: selected game move
+                 1: winning flag of the new state.
+        """
+        candidates = self.candidates()
+        assert len(candidates) > 0
+        game_move = rand.choice(candidates)
+        return game_move, -self.winning  # winning nodes move to loosing ones, loosing nodes only to winning ones
+
+
+class AnalyticSolver:
+    """Computes winning flags and moves with the formula in the module doc.
+
+    Attributes:
+        ruleset: None
+            The solver is not restricted to a ruleset.
+    """
+
+    ruleset = None
+
+    @staticmethod
+    def find(game_state: GameState) -> AnalyticNode:
+        """Return the node containing game_state."""
+        return AnalyticNode(game_state.get_rows(), game_state.ruleset)
@@ -0,0 +1,106 @@
+"""Module for computing the next moves of a batch of game-states, see the endpoint /next_moves of the app.
+
+Each game-state of a batch is solved with its own level by solver.solve, exactly as by the endpoint /next_move.
+All game-states of a batch have the same ruleset and root, see solver.solve.
+Errors of single game-states (e.g. an invalid state or level) do not stop the batch: they are reported in the
+result of the game-state.
+
+There are 2 formats:
+    JSON: the results are dicts as returned by /next_move, see solve_items.
+    Binary: the request is a sequence of records, 1 per game-state:
+                row_count bytes: the rows, i.e. the match count of each row
+                1 byte: the level
+            The response is a sequence of records, 1 per game-state, see RESULT:
+                1 signed byte: gameContinues as returned by /next_move, or ERROR
+                1 byte: rowIndex, 0 if there is no move
+                1 byte: numberOfMatches, 0 if there is no move
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import Dict, List, Tuple  # for type annotations
+
+import struct
+
+from models import solver, game_states, canonical_tables, tree_registry
+from models.game_states import GameState, Rows
+from models.rulesets import Ruleset
+
+
+class Error(Exception):
+    """Class for exceptions of this module."""
+
+    @classmethod
+    def check(cls, condition, *args):
+        """Check condition and raise exception if it does not hold."""
+        if not condition:
+            raise cls(*args)
+
+
+MAX_BATCH_SIZE = 100000
+# Maximal number of game-states in a batch.
+
+RESULT = struct.Struct('bBB')
+# A result record of the binary format, see module doc.
+
+ERROR = -2
+# The value of gameContinues in a binary result record, if the game-state could not be solved.
+
+
+def check_ruleset(ruleset: Ruleset) -> None:
+    """Check that trees of ruleset may be built for a batch, see tree_registry.MAX_RAW_STATES.
+    :raise: Error, if the ruleset is too big.
+    """
+    Error.check(canonical_tables.raw_state_count(ruleset) <= tree_registry.MAX_RAW_STATES,
+                f"the ruleset must have at most {tree_registry.MAX_RAW_STATES} game-states")
+
+
+def solve_one(rows: Rows, level: int, ruleset: Ruleset, root: GameState = None) -> Tuple[int, int, int] or str:
+    """Compute the next move of the game-state with rows, see solver.solve.
+    :return: gameContinues, rowIndex and numberOfMatches, where the last 2 are 0, if there is no move.
+        If the game-state or the level is invalid, the error message is returned instead.
+    """
+    try:
+        game_states.Error.check(isinstance(rows, list) and all([type(x) is int for x in rows]),
+                                "rows must be a list of integers")
+        game_states.Error.check(type(level) is int, "level must be an integer in 0..2")
+        game_move, game_continues = solver.solve(GameState(rows, ruleset), level, root)
+    except (solver.Error, game_states.Error) as e:
+        solver.count_error(e)
+        return str(e)
+    if game_continues < 0:
+        return game_continues, 0, 0
+    return game_continues, game_move.row_index, game_move.match_count
+
+
+def solve_items(items: List[Tuple[Rows, int]], ruleset: Ruleset, root: GameState = None) -> List[Dict[str, int]]:
+    """Compute the next moves of the game-states with the given rows and levels.
+    :return: the results in the order of the items, each one as the dict returned by /next_move.
+    """
+    Error.check(len(items) <= MAX_BATCH_SIZE, f"a batch must contain at most {MAX_BATCH_SIZE} game-states")
+    check_ruleset(ruleset)
+    results = []
+    for rows, level in items:
+        result = solve_one(rows, level, ruleset, root)
+        if isinstance(result, str):
+            results.append({"error": result})
+        elif result[0] < 0:
+            results.append({"gameContinues": result[0]})
+        else:
+            results.append({"gameContinues": result[0], "rowIndex": result[1], "numberOfMatches": result[2]})
+    return results
+
+
+def solve_binary(body: bytes, ruleset: Ruleset, root: GameState = None) -> bytes:
+    """Compute the next moves of the game-states in body, see module doc for the binary format.
+    :return: the result records in the order of the request records.
+    """
+    record_size = ruleset.row_count + 1
+    Error.check(len(body) % record_size == 0, f"the body must consist of records of {record_size} bytes")
+    Error.check(len(body) // record_size <= MAX_BATCH_SIZE,
+                f"a batch must contain at most {MAX_BATCH_SIZE} game-states")
+    check_ruleset(ruleset)
+    results = bytearray()
+    for pos in range(0, len(body), record_size):
+        result = solve_one(list(body[pos:pos + record_size - 1]), body[pos + record_size - 1], ruleset, root)
+        results += RESULT.pack(*result) if not isinstance(result, str) else RESULT.pack(ERROR, 0, 0)
+    return bytes(results)
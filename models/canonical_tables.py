@@ -0,0 +1,94 @@
+"""Module for canonicalizing raw game-states, i.e. mapping them to their normalized game-states and back.
+
+The moves of levels 1 and 2 (see module solver) are computed for the normalized game-state and then mapped back
+to the rows of the raw game-state. Sorting the rows for every request is not necessary: a ruleset has only few raw
+game-states, e.g. the standard game has 6*5*4*3*2 - 1 = 719. A CanonicalTable maps each of them to
+    (1) its normalized game-state,
+    (2) its row map: row_map[k] is the row index in the raw game-state of the row with index k in the normalized one.
+Thus, canonicalizing a game-state is a single dict lookup. Game-states are interned and hashed by their packed
+integer (see module game_states), so the lookup needs neither a new key nor a comparison of rows.
+
+Tables are only built by get_table, which set_current_tree calls for the ruleset of the current tree. The game-states
+of other rulesets, e.g. of requests with ?caps, are sorted on each call of canonicalize: any request may give a new
+ruleset, and tables are kept forever. Rulesets with more than MAX_TABLE_SIZE raw game-states get no table either.
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import Dict, Tuple  # for type annotations
+
+import functools
+import itertools
+import operator
+
+from models.game_states import GameState
+from models.rulesets import Ruleset
+
+RowMap = Tuple[int, ...]
+# See module doc.
+
+MAX_TABLE_SIZE = 100000
+# Maximal number of raw game-states of a ruleset with a table.
+
+
+def sort_rows(rows: Tuple[int, ...]) -> Tuple[Tuple[int, ...], RowMap]:
+    """Return the sorted rows and the row map, see module doc.
+    Equal rows keep their order, as with permutations.Permutation.sorted.
+    """
+    row_map = tuple(sorted(range(len(rows)), key=rows.__getitem__))
+    return tuple([rows[k] for k in row_map]), row_map
+
+
+class CanonicalTable:
+    """Maps the raw game-states of a ruleset to their normalized game-states and row maps.
+
+    Attributes:
+        ruleset: Ruleset
+            The ruleset of the game-states.
+        size: int
+            Number of raw game-states in the table.
+
+    Example:
+        CanonicalTable(STANDARD).lookup(GameState([1, 0, 3, 2, 1])) == (GameState([0, 1, 1, 2, 3]), (1, 0, 4, 3, 2))
+    """
+
+    def __init__(self, ruleset: Ruleset):
+        self.ruleset: Ruleset = ruleset
+        self._entries: Dict[GameState, Tuple[GameState, RowMap]] = {}
+        for rows in itertools.product(*[range(cap + 1) for cap in ruleset.row_caps]):
+            if sum(rows) == 0:
+                continue
+            sorted_rows, row_map = sort_rows(rows)
+            self._entries[GameState.from_key(rows, ruleset)] = (GameState.from_key(sorted_rows, ruleset), row_map)
+        self.size: int = len(self._entries)
+
+    def lookup(self, game_state: GameState) -> Tuple[GameState, RowMap]:
+        """Return the normalized game-state of game_state and the row map, see module doc."""
+        return self._entries[game_state]
+
+
+_tables: Dict[Ruleset, CanonicalTable or None] = {}
+# The tables by ruleset, None for rulesets that are too big, see get_table. Only rulesets passed to get_table are
+# keys, thus the size is bounded by the calls of set_current_tree.
+
+
+def raw_state_count(ruleset: Ruleset) -> int:
+    """Return the number of raw game-states of ruleset, including the one with 0 matches."""
+    return functools.reduce(operator.mul, [cap + 1 for cap in ruleset.row_caps], 1)  # math.prod needs python 3.8
+
+
+def get_table(ruleset: Ruleset) -> CanonicalTable or None:
+    """Return the table of ruleset, build it if necessary. Return None, if the ruleset has more than
+    MAX_TABLE_SIZE raw game-states.
+    """
+    if ruleset not in _tables:
+        _tables[ruleset] = CanonicalTable(ruleset) if raw_state_count(ruleset) <= MAX_TABLE_SIZE else None
+    return _tables[ruleset]
+
+
+def canonicalize(game_state: GameState) -> Tuple[GameState, RowMap]:
+    """Return the normalized game-state of game_state and the row map, see module doc."""
+    table = _tables.get(game_state.ruleset)
+    if table is None:  # no table is built here, see module doc
+        sorted_rows, row_map = sort_rows(game_state.rows)
+        return GameState.from_key(sorted_rows, game_state.ruleset), row_map
+    return table.lookup(game_state)
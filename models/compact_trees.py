@@ -0,0 +1,219 @@
+"""Module with a compact, array based representation of a solved game-tree.
+
+A GameTree consists of GameNode objects, each holding a GameState object holding a list, plus a list of references
+to the child nodes. This is a lot of memory for what is really a small graph of integers.
+
+A CompactTree contains the same information in a few flat arrays:
+    Each node is identified by an integer id. The ids are assigned in increasing order of the game-states.
+    states[id]: the normalized game-state of the node, packed into an integer, see pack.
+    winning[id]: the winning flag of the node, see module game_trees.
+    The edges of the dag are stored in CSR form (compressed sparse row):
+        the children of node id are targets[offsets[id]:offsets[id+1]].
+    The candidates for the next move of node id (see GameNode.select_move) are stored in CSR form, too:
+        they are cand_targets[cand_offsets[id]:cand_offsets[id+1]].
+Each array uses the smallest integer type that can hold its values.
+
+All normalized game-states of a game, except the one with 0 matches, are nodes of its tree. Therefore, the ids are
+the ranks of the game-states minus 1, see module state_ranks, and the id of a game-state is computed arithmetically.
+
+A CompactTree is created from a GameTree, or from its arrays as read from a file (see module tree_files).
+It offers the same operations that are needed for playing: find and select_move.
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import List, Tuple  # for type annotations
+
+import array
+import random
+
+from models.game_states import GameState, GameMove, Rows, pack, unpack  # pack and unpack re-exported
+from models.game_trees import GameTree
+from models.state_ranks import StateRanker
+from models.rulesets import Ruleset
+
+rand = random.Random()
+rand.seed(a=1)  # a=1 for reproducibility
+
+
+def typecode(max_value: int) -> str:
+    """Return the typecode of the smallest unsigned array type that can hold the integers 0..max_value."""
+    for code in ['B', 'H', 'I', 'Q']:
+        if max_value < 1 << (8 * array.array(code).itemsize):
+            return code
+    raise OverflowError(f"{max_value} does not fit into an array")
+
+
+class CompactNode:
+    """A light-weight view on a node of a CompactTree, offering the same interface as GameNode for playing.
+
+    Attributes:
+        tree: CompactTree
+            The tree containing the node.
+        node_id: int
+            The id of the node in the tree.
+    """
+
+    __slots__ = ('tree', 'node_id')
+
+    def __init__(self, tree: CompactTree, node_id: int):
+        self.tree: CompactTree = tree
+        self.node_id: int = node_id
+
+    @property
+    def winning(self) -> int:
+        return self.tree.winning[self.node_id]
+
+    def candidate_moves(self) -> List[Tuple[GameMove, int]]:
+        """See GameNode.candidate_moves."""
+        return [(self.tree.get_move(self.node_id, child_id), self.tree.winning[child_id])
+                for child_id in self.tree.candidates(self.node_id)]
+
+    def select_move(self) -> Tuple[GameMove, int]:
+        """See GameNode.select_move."""
+        return self.tree.select_move(self.node_id)
+
+
+class CompactTree:
+    """Models a solved game-tree stored in flat arrays.
+
+    Attributes:
+        ruleset: Ruleset
+            The ruleset of the game-states of the tree.
+        row_count: int
+            Number of rows of the game-states.
+        row_bits: int
+            Number of bits per row in the packed game-states.
+        node_count: int
+            Total number of nodes in the tree.
+        root_id: int
+            The id of the root node.
+        ranker: StateRanker
+            Ranks the game-states of the tree, the id of a node is the rank of its game-state minus 1.
+        states: array.array
+            The packed game-states of the nodes, sorted in increasing order.
+        winning: array.array
+            The winning flags of the nodes.
+        offsets: array.array
+            The children of node id are targets[offsets[id]:offsets[id+1]].
+        targets: array.array
+            The ids of the children of all nodes.
+        cand_offsets: array.array
+            The candidates for the next move of node id are cand_targets[cand_offsets[id]:cand_offsets[id+1]].
+        cand_targets: array.array
+            The ids of the candidates of all nodes.
+
+    Example:
+        CompactTree(GameTree(GameState([1,2,3,4,5]))) gives the compact tree of the standard game.
+    """
+
+    def __init__(self, tree: GameTree):
+        """Create the compact tree containing the same nodes, flags and edges as tree."""
+        nodes = sorted([node for layer in tree.layers for node in layer.nodes])
+        self.ruleset: Ruleset = tree.ruleset
+        self.row_count: int = len(tree.root_node.game_state.rows)
+        self.row_bits: int = max(tree.root_node.game_state.rows).bit_length()
+        self.node_count: int = len(nodes)
+        assert self.node_count == tree.node_count
+        codes = [pack(node.game_state.rows, self.row_bits) for node in nodes]
+        self.states: array.array = array.array(typecode(codes[-1]), codes)
+        self.winning: array.array = array.array('b', [node.winning for node in nodes])
+        ids = {node.game_state.key(): node_id for node_id, node in enumerate(nodes)}
+        targets = []
+        offsets = [0]
+        for node in nodes:
+            targets.extend([ids[child.game_state.key()] for child in node.children])
+            offsets.append(len(targets))
+        self.offsets: array.array = array.array(typecode(len(targets)), offsets)
+        self.targets: array.array = array.array(typecode(self.node_count), targets)
+        self.root_id: int = ids[tree.root_node.game_state.key()]
+        self.ranker: StateRanker = tree.ranker
+        assert self.ranker.size == self.node_count + 1
+        cand_targets = []
+        cand_offsets = [0]
+        for node_id in range(self.node_count):
+            cand_targets.extend(self._compute_candidates(node_id))
+            cand_offsets.append(len(cand_targets))
+        self.cand_offsets: array.array = array.array(typecode(len(cand_targets)), cand_offsets)
+        self.cand_targets: array.array = array.array(typecode(self.node_count), cand_targets)
+
+    ARRAY_NAMES = ['states', 'winning', 'offsets', 'targets', 'cand_offsets', 'cand_targets']
+    # The names of the array attributes, in the order used by from_arrays.
+
+    @classmethod
+    def from_arrays(cls, ruleset: Ruleset, root_rows: Rows, arrays: List[array.array]) -> CompactTree:
+        """Create a compact tree from its ruleset, the rows of its root and its arrays in the order of ARRAY_NAMES.
+        The arrays are used as they are, they may also be memoryviews of the same format.
+        """
+        tree = cls.__new__(cls)
+        for name, a in zip(cls.ARRAY_NAMES, arrays):
+            setattr(tree, name, a)
+        tree.ruleset = ruleset
+        tree.row_count = len(root_rows)
+        tree.row_bits = max(root_rows).bit_length()
+        tree.node_count = len(tree.winning)
+        tree.ranker = StateRanker(root_rows)
+        assert tree.ranker.size == tree.node_count + 1
+        tree.root_id = tree.node_count - 1  # the root has the greatest state
+        return tree
+
+    def get_arrays(self) -> List[array.array]:
+        """Return the arrays of this tree in the order of ARRAY_NAMES."""
+        return [getattr(self, name) for name in self.ARRAY_NAMES]
+
+    def find_id(self, game_state: GameState) -> int or None:
+        """Return the id of the node containing game_state, None if not found."""
+        rank = self.ranker.rank(game_state.rows)
+        if rank is None or rank == 0:
+            return None
+        return rank - 1
+
+    def find(self, game_state: GameState) -> CompactNode or None:
+        """Return the node containing game_state, None if not found."""
+        node_id = self.find_id(game_state)
+        if node_id is None:
+            return None
+        return CompactNode(self, node_id)
+
+    def children(self, node_id: int) -> array.array:
+        """Return the ids of the children of node node_id."""
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    def get_rows(self, node_id: int) -> Rows:
+        """Return the rows of the game-state of node node_id."""
+        return unpack(self.states[node_id], self.row_count, self.row_bits)
+
+    def candidates(self, node_id: int) -> array.array:
+        """Return the ids of the children that are candidates for the next move, see GameNode.select_move."""
+        return self.cand_targets[self.cand_offsets[node_id]:self.cand_offsets[node_id + 1]]
+
+    def _compute_candidates(self, node_id: int) -> List[int]:
+        """Compute the candidates of node node_id from its children, see candidates."""
+        children = self.children(node_id)
+        if self.winning[node_id] == 1:
+            return [child for child in children if self.winning[child] == -1]
+        else:
+            total_count = sum(self.get_rows(node_id))
+            return [child for child in children if sum(self.get_rows(child)) == total_count - 1]
+
+    def get_move(self, node_id: int, child_id: int) -> GameMove:
+        """Return the move leading from node node_id to its child child_id, see GameState.get_move."""
+        rows = self.get_rows(node_id)
+        child_rows = self.get_rows(child_id)
+        match_count = sum(rows) - sum(child_rows)
+        row_index = [k for k in range(self.row_count) if rows[k] != child_rows[k]][-1]
+        return GameMove(row_index, match_count, self.ruleset)
+
+    def select_move(self, node_id: int) -> Tuple[GameMove, int]:
+        """Select a move leading from node node_id to a child, see GameNode.select_move.
+        :return: 0: selected game move
+                 1: winning flag of the child.
+        """
+        assert self.winning[node_id] in [-1, 1]
+        candidates = self.candidates(node_id)
+        assert len(candidates) > 0
+        child_id = rand.choice(candidates)
+        return self.get_move(node_id, child_id), self.winning[child_id]
+
+    def memory_size(self) -> int:
+        """Return the number of bytes used by the arrays of this tree."""
+        return sum([len(a) * a.itemsize for a in self.get_arrays()])
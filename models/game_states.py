@@ -3,7 +3,14 @@
 A game-state is a sequence of rows containing matches.
 If rows are numbered from 1 .. 5, then row n must contain 0..n matches.
 Here, rows are indexed from 0 .. 4, thus row with index k must contain 0 .. k+1 matches.
-The rows are represented by a list.
+The rows are represented by a tuple, and also packed into an integer, see pack.
+This describes the standard game, other variants are defined by rulesets, see module rulesets.
+Each game-state has a ruleset, which is the standard one by default.
+
+Game-states and game-moves are immutable and interned: creating an equal game-state or game-move again returns
+the existing instance. Game-states are hashable, their hash is their packed integer. Operations like make_move or
+normalized return new game-states. Inside the models, game-states are created with the trusted constructor
+GameState.from_key, which skips the checks of GameState(rows).
 
 A game-state is called "normalized", if the rows are sorted in ascending order,
 i.e. match-count in row k <= match-count in row k+1.
@@ -13,12 +20,13 @@ Therefore, a list containing game-states, can be sorted.
 """
 
 from __future__ import annotations  # for type annotations with forward references
-from typing import List  # for type annotations
+from typing import Dict, Iterator, List, Tuple  # for type annotations
 
-import copy
 import functools
+import weakref
 
 from utils import permutations
+from models.rulesets import Ruleset, STANDARD
 
 
 class Error(Exception):
@@ -32,9 +40,42 @@ class Error(Exception):
             raise cls(*args)
 
 
+Rows = List[int]
+# For the rows of a game-state
+
+STRICT = False
+# If True, moves are verified by regenerating the successors, see GameState.get_move and GameNode.select_move.
+# This is for debugging, the verification costs much more than computing the move.
+
+ROW_BITS = 3
+# Number of bits per row in a packed game-state of the standard game. Rows contain at most 5 matches.
+
+
+def pack(rows: Rows, row_bits: int = ROW_BITS) -> int:
+    """Return the rows packed into an integer, the first row in the most significant bits.
+    Thus, the lexicographic order of rows is the order of the packed integers.
+    :param row_bits: number of bits per row, must be enough for the maximal number of matches in a row.
+    """
+    code = 0
+    for x in rows:
+        code = (code << row_bits) | x
+    return code
+
+
+def unpack(code: int, row_count: int = 5, row_bits: int = ROW_BITS) -> Rows:
+    """Return the rows packed into code, see pack."""
+    mask = (1 << row_bits) - 1
+    rows = [0] * row_count
+    for k in range(row_count - 1, -1, -1):
+        rows[k] = code & mask
+        code >>= row_bits
+    return rows
+
+
 class GameMove:
     """A move in the game consists in selecting a row and taking off some matches.
-    At least 1 match and at most 3 matches must be taken.
+    At least 1 match and at most 3 matches must be taken (more generally: ruleset.max_take matches).
+    Game-moves are immutable and interned, the row index and match count are packed into 1 integer.
 
     Attributes:
         row_index: int
@@ -43,96 +84,176 @@ class GameMove:
             Number of matches to take off the selected row
     """
 
-    def __init__(self, row_index: int, match_count: int):
-        assert row_index in range(5)
-        assert match_count in range(1, 3+1)
-        self.row_index: int = row_index
-        self.match_count: int = match_count
+    __slots__ = ('_code',)
+
+    _interned: Dict[int, GameMove] = {}
+    # All game-moves by code. There are at most 255 * 255 of them, see Ruleset.
+
+    def __new__(cls, row_index: int, match_count: int, ruleset: Ruleset = STANDARD):
+        assert row_index in range(ruleset.row_count)
+        assert match_count in range(1, ruleset.max_take+1)
+        return cls._from_code((row_index << 8) | match_count)
+
+    @classmethod
+    def trusted(cls, row_index: int, match_count: int) -> GameMove:
+        """Return the game-move, without any checks. For internal use, e.g. for the moves of successors."""
+        return cls._from_code((row_index << 8) | match_count)
+
+    @classmethod
+    def _from_code(cls, code: int) -> GameMove:
+        """Return the interned game-move with code."""
+        game_move = cls._interned.get(code)
+        if game_move is None:
+            game_move = object.__new__(cls)
+            game_move._code = code
+            cls._interned[code] = game_move
+        return game_move
+
+    @property
+    def row_index(self) -> int:
+        return self._code >> 8
+
+    @property
+    def match_count(self) -> int:
+        return self._code & 0xFF
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.row_index == other.row_index and self.match_count == other.match_count
+            return self._code == other._code
         else:
             return NotImplemented
 
+    def __hash__(self):
+        return self._code
 
-Rows = List[int]
-# For the rows of a game-state
+    def __repr__(self):
+        return f"GameMove({self.row_index}, {self.match_count})"
+
+    def __reduce__(self):
+        return self.__class__._from_code, (self._code,)
 
 
 @functools.total_ordering  # uses __eq__ and __lt__ to generate the comparison operators
 class GameState:
-    """Models a game-state and its operations.
+    """Models a game-state and its operations. Game-states are immutable and interned.
 
     Attributes:
-        rows: Rows
-            A list of integers, representing a valid game state.
+        rows: Tuple[int, ...]
+            A tuple of integers, representing a valid game state.
             Trying to create an instance with an invalid game-state raises Error.
+        ruleset: Ruleset
+            The ruleset of the game, the rows must be valid for it.
     """
 
-    def __init__(self, rows: Rows):
-        # Check and convert input
+    __slots__ = ('_rows', '_code', '_ruleset', '__weakref__')
+
+    _interned: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+    # All living game-states by code and ruleset.
+
+    def __new__(cls, rows: Rows, ruleset: Ruleset = STANDARD):
+        # Check input
+        row_count = ruleset.row_count
         Error.check(isinstance(rows, list), "rows must be a list", "hahaha")
-        Error.check(len(rows) == 5, "rows must have length 5")
-        self.rows: Rows = []
-        for k in range(5):
+        Error.check(len(rows) == row_count, f"rows must have length {row_count}")
+        for k in range(row_count):
             x = rows[k]
+            cap = ruleset.row_caps[k]
             Error.check(isinstance(x, int), "rows must contain integers only")
-            Error.check(0 <= x <= 5, 'rows must consist of digits in 0..5')
-            Error.check(x <= k+1, f"row at index {k} must contain <= {k + 1} matches")
-            self.rows.append(x)
-        Error.check(sum(self.rows) > 0, 'rows must contain at least 1 match')
+            Error.check(0 <= x <= ruleset.row_caps[-1], f'rows must consist of digits in 0..{ruleset.row_caps[-1]}')
+            Error.check(x <= cap, f"row at index {k} must contain <= {cap} matches")
+        Error.check(sum(rows) > 0, 'rows must contain at least 1 match')
+        return cls.from_key(tuple(rows), ruleset)
+
+    @classmethod
+    def from_key(cls, key: Tuple[int, ...], ruleset: Ruleset = STANDARD) -> GameState:
+        """Return the game-state whose key is key, see GameState.key. This is the trusted constructor:
+        nothing is checked, key must be valid rows for ruleset, e.g. the key of another game-state or of a successor,
+        see successor_keys.
+        """
+        code = pack(key, ruleset.row_bits)
+        game_state = cls._interned.get((code, ruleset))
+        if game_state is None:
+            game_state = object.__new__(cls)
+            game_state._rows = key
+            game_state._code = code
+            game_state._ruleset = ruleset
+            cls._interned[(code, ruleset)] = game_state
+        return game_state
+
+    @property
+    def rows(self) -> Tuple[int, ...]:
+        return self._rows
+
+    @property
+    def ruleset(self) -> Ruleset:
+        return self._ruleset
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.rows == other.rows
+            return self is other or (self._code == other._code and self._ruleset == other._ruleset)
         else:
             return NotImplemented
 
+    def __hash__(self):
+        return self._code
+
     def __lt__(self, other):
         # lexicographic ordering is used
         if isinstance(other, self.__class__):
-            return self.rows < other.rows
+            return self._rows < other._rows
         else:
             return NotImplemented
 
     def __str__(self):
-        s = f"[{self.rows[0]}"
-        for k in range(1, len(self.rows)):
-            s += f"{self.rows[k]}"
-        s += "]"
-        return s
+        separator = "" if self._ruleset.row_caps[-1] <= 9 else ","  # digits, if the rows are unambiguous
+        return "[" + separator.join([str(x) for x in self._rows]) + "]"
+
+    def __repr__(self):
+        return f"GameState({list(self._rows)}, {self._ruleset!r})"
+
+    def __reduce__(self):
+        return self.__class__.from_key, (self._rows, self._ruleset)
 
     def get_rows(self) -> Rows:
-        """Return a copy of the internal row list."""
-        return copy.deepcopy(self.rows)
+        """Return the rows as a new list."""
+        return list(self._rows)
+
+    def key(self) -> Tuple[int, ...]:
+        """Return a hashable key of the rows. Equal game-states have equal keys."""
+        return self._rows
+
+    def code(self) -> int:
+        """Return the rows packed into an integer, see pack."""
+        return self._code
 
     def get_total_count(self) -> int:
         """Return total count of all matches."""
-        return sum(self.rows)
+        return sum(self._rows)
 
-    def normalize(self) -> permutations.Permutation:
-        """Sort the internal row list in ascending order and return the permutation that undoes this sorting."""
-        self.rows, p = permutations.Permutation.sorted(self.rows)
-        return p.inv()
+    def normalized(self) -> Tuple[GameState, permutations.Permutation]:
+        """Return the game-state with the rows sorted in ascending order and the permutation that undoes this
+        sorting.
+        """
+        rows, p = permutations.Permutation.sorted(list(self._rows))
+        return GameState.from_key(tuple(rows), self._ruleset), p.inv()
 
     def is_normalized(self) -> bool:
-        """Return True iff the internal row list is sorted in ascending order."""
-        test_list = [self.rows[k] <= self.rows[k+1] for k in range(4)]
-        return all(test_list)
+        """Return True iff the rows are sorted in ascending order."""
+        rows = self._rows
+        return all([rows[k] <= rows[k+1] for k in range(len(rows) - 1)])
 
-    def denormalize(self, p: permutations.Permutation) -> None:
-        """Reset the internal rows list to the state before normalization.
-        :param p: The permutation that was returned by the call to normalize()
+    def denormalized(self, p: permutations.Permutation) -> GameState:
+        """Return the game-state before normalization.
+        :param p: The permutation that was returned by the call to normalized()
         """
-        self.rows = p.apply(self.rows)
+        return GameState.from_key(tuple(p.apply(list(self._rows))), self._ruleset)
 
     def is_possible_move(self, move: GameMove) -> bool:
         """Return true iff move can be applied to self.
         :param move: the move, that should be applied to self.
         :return: result of the test
         """
-        return (move.match_count <= self.rows[move.row_index]) and (move.match_count < sum(self.rows))
+        return (move.match_count <= self._rows[move.row_index]) and (move.match_count < sum(self._rows))
         # Note: the 2nd condition handles the case, where all matches are in 1 row.
 
     def make_move(self, move: GameMove) -> GameState:
@@ -143,52 +264,77 @@ class GameState:
         :return: resulting game-state.
         """
         assert self.is_possible_move(move)
-        new_rows = self.get_rows()
+        new_rows = list(self._rows)
         new_rows[move.row_index] -= move.match_count
-        return GameState(new_rows)
+        return GameState.from_key(tuple(new_rows), self._ruleset)
+
+    def successors(self) -> Iterator[Tuple[GameMove, GameState]]:
+        """Yield all possible normalized successors, each once, together with the move producing it.
+        The move is the one returned by get_move. The successors are created with the trusted constructor.
+        Assumption: self is a normalized game state.
+        Example: [0, 0, 1, 2, 2] yields (2,1) [0, 0, 0, 2, 2], (3,1) [0, 0, 1, 1, 2], (3,2) [0, 0, 0, 1, 2]
+        """
+        assert self.is_normalized()
+        ruleset = self._ruleset
+        for row_index, match_count, s_key in iter_successor_keys(self._rows, ruleset.max_take):
+            yield GameMove.trusted(row_index, match_count), GameState.from_key(s_key, ruleset)
 
     def normalized_successors(self) -> List[GameState]:
-        """Return the list of all possible normalized successors.
+        """Return the list of all possible normalized successors, see successors.
         Assumption: self is a normalized game state.
         :return: list of all normalized game states that can be generated from self with 1 move.
         Example: [0, 0, 1, 2, 2] will return [0, 0, 0, 2, 2], [0, 0, 1, 1, 2], [0, 0, 0, 1, 2]
         """
-        assert self.is_normalized()
-        result = []
-        max_count = min(3, sum(self.rows)-1)
-        # later a list of lists may be used, therefore this double loop
-        for count in range(1, max_count+1):
-            temp = []
-            for k in range(5):
-                if count <= self.rows[k]:
-                    game_state = self.make_move(GameMove(k, count))
-                    game_state.normalize()
-                    if game_state not in temp:
-                        temp.append(game_state)
-            result = result + temp
-        return result
+        return [s_game_state for _, s_game_state in self.successors()]
 
     def get_move(self, game_state: GameState) -> GameMove:
         """Return a move which turns self into an intermediate game state, whose normalization is equal to game_state.
         Example: get_move(12345,12235) == (3,2) because 12345 --> 12325 --> 12235
         Assumption: (1) self and game_state are normalized
-                    (2) game_state is a successor of self
+                    (2) game_state is a successor of self, this is only checked if STRICT is True
         :param game_state: the game_state to generate with the move and following normalization.
         :return: the move.
         """
         assert self.is_normalized()
         assert game_state.is_normalized()
-        assert game_state in self.normalized_successors()
         # match_count: the difference of the total counts of matches
         match_count = self.get_total_count() - game_state.get_total_count()
         # row_index: the first from right that has changed
-        candidates = [k for k in range(5) if self.rows[k] != game_state.rows[k]]
+        candidates = [k for k in range(len(self._rows)) if self._rows[k] != game_state.rows[k]]
         assert len(candidates) > 0
         row_index = candidates[-1]
-        # check todo: unit-test
-        move = GameMove(row_index, match_count)
-        temp_state = self.make_move(move)
-        temp_state.normalize()
-        assert temp_state == game_state
-        # return result
+        move = GameMove(row_index, match_count, self._ruleset)
+        if STRICT:
+            assert game_state in self.normalized_successors()
+            assert tuple(sorted(self.make_move(move).rows)) == game_state.rows
         return move
+
+
+def iter_successor_keys(key: Tuple[int, ...], max_take: int = 3) -> Iterator[Tuple[int, int, Tuple[int, ...]]]:
+    """Yield each normalized successor of the normalized rows key once, as a tuple, together with a move producing
+    it: (row_index, match_count, successor key). The successors are ordered by match count, then by row index.
+    No lookup is needed to deduplicate: taking the same count from rows with equal match counts gives the same
+    successor, so only the first row of each run of equal rows is used. This row is also the row index of the move
+    returned by GameState.get_move.
+    :param max_take: maximal number of matches taken by a move, see Ruleset.
+    """
+    n = sum(key)
+    for count in range(1, min(max_take, n - 1) + 1):
+        prev = -1
+        for k, x in enumerate(key):
+            if x != prev and x >= count:
+                s_rows = list(key)
+                s_rows[k] = x - count
+                s_rows.sort()
+                yield k, count, tuple(s_rows)
+            prev = x
+
+
+def successor_keys(key: Tuple[int, ...], max_take: int = 3) -> List[Tuple[Tuple[int, ...], int]]:
+    """Return the rows of the normalized successors of the normalized rows key, as tuples, together with their
+    total count, see iter_successor_keys. GameState.successors is based on the same function, but here no
+    game-states are created.
+    :param max_take: maximal number of matches taken by a move, see Ruleset.
+    """
+    n = sum(key)
+    return [(s_key, n - count) for _, count, s_key in iter_successor_keys(key, max_take)]
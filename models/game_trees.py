@@ -32,7 +32,10 @@ nodes can be reached.
 The tree has an auxiliary structure, the list of layers. A layer is a list of all nodes having a given total count
 of matches. The list of layers is defined such, that the layer at index n contains the nodes having total count of
 matches n. Within a layer the nodes are sorted in increasing lexicographic order of the states.
-Thus, using the list of layers for any game state the corresponding node can be found quickly.
+Each layer also has a hash index of its nodes.
+
+For finding the node of any game state, no search is needed at all: the normalized states of a tree can be ranked
+arithmetically to dense indices (see module state_ranks), and the tree keeps a flat list of its nodes by rank.
 
 The module allows the generation of different trees, depending on what is chosen as the root.
 The standard game has the root with the state [1,2,3,4,5]. The most trivial game hast the root [0,0,0,0,1]
@@ -42,16 +45,23 @@ you have a safe strategy to win, and if so, the tree will show you the path to "
 """
 
 from __future__ import annotations  # for type annotations with forward references
-from typing import List, Tuple  # for type annotations
+from typing import Dict, List, Tuple, TYPE_CHECKING  # for type annotations
 
+import concurrent.futures
 import functools
-import bisect
+import multiprocessing
 import random
-
-from models.game_states import GameState, GameMove
-
-import logging
-from utils import mylogconfig
+import sys
+import time
+
+from models import game_states
+from models.game_states import GameState, GameMove, iter_successor_keys
+from models.rulesets import Ruleset
+from models.state_ranks import StateRanker
+from models import canonical_tables
+from utils import metrics, permutations
+if TYPE_CHECKING:
+    from models.compact_trees import CompactTree
 
 rand = random.Random()
 rand.seed(a=1)  # a=1 for reproducibility
@@ -70,6 +80,12 @@ class GameNode:
         children: List[GameNode]
             List of all game-nodes that can be reached from this node with 1 move and subsequent normalization.
             Initialized to empty.
+        moves: List[GameMove]
+            The moves of the edges: moves[k] leads to children[k], see GameState.get_move.
+            Initialized to empty.
+        candidates: Tuple[int, ...] or None
+            The indices of the children that are candidates for the next move, see select_move.
+            Initialized to None, computed by compute_candidates when the winning flag is known.
 
     Note:
         (1) Two nodes are considered "equal", when their game_states are equal, the winning flag or
@@ -83,6 +99,8 @@ class GameNode:
         self.game_state: GameState = game_state
         self.winning: int = 0
         self.children: List[GameNode] = []
+        self.moves: List[GameMove] = []
+        self.candidates: Tuple[int, ...] or None = None
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
@@ -107,30 +125,43 @@ class GameNode:
         s += f"c:{len(self.children)})"
         return s
 
+    def compute_candidates(self) -> None:
+        """Compute the candidates for the next move, see select_move.
+        Assumption: self.winning and the winning flags of all children have been computed already.
+        """
+        assert self.winning in [-1, 1]
+        assert len(self.moves) == len(self.children)
+        if self.winning == 1:
+            assert any([child.winning == -1 for child in self.children])
+            candidates = [k for k, child in enumerate(self.children) if child.winning == -1]
+        else:
+            assert all([child.winning == 1 for child in self.children])
+            total_count = self.game_state.get_total_count()
+            candidates = [k for k, child in enumerate(self.children)
+                          if child.game_state.get_total_count() == total_count - 1]
+        assert len(candidates) > 0 or len(self.children) == 0
+        self.candidates = tuple(candidates)
+
+    def candidate_moves(self) -> List[Tuple[GameMove, int]]:
+        """Return the candidates for the next move, see select_move, with the winning flags of their nodes."""
+        return [(self.moves[k], self.children[k].winning) for k in self.candidates]
+
     def select_move(self) -> Tuple[GameMove, int]:
         """ Select a move leading from self to a new node.
 
         :return: 0: selected game move
                  1: winning flag of new node.
-        Assumption: self.winning has been computed already, i.e. != 0
+        Assumption: the candidates have been computed already, see compute_candidates.
         Note:
             (1) If self.winning == 1, one of the child-nodes with winning == -1 is chosen randomly.
             (2) If self.winning ==-1, one of the child-nodes with winning == 1 and only 1 match less
                                       is chosen randomly.
         """
-        assert self.winning in [-1, 1]
-        if self.winning == 1:
-            assert any([child.winning == -1 for child in self.children])
-            candidates = [child for child in self.children if child.winning == -1]
-        else:
-            assert all([child.winning == 1 for child in self.children])
-            total_count = self.game_state.get_total_count()
-            candidates = [child for child in self.children if child.game_state.get_total_count() == total_count - 1]
-        assert len(candidates) > 0
-        logging.info(f"number of candidate moves: {len(candidates)}")
-        node = rand.choice(candidates)
-        game_move = self.game_state.get_move(node.game_state)
-        return game_move, node.winning
+        k = rand.choice(self.candidates)
+        game_move = self.moves[k]  # no need for self.game_state.get_move(self.children[k].game_state)
+        if game_states.STRICT:
+            assert game_move == self.game_state.get_move(self.children[k].game_state)
+        return game_move, self.children[k].winning
 
 
 class GameLayer:
@@ -142,25 +173,42 @@ class GameLayer:
         nodes: List[GameNode]
             All normalized nodes with total match count == n.
             The list is sorted in ascending order.
+
+    Note:
+        The nodes are indexed by a dict with the keys of their game-states, thus insert and find take constant time.
+        The list of nodes is only sorted when it is accessed after unordered inserts.
     """
 
     def __init__(self, n: int):
         self.n: int = n
-        self.nodes: List[GameNode] = []
+        self._index: Dict[Tuple[int, ...], GameNode] = {}
+        self._nodes: List[GameNode] = []
+        self._is_sorted: bool = True
+
+    @property
+    def nodes(self) -> List[GameNode]:
+        """The nodes of this layer in ascending order, sorted on access after unordered inserts.
+        The list is the internal one and must be treated as read-only: use insert to add nodes, otherwise the index
+        of find and the ordering get out of sync.
+        """
+        if not self._is_sorted:
+            self._nodes.sort()
+            self._is_sorted = True
+        return self._nodes
 
     def insert(self, node: GameNode) -> None:
         """Insert node in this layer, keeping up the ordering."""
         assert node.game_state.get_total_count() == self.n
-        bisect.insort_left(self.nodes, node)
+        key = node.game_state.key()
+        assert key not in self._index
+        if self._is_sorted and self._nodes and key < self._nodes[-1].game_state.key():
+            self._is_sorted = False
+        self._index[key] = node
+        self._nodes.append(node)
 
     def find(self, game_state: GameState) -> GameNode or None:
         """Return the node containing game_state, None if not found."""
-        test_node = GameNode(game_state)
-        i = bisect.bisect_left(self.nodes, test_node)
-        if i < len(self.nodes) and self.nodes[i] == test_node:
-            return self.nodes[i]
-        else:
-            return None
+        return self._index.get(game_state.key())
 
     def is_sorted_lt(self) -> bool:
         """For tests only. Check that the list is sorted in strictly increasing order.
@@ -183,6 +231,10 @@ class GameTree:
             Total number of nodes in the tree. Currently only used for tests and logs.
         layers: List[GameLayer]
             The layers of the tree.
+        ranker: StateRanker
+            Ranks the normalized game-states of the tree, used by find.
+        ruleset: Ruleset
+            The ruleset of the game-states of the tree.
 
     Example:
         GameTree(GameState([0,0,0,2,2]) gives the entire tree for a starting game-state, that contains
@@ -190,17 +242,33 @@ class GameTree:
         GameTree(GameState([1,2,3,4,5]) gives the entire tree of the standard game.
     """
 
-    def __init__(self, game_state: GameState):
-        """Create the tree whose root-node contains game_state. """
+    def __init__(self, game_state: GameState, iterative: bool = False, workers: int = 1):
+        """Create the tree whose root-node contains game_state.
+        :param game_state: the normalized game state of the root node.
+        :param iterative: if True, the nodes are generated layer by layer without recursion,
+            see _generate_layers. Otherwise, they are generated recursively starting from the root.
+        :param workers: if > 1, the nodes are generated layer by layer, and the layers are solved by a pool
+            of this number of processes, see _generate_layers_parallel. iterative is ignored.
+        All modes produce the same layers, node count and winning flags.
+        """
         # for tests and logs only
         self.node_count: int = 0
+        self.ruleset: Ruleset = game_state.ruleset
         # generate layers
         self.layers: List[GameLayer] = []
         self.total_count: int = game_state.get_total_count()
         for n in range(self.total_count+1):
             self.layers.append(GameLayer(n))
-        # generate root node -- and recursively all nodes
-        self.root_node: GameNode = self._generate_node(game_state)
+        # the nodes by rank of their game-state, see module state_ranks
+        self.ranker: StateRanker = StateRanker(game_state.rows)
+        self._nodes: List[GameNode or None] = [None] * self.ranker.size
+        # generate root node -- and all other nodes
+        if workers > 1:
+            self.root_node: GameNode = self._generate_layers_parallel(game_state, workers)
+        elif iterative:
+            self.root_node: GameNode = self._generate_layers(game_state)
+        else:
+            self.root_node: GameNode = self._generate_node(game_state)
         # checks
         assert self.node_count == sum([len(layer.nodes) for layer in self.layers])
         assert all([layer.is_sorted_lt() for layer in self.layers])
@@ -217,11 +285,12 @@ class GameTree:
         node = GameNode(game_state)
         # generate all child nodes, look for a winning == -1 flag
         minus1_found = False
-        for s_game_state in game_state.normalized_successors():
+        for game_move, s_game_state in game_state.successors():
             s_node = self.find(s_game_state)
             if s_node is None:  # recursive guard
                 s_node = self._generate_node(s_game_state)  # recursive call
             node.children.append(s_node)
+            node.moves.append(game_move)
             assert s_node.winning != 0
             if s_node.winning == -1:
                 minus1_found = True
@@ -230,37 +299,254 @@ class GameTree:
             node.winning = 1
         else:
             node.winning = -1
+        node.compute_candidates()
         # insert this node
         n = game_state.get_total_count()
-        self.layers[n].insert(node)
+        self._insert(node)
         # count nodes
         self.node_count += 1
         # result
         return node
 
+    def _generate_layers(self, game_state: GameState) -> GameNode:
+        """Generate the node with game_state and its entire subtree without recursion. All nodes are inserted
+        into the corresponding layers.
+        The generation has 2 passes:
+            (1) Top down: starting with the root, the layers are visited in descending order of total count.
+                The successors of each node of a layer lie in lower layers, they are looked up there
+                or else created and inserted. Thus, when a layer is visited, all its nodes have been created already.
+            (2) Bottom up: the layers are visited in ascending order of total count and the winning flags
+                are computed. The flags of all children are known at that time.
+        :param game_state: a valid normalized game state, which is the root of the tree.
+        :return: the root node
+        """
+        root_node = GameNode(game_state)
+        self._insert(root_node)
+        # pass 1: generate nodes and children
+        for n in range(self.total_count, 0, -1):
+            for node in self.layers[n].nodes:
+                for row_index, match_count, s_key in iter_successor_keys(node.game_state.key(), self.ruleset.max_take):
+                    s_node = self._nodes[self.ranker.rank(s_key)]
+                    if s_node is None:
+                        s_node = GameNode(GameState.from_key(s_key, self.ruleset))
+                        self._insert(s_node)
+                    node.children.append(s_node)
+                    node.moves.append(GameMove.trusted(row_index, match_count))
+        # pass 2: compute the winning flags
+        for layer in self.layers:
+            for node in layer.nodes:
+                assert all([child.winning != 0 for child in node.children])
+                if any([child.winning == -1 for child in node.children]):
+                    node.winning = 1
+                else:
+                    node.winning = -1
+                node.compute_candidates()
+            self.node_count += len(layer.nodes)
+        return root_node
+
+    def _generate_layers_parallel(self, game_state: GameState, workers: int) -> GameNode:
+        """Generate the node with game_state and its entire subtree, solving the layers in parallel.
+        All nodes are inserted into the corresponding layers.
+        The states of the tree are known in advance: all normalized states with rank > 0, see module state_ranks.
+        The layers are visited in ascending order of total count. The states of a layer are split into chunks,
+        which are solved by a pool of processes, see _solve_chunk. Since the successors of a layer lie in the
+        layers below, their winning flags are known at that time. Small layers are solved in this process.
+        The keys of the layers, the ranker and the winning flags are passed to the processes once, when they are
+        started, see _init_worker. The flags are in shared memory and written by the processes, thus a chunk is
+        sent as its layer and range of keys, and only its results are sent back. This process only creates the
+        nodes from the results, see _create_nodes. It does so for a layer while the processes solve the next
+        layer, which needs only the flags of the layers below.
+        :param game_state: a valid normalized game state, which is the root of the tree.
+        :param workers: number of processes.
+        :return: the root node
+        """
+        max_take = self.ruleset.max_take
+        # the keys and ranks of the states by layer
+        layer_keys: List[List[Tuple[int, ...]]] = [[] for _ in range(self.total_count + 1)]
+        layer_ranks: List[List[int]] = [[] for _ in range(self.total_count + 1)]
+        for rank in range(1, self.ranker.size):
+            rows = self.ranker.unrank(rank)
+            layer_keys[sum(rows)].append(tuple(rows))
+            layer_ranks[sum(rows)].append(rank)
+        # the moves by code, see ChunkResult
+        move_table = {(row_index << 8) | match_count: GameMove.trusted(row_index, match_count)
+                      for row_index in range(self.ruleset.row_count) for match_count in range(1, max_take + 1)}
+        # the winning flags by rank, coded as bytes: 0 for unknown, 1 for -1, 2 for 1
+        flags = multiprocessing.RawArray('B', self.ranker.size)
+        flags_view = memoryview(flags).cast('B')  # faster item access than the ctypes array
+
+        def create_nodes(chunks: List[Tuple[int, int, concurrent.futures.Future]]) -> None:
+            """Create the nodes of the chunks, given by layer, start index and future of the results."""
+            for n, start, future in chunks:
+                results = future.result()
+                stop = start + len(results)
+                self._create_nodes(n, layer_keys[n][start:stop], layer_ranks[n][start:stop], results, move_table)
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                    initargs=(layer_keys, max_take, self.ranker, flags)) as executor:
+            previous: List[Tuple[int, int, concurrent.futures.Future]] = []
+            # the chunks of the previous layer, their nodes are created while the processes solve the next layer
+            for n, keys in enumerate(layer_keys):
+                concurrent.futures.wait([future for _, _, future in previous])  # the flags below layer n are known
+                if len(keys) < PARALLEL_MIN_STATES:
+                    future = concurrent.futures.Future()
+                    future.set_result(_solve_chunk(keys, max_take, self.ranker, flags_view))
+                    chunks = [(n, 0, future)]
+                else:
+                    chunk_size = -(-len(keys) // workers)
+                    chunks = [(n, k, executor.submit(_solve_layer_chunk, n, k, k + chunk_size))
+                              for k in range(0, len(keys), chunk_size)]
+                create_nodes(previous)
+                previous = chunks
+            create_nodes(previous)
+        return self.find(game_state)
+
+    def _create_nodes(self, n: int, keys: List[Tuple[int, ...]], ranks: List[int], results: List[ChunkResult],
+                      move_table: Dict[int, GameMove]) -> None:
+        """Create and insert the nodes of states of layer n from the results of _solve_chunk.
+        Assumption: the nodes of their successors exist already.
+        :param keys: the keys of the states.
+        :param ranks: the ranks of the states.
+        :param move_table: the moves by code, see ChunkResult.
+        """
+        nodes = self._nodes
+        layer = self.layers[n]
+        ruleset = self.ruleset
+        for key, rank, (winning, s_ranks, move_codes, candidates) in zip(keys, ranks, results):
+            node = GameNode(GameState.from_key(key, ruleset))
+            node.winning = winning
+            node.children = [nodes[s_rank] for s_rank in s_ranks]
+            node.moves = [move_table[code] for code in move_codes]
+            node.candidates = candidates
+            layer.insert(node)
+            nodes[rank] = node
+        self.node_count += len(keys)
+
+    def _insert(self, node: GameNode) -> None:
+        """Insert node into its layer and into the list of nodes by rank."""
+        self.layers[node.game_state.get_total_count()].insert(node)
+        self._nodes[self.ranker.rank(node.game_state.rows)] = node
+
+    def memory_size(self) -> int:
+        """Return an estimate of the number of bytes used by the nodes of this tree."""
+        size = sys.getsizeof(self._nodes)
+        for layer in self.layers:
+            size += sys.getsizeof(layer.nodes) + sys.getsizeof(layer._index)
+            for node in layer.nodes:
+                size += sys.getsizeof(node) + sys.getsizeof(node.__dict__) + sys.getsizeof(node.children)
+                size += sys.getsizeof(node.moves) + sys.getsizeof(node.candidates)
+                size += sys.getsizeof(node.game_state) + sys.getsizeof(node.game_state.rows)
+        return size
+
     def find(self, game_state: GameState) -> GameNode or None:
-        """Return the the tree-node containing game_state, None if not found."""
+        """Return the the tree-node containing game_state, None if not found.
+        Note: no search is needed, the rank of game_state is the index of the node in a flat list.
+        """
         n = game_state.get_total_count()
         assert n <= self.total_count
-        node = self.layers[n].find(game_state)
-        return node
+        rank = self.ranker.rank(game_state.rows)
+        if rank is None:
+            return None
+        return self._nodes[rank]
+
 
+PARALLEL_MIN_STATES = 256
+# Layers with fewer states are not split into chunks for the process pool, see GameTree._generate_layers_parallel.
 
-_current_tree: GameTree
+
+ChunkResult = Tuple[int, List[int], List[int], Tuple[int, ...]]
+# The result of _solve_chunk for a state: its winning flag, the ranks of its successors, the codes of the moves
+# leading to them (row index << 8 | match count) and its candidates, see GameNode.
+
+
+def _solve_chunk(keys: List[Tuple[int, ...]], max_take: int, ranker: StateRanker, flags: memoryview) \
+        -> List[ChunkResult]:
+    """Solve the normalized states with the given keys and set their winning flags. This function runs in the
+    processes of the pool, or for small layers in the main process, see GameTree._generate_layers_parallel.
+    :param keys: the keys of the states, all in the same layer.
+    :param max_take: maximal number of matches taken by a move.
+    :param ranker: ranks the states of the tree.
+    :param flags: the coded winning flags by rank, known for all layers below the states.
+    :return: the results by state, see ChunkResult.
+    """
+    result = []
+    for key in keys:
+        s_ranks = []
+        move_codes = []
+        minus1_found = False
+        for row_index, match_count, s_key in iter_successor_keys(key, max_take):
+            s_rank = ranker.rank(s_key)
+            assert flags[s_rank] != 0
+            minus1_found = minus1_found or flags[s_rank] == 1
+            s_ranks.append(s_rank)
+            move_codes.append((row_index << 8) | match_count)
+        # as GameNode.compute_candidates: the moves to a losing child, else the moves taking 1 match
+        if minus1_found:
+            candidates = tuple([k for k, s_rank in enumerate(s_ranks) if flags[s_rank] == 1])
+        else:
+            candidates = tuple([k for k, code in enumerate(move_codes) if code & 255 == 1])
+        flags[ranker.rank(key)] = 2 if minus1_found else 1
+        result.append((1 if minus1_found else -1, s_ranks, move_codes, candidates))
+    return result
+
+
+_worker_context: tuple = ()
+# The layer keys, max_take, ranker and flags of a process of the pool, see _init_worker.
+
+
+def _init_worker(layer_keys: List[List[Tuple[int, ...]]], max_take: int, ranker: StateRanker, flags) -> None:
+    """Initialize a process of the pool of GameTree._generate_layers_parallel, flags is the shared array."""
+    global _worker_context
+    _worker_context = (layer_keys, max_take, ranker, memoryview(flags).cast('B'))
+
+
+def _solve_layer_chunk(n: int, start: int, stop: int) -> List[ChunkResult]:
+    """Solve the states of layer n with indices start .. stop-1 in a process of the pool, see _solve_chunk."""
+    layer_keys, max_take, ranker, flags = _worker_context
+    return _solve_chunk(layer_keys[n][start:stop], max_take, ranker, flags)
+
+
+_current_tree: GameTree or CompactTree
 # See set_current_tree.
 # todo: init to None
 
+_current_tree_seconds: float or None = None
+# The time used by set_current_tree for solving or loading the current tree.
+
 
-def set_current_tree(game_state: GameState):
+def set_current_tree(game_state: GameState, filename: str = None, shared: bool = False):
     """Set the current tree. This will be the tree used by normal runs of the app.
     This function should only be called once by the main program during startup.
     However, unit-tests may call this, too.
+    :param game_state: the normalized game state of the root.
+    :param filename: if given, the tree is a CompactTree read from this file instead of being solved.
+        If the file is missing or stale, the tree is solved and written to the file, see module tree_files.
+    :param shared: if True, the file is mapped into memory, such that all processes share the same tree.
+    The canonical table of the ruleset is built, too, see module canonical_tables, and the permutations of its
+    rows are tabled, see permutations.Permutation.group.
     """
     # todo: log warning
-    global _current_tree
-    _current_tree = GameTree(game_state)
-
-
-def current_tree() -> GameTree:
+    global _current_tree, _current_tree_seconds
+    t = time.perf_counter()
+    if filename is None:
+        _current_tree = GameTree(game_state)
+    else:
+        from models import tree_files  # here, to avoid circular imports
+        _current_tree = tree_files.load_or_build(filename, game_state, shared=shared)
+    _current_tree_seconds = time.perf_counter() - t
+    canonical_tables.get_table(game_state.ruleset)
+    if game_state.ruleset.row_count <= permutations.TABLE_MAX_SIZE:
+        permutations.Permutation.group(game_state.ruleset.row_count)
+
+
+def current_tree() -> GameTree or CompactTree:
     """Return the current tree."""
     return _current_tree
+
+
+metrics.Callback("matchtaker_tree_nodes", "Number of nodes of the current tree.",
+                 lambda: _current_tree.node_count if _current_tree_seconds is not None else None)
+metrics.Callback("matchtaker_tree_bytes", "Memory used by the current tree.",
+                 lambda: _current_tree.memory_size() if _current_tree_seconds is not None else None)
+metrics.Callback("matchtaker_tree_build_seconds", "Time used for solving or loading the current tree.",
+                 lambda: _current_tree_seconds)
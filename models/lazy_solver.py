@@ -0,0 +1,123 @@
+"""Module for solving game-states lazily, i.e. without building the entire game-tree.
+
+A GameTree contains every descendant of its root before it can answer anything. For big games, this costs
+time and memory, even if only a few game-states are ever asked for.
+
+A LazySolver computes the winning flag of a game-state on demand, by a depth-first search over the states that are
+reachable from it. The search stops at the first successor with winning == -1, see module game_trees.
+The computed flags are memoized in a cache, keyed by the keys of the normalized game-states.
+The cache is bounded: when it is full, the least recently used flag is evicted (and recomputed if needed again).
+
+A LazySolver offers the same operations as a GameTree that are needed for playing: find and select_move.
+It can therefore be used as backend of solver.solve, see solver.set_backend.
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import Dict, List, Tuple  # for type annotations
+
+import collections
+import random
+
+from models.game_states import GameState, GameMove, successor_keys
+from models.rulesets import Ruleset, STANDARD
+
+rand = random.Random()
+rand.seed(a=1)  # a=1 for reproducibility
+
+Key = Tuple[int, ...]
+# The key of a normalized game-state, see GameState.key
+
+
+class LazyNode:
+    """A node computed by a LazySolver, offering the same interface as GameNode for playing.
+
+    Attributes:
+        solver: LazySolver
+            The solver that computed the node.
+        key: Key
+            The key of the normalized game-state of the node.
+        winning: int
+            The winning flag of the node.
+    """
+
+    __slots__ = ('solver', 'key', 'winning')
+
+    def __init__(self, solver: LazySolver, key: Key, winning: int):
+        self.solver: LazySolver = solver
+        self.key: Key = key
+        self.winning: int = winning
+
+    def select_move(self) -> Tuple[GameMove, int]:
+        """See GameNode.select_move."""
+        return self.solver.select_move(self.key)
+
+
+class LazySolver:
+    """Computes winning flags and moves on demand, memoizing the flags in a bounded LRU cache.
+
+    Attributes:
+        ruleset: Ruleset
+            The ruleset of the game-states.
+        max_size: int
+            Maximal number of flags in the cache.
+        hits: int
+            Number of flags found in the cache.
+        misses: int
+            Number of flags not found in the cache, i.e. computed.
+    """
+
+    def __init__(self, max_size: int = 100000, ruleset: Ruleset = STANDARD):
+        assert max_size >= 1
+        self.ruleset: Ruleset = ruleset
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._cache: collections.OrderedDict = collections.OrderedDict()
+
+    def winning(self, key: Key) -> int:
+        """Return the winning flag of the normalized game-state with key."""
+        flag = self._cache.get(key)
+        if flag is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return flag
+        self.misses += 1
+        flag = -1
+        for s_key, _ in successor_keys(key, self.ruleset.max_take):
+            if self.winning(s_key) == -1:  # recursive call, its depth is at most the total count of matches
+                flag = 1
+                break
+        self._cache[key] = flag
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return flag
+
+    def find(self, game_state: GameState) -> LazyNode:
+        """Return the node containing the normalized game_state."""
+        assert game_state.is_normalized()
+        assert game_state.ruleset == self.ruleset
+        key = game_state.key()
+        return LazyNode(self, key, self.winning(key))
+
+    def candidates(self, key: Key) -> List[Key]:
+        """Return the keys of the successors that are candidates for the next move, see GameNode.select_move."""
+        if self.winning(key) == 1:
+            return [s_key for s_key, _ in successor_keys(key, self.ruleset.max_take) if self.winning(s_key) == -1]
+        else:
+            total_count = sum(key)
+            return [s_key for s_key, s_n in successor_keys(key, self.ruleset.max_take) if s_n == total_count - 1]
+
+    def select_move(self, key: Key) -> Tuple[GameMove, int]:
+        """Select a move leading from the normalized game-state with key to a successor, see GameNode.select_move.
+        :return: 0: selected game move
+                 1: winning flag of the successor.
+        """
+        candidates = self.candidates(key)
+        assert len(candidates) > 0
+        s_key = rand.choice(candidates)
+        game_move = GameState.from_key(key, self.ruleset).get_move(GameState.from_key(s_key, self.ruleset))
+        return game_move, self.winning(s_key)
+
+    def cache_info(self) -> Dict[str, int]:
+        """Return the statistics of the cache."""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache), 'max_size': self.max_size}
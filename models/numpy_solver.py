@@ -0,0 +1,172 @@
+"""Module for solving a game with NumPy, one layer at a time.
+
+GameTree walks the game one state at a time, allocating lists and objects for every state and edge.
+This module represents all normalized states of a layer (see module game_trees) as a 2-D integer array,
+one state per line, and solves the layer with batched array operations:
+    (1) For each row index k and match count c, the successors are generated by subtracting c from column k.
+    (2) They are normalized by sorting each line.
+    (3) Their ranks are computed arithmetically, see module state_ranks, and their winning flags are looked up
+        in the flat array of flags by rank, which is known for all layers below.
+    (4) The flag of a state is 1 iff a valid successor has flag -1.
+The states themselves are enumerated in lexicographic order, i.e. in the order of their ranks.
+
+NumPy is an optional dependency. If it is not installed, NumpyTree raises Error.
+
+A NumpyTree offers the same operations as a GameTree that are needed for playing: find and select_move.
+It can therefore be used as backend of solver.solve, see solver.set_backend.
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import List, Tuple  # for type annotations
+
+import random
+
+from models.game_states import GameState, GameMove, successor_keys
+from models.rulesets import Ruleset
+from models.state_ranks import StateRanker
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+rand = random.Random()
+rand.seed(a=1)  # a=1 for reproducibility
+
+
+class Error(Exception):
+    """Class for exceptions of this module."""
+
+    @classmethod
+    def check(cls, condition, *args):
+        if not condition:
+            raise cls(*args)
+
+
+def enumerate_states(root_rows: List[int]) -> np.ndarray:
+    """Return all normalized rows below root_rows (see module state_ranks), in lexicographic order,
+    as an array with 1 line per state.
+    """
+    states = np.zeros((1, 0), dtype=np.int64)
+    for cap in root_rows:
+        # append a column with all values from the last column (0 for the first one) to cap
+        last = states[:, -1] if states.shape[1] > 0 else np.zeros(len(states), dtype=np.int64)
+        counts = np.maximum(cap - last + 1, 0)
+        lines = np.repeat(np.arange(len(states)), counts)
+        starts = np.cumsum(counts) - counts
+        values = last[lines] + np.arange(len(lines)) - np.repeat(starts, counts)
+        states = np.column_stack([states[lines], values])
+    return states
+
+
+def rank_states(ranker: StateRanker, states: np.ndarray) -> np.ndarray:
+    """Return the ranks of the normalized rows in the lines of states, see StateRanker.rank."""
+    counts = np.array(ranker.counts[:-1], dtype=np.int64)
+    m = states.shape[1]
+    prev = np.column_stack([np.zeros(len(states), dtype=np.int64), states[:, :-1]])
+    k = np.arange(m)
+    return (counts[k, prev] - counts[k, states]).sum(axis=1)
+
+
+class NumpyNode:
+    """A node of a NumpyTree, offering the same interface as GameNode for playing.
+
+    Attributes:
+        tree: NumpyTree
+            The tree containing the node.
+        key: Tuple[int, ...]
+            The key of the normalized game-state of the node.
+        winning: int
+            The winning flag of the node.
+    """
+
+    __slots__ = ('tree', 'key', 'winning')
+
+    def __init__(self, tree: NumpyTree, key: Tuple[int, ...], winning: int):
+        self.tree: NumpyTree = tree
+        self.key: Tuple[int, ...] = key
+        self.winning: int = winning
+
+    def select_move(self) -> Tuple[GameMove, int]:
+        """See GameNode.select_move."""
+        return self.tree.select_move(self.key)
+
+
+class NumpyTree:
+    """Models a game solved with NumPy: the winning flags of all normalized states by rank.
+
+    Attributes:
+        ruleset: Ruleset
+            The ruleset of the game.
+        ranker: StateRanker
+            Ranks the normalized states of the game.
+        winning: np.ndarray
+            The winning flags by rank, 0 for the state with 0 matches.
+        node_count: int
+            Number of states with at least 1 match.
+
+    Example:
+        NumpyTree(GameState([1,2,3,4,5])) solves the standard game.
+    """
+
+    def __init__(self, game_state: GameState):
+        """Solve the game whose root is the normalized game_state.
+        :raise: Error, if numpy is not installed.
+        """
+        Error.check(np is not None, "numpy is not installed")
+        assert game_state.is_normalized()
+        self.ruleset: Ruleset = game_state.ruleset
+        self.ranker: StateRanker = StateRanker(game_state.rows)
+        self.node_count: int = self.ranker.size - 1
+        self.winning: np.ndarray = np.zeros(self.ranker.size, dtype=np.int8)
+        states = enumerate_states(game_state.rows)  # in the order of their ranks
+        assert len(states) == self.ranker.size
+        totals = states.sum(axis=1)
+        ranks = np.arange(self.ranker.size)
+        for n in range(1, game_state.get_total_count() + 1):
+            in_layer = totals == n
+            self.winning[ranks[in_layer]] = self._solve_layer(states[in_layer], n)
+
+    def _solve_layer(self, states: np.ndarray, n: int) -> np.ndarray:
+        """Return the winning flags of the normalized states, which all have total count n.
+        The flags of all states with total count < n must be known.
+        """
+        minus1_found = np.zeros(len(states), dtype=bool)
+        for count in range(1, min(self.ruleset.max_take, n - 1) + 1):
+            for k in range(states.shape[1]):
+                possible = states[:, k] >= count
+                if not possible.any():
+                    continue
+                successors = states[possible]
+                successors[:, k] -= count
+                successors.sort(axis=1)
+                s_winning = self.winning[rank_states(self.ranker, successors)]
+                minus1_found[possible] |= s_winning == -1
+        return np.where(minus1_found, 1, -1).astype(np.int8)
+
+    def find(self, game_state: GameState) -> NumpyNode or None:
+        """Return the node containing game_state, None if not found."""
+        rank = self.ranker.rank(game_state.rows)
+        if rank is None or rank == 0:
+            return None
+        return NumpyNode(self, game_state.key(), int(self.winning[rank]))
+
+    def candidates(self, key: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        """Return the keys of the successors that are candidates for the next move, see GameNode.select_move."""
+        flags = [(s_key, s_n, int(self.winning[self.ranker.rank(s_key)]))
+                 for s_key, s_n in successor_keys(key, self.ruleset.max_take)]
+        if self.winning[self.ranker.rank(key)] == 1:
+            return [s_key for s_key, _, s_winning in flags if s_winning == -1]
+        else:
+            return [s_key for s_key, s_n, _ in flags if s_n == sum(key) - 1]
+
+    def select_move(self, key: Tuple[int, ...]) -> Tuple[GameMove, int]:
+        """Select a move leading from the normalized state with key to a successor, see GameNode.select_move.
+        :return: 0: selected game move
+                 1: winning flag of the successor.
+        """
+        candidates = self.candidates(key)
+        assert len(candidates) > 0
+        s_key = rand.choice(candidates)
+        game_move = GameState.from_key(key, self.ruleset).get_move(GameState.from_key(s_key, self.ruleset))
+        return game_move, int(self.winning[self.ranker.rank(s_key)])
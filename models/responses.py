@@ -0,0 +1,141 @@
+"""Module with the precomputed responses of the endpoint /next_move, see the app.
+
+A ruleset whose rows are written with 1 digit each has few raw game-states, e.g. the standard game has 719, see
+module canonical_tables. A ResponseTable contains the encoded json responses of /next_move for all of them:
+    Level 1 is deterministic: 1 response per game-state.
+    Level 0 chooses a row with matches and then a match count, both uniformly, see solver.solve.
+        The table contains the responses grouped by row, thus picking a group and then a response in the group
+        gives the same distribution.
+    Level 2 chooses uniformly among the candidates of the node of the game-state, see GameNode.select_move.
+        The table contains 1 response per candidate.
+Thus, a request is answered with a dict lookup plus a random pick, the model code is not run at all.
+
+The path of a request is checked by a precompiled regular expression, before the table is used. Requests with an
+invalid path, an invalid level or query parameters are not answered by the table: the app computes them as before,
+which also gives the error messages.
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import Dict, Tuple  # for type annotations
+
+import itertools
+import json
+import random
+import re
+
+from models import solver, canonical_tables
+from models.game_states import GameState, GameMove
+from models.rulesets import Ruleset, STANDARD
+from utils import metrics
+
+rand = random.Random()
+rand.seed(a=1)  # a=1 for reproducibility
+
+LOOKUPS = metrics.Counter("matchtaker_precomputed_total", "Responses of /next_move from the table by level, they are "
+                          "not in matchtaker_solve_seconds.", ["level"])
+
+
+class Error(Exception):
+    """Class for exceptions of this module."""
+
+    @classmethod
+    def check(cls, condition, *args):
+        """Check condition and raise exception if it does not hold."""
+        if not condition:
+            raise cls(*args)
+
+
+def encode(game_move: GameMove or None, game_continues: int) -> bytes:
+    """Return the response of /next_move for the result of solver.solve."""
+    result = {"gameContinues": game_continues}
+    if game_continues >= 0:
+        result["rowIndex"] = game_move.row_index
+        result["numberOfMatches"] = game_move.match_count
+    return json.dumps(result).encode()
+
+
+def game_continues(total_count: int, game_move: GameMove, winning: int = 0) -> int:
+    """Return gameContinues for a move with the total count of matches before the move, see solver.solve.
+    :param winning: the winning flag of the node after the move, 0 if unknown.
+    """
+    if total_count - game_move.match_count <= 1:
+        return 0
+    return {0: 1, 1: 2, -1: 3}[winning]
+
+
+Entry = Tuple[Tuple[Tuple[bytes, ...], ...], bytes, Tuple[bytes, ...]]
+# The responses of a game-state for the levels 0, 1 and 2, see module doc.
+
+
+class ResponseTable:
+    """Contains the encoded responses of /next_move for all game-states of a ruleset.
+
+    Attributes:
+        ruleset: Ruleset
+            The ruleset of the game-states.
+        pattern: re.Pattern
+            The regular expression matching the rows_state of all game-states of the ruleset, and some more:
+            the state without matches is not in the table.
+        size: int
+            Number of game-states in the table.
+    """
+
+    def __init__(self, ruleset: Ruleset = STANDARD, backend=None):
+        """Compute the responses.
+        :param backend: computes the moves of level 2, see solver.set_backend. Its nodes must offer candidate_moves,
+            like GameNode and CompactNode. Default: the backend of solver.
+        :raise: Error, if the rows of the ruleset are not written with 1 digit or if it has too many game-states.
+        """
+        Error.check(ruleset.row_caps[-1] <= 9, "the rows must be written with 1 digit")
+        Error.check(canonical_tables.raw_state_count(ruleset) <= canonical_tables.MAX_TABLE_SIZE,
+                    "the ruleset has too many game-states")
+        backend = backend if backend is not None else solver.get_backend()
+        Error.check(backend.ruleset in [None, ruleset], f"the backend cannot solve {ruleset}")
+        self.ruleset: Ruleset = ruleset
+        self.pattern: re.Pattern = re.compile("".join([f"[0-{cap}]" for cap in ruleset.row_caps]))
+        self._entries: Dict[str, Entry] = {}
+        for rows in itertools.product(*[range(cap + 1) for cap in ruleset.row_caps]):
+            if sum(rows) > 0:
+                self._entries["".join([str(x) for x in rows])] = self._compute_entry(rows, backend)
+        self.size: int = len(self._entries)
+
+    def _compute_entry(self, rows: Tuple[int, ...], backend) -> Entry:
+        """Compute the responses of the game-state with rows."""
+        n = sum(rows)
+        if n == 1:
+            response = encode(None, -1)
+            return ((response,),), response, (response,)
+        ruleset = self.ruleset
+        # level 0
+        non_zeros = [k for k in range(len(rows)) if rows[k] > 0]
+        groups = []
+        for row_index in non_zeros:
+            max_n = min(ruleset.max_take, rows[row_index])
+            if len(non_zeros) == 1:
+                max_n = min(max_n, rows[row_index] - 1)
+            moves = [GameMove(row_index, match_count, ruleset) for match_count in range(1, max_n + 1)]
+            groups.append(tuple([encode(game_move, game_continues(n, game_move)) for game_move in moves]))
+        # level 1
+        game_state = GameState(list(rows), ruleset)
+        response1 = encode(*solver.solve(game_state, 1))
+        # level 2
+        normalized_state, row_map = canonical_tables.canonicalize(game_state)
+        responses2 = []
+        for game_move, winning in backend.find(normalized_state).candidate_moves():
+            game_move = GameMove(row_map[game_move.row_index], game_move.match_count, ruleset)
+            responses2.append(encode(game_move, game_continues(n, game_move, winning)))
+        return tuple(groups), response1, tuple(responses2)
+
+    def lookup(self, rows_state: str, level: int) -> bytes or None:
+        """Return a response of /next_move for rows_state and level, None if they are not in the table."""
+        if level not in (0, 1, 2) or not self.pattern.fullmatch(rows_state):
+            return None
+        entry = self._entries.get(rows_state)
+        if entry is None:
+            return None
+        LOOKUPS.inc(solver.LEVEL_LABELS[level])
+        if level == 1:
+            return entry[1]
+        if level == 0:
+            return rand.choice(rand.choice(entry[0]))
+        return rand.choice(entry[2])
@@ -0,0 +1,83 @@
+"""Module defining rulesets, i.e. the variants of the game.
+
+A ruleset defines:
+    the number of rows,
+    the capacity of each row, i.e. the maximal number of matches in the row,
+    the maximal number of matches taken by a move (at least 1 match must be taken).
+The standard game has 5 rows, the row with index k has capacity k+1, and a move takes at most 3 matches.
+
+The capacities must be in ascending order, so that the normalization of a valid game-state is valid, too.
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import List, Tuple  # for type annotations
+
+
+class Error(Exception):
+    """Class for exceptions of this module."""
+
+    @classmethod
+    def check(cls, condition, *args):
+        """Check condition and raise exception if it does not hold."""
+        if not condition:
+            raise cls(*args)
+
+
+class Ruleset:
+    """Models a ruleset. Rulesets are immutable and hashable.
+
+    Attributes:
+        row_caps: Tuple[int, ...]
+            The capacities of the rows, in ascending order.
+        max_take: int
+            Maximal number of matches taken by a move.
+    """
+
+    def __init__(self, row_caps: List[int], max_take: int = 3):
+        Error.check(len(row_caps) >= 1, "a ruleset must have at least 1 row")
+        Error.check(all([isinstance(x, int) and 1 <= x <= 255 for x in row_caps]),
+                    "row capacities must be integers in 1..255")
+        Error.check(all([row_caps[k] <= row_caps[k+1] for k in range(len(row_caps) - 1)]),
+                    "row capacities must be in ascending order")
+        Error.check(isinstance(max_take, int) and 1 <= max_take <= 255, "max take must be an integer in 1..255")
+        self._row_caps: Tuple[int, ...] = tuple(row_caps)
+        self._max_take: int = max_take
+        self._hash: int = hash((self._row_caps, self._max_take))  # rulesets are hashed often, see GameState
+
+    @property
+    def row_caps(self) -> Tuple[int, ...]:
+        return self._row_caps
+
+    @property
+    def max_take(self) -> int:
+        return self._max_take
+
+    @property
+    def row_count(self) -> int:
+        return len(self._row_caps)
+
+    @property
+    def row_bits(self) -> int:
+        """Number of bits needed for the match count of any row, see game_states.pack."""
+        return self._row_caps[-1].bit_length()
+
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            return self._row_caps == other._row_caps and self._max_take == other._max_take
+        else:
+            return NotImplemented
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"Ruleset({list(self._row_caps)}, {self._max_take})"
+
+    @classmethod
+    def triangle(cls, row_count: int, max_take: int = 3) -> Ruleset:
+        """Return the ruleset with row_count rows, where the row with index k has capacity k+1."""
+        return cls(list(range(1, row_count + 1)), max_take)
+
+
+STANDARD = Ruleset.triangle(5, 3)
+# The ruleset of the standard game.
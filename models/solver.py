@@ -1,13 +1,51 @@
 """Module providing a function for computing game-moves.
 
+The best moves (level 2) are computed by a backend, which must offer the method find(game_state) returning a node
+with the attribute winning and the method select_move(), like GameTree and GameNode. The backend must also have
+the attribute ruleset: the ruleset of the game-states it can solve, None if it can solve any ruleset.
+By default, the backend is the current tree, see game_trees.current_tree. Another backend can be set with
+set_backend, e.g. a LazySolver, which does not need to build the tree of the entire game.
+If the backend cannot solve the ruleset of a game-state, or if another root of the game is requested, the tree
+is taken from the tree registry, see module tree_registry.
+The durations of solve are recorded per level, see module utils.metrics.
 """
 import random
+import time
 from models.game_states import GameState, GameMove
 from models.game_trees import current_tree
+from models import tree_registry, canonical_tables
+from utils import metrics
 
 rand = random.Random()
 rand.seed(a=1)  # a=1 for reproducibility
 
+SOLVE_SECONDS = metrics.Histogram("matchtaker_solve_seconds", "Duration of solver.solve by level, without the "
+                                  "precomputed responses of /next_move.", ["level"])
+ERRORS = metrics.Counter("matchtaker_errors_total", "Invalid requests by exception, e.g. solver.Error.", ["error"])
+
+LEVEL_LABELS = ("0", "1", "2")
+# The label values of the levels.
+
+
+def count_error(e: Exception) -> None:
+    """Count the exception e of an invalid request, see ERRORS."""
+    ERRORS.inc(f"{type(e).__module__.rsplit('.', 1)[-1]}.{type(e).__name__}")
+
+
+_backend = None
+# See set_backend.
+
+
+def set_backend(backend=None) -> None:
+    """Set the backend for computing the best moves, None for the current tree."""
+    global _backend
+    _backend = backend
+
+
+def get_backend():
+    """Return the backend for computing the best moves, see set_backend."""
+    return _backend if _backend is not None else current_tree()
+
 
 class Error(Exception):
     """Class for exceptions of this module."""
@@ -19,10 +57,12 @@ class Error(Exception):
             raise cls(*args)
 
 
-def solve(game_state: GameState, level: int) -> (GameMove or None, int):
+def solve(game_state: GameState, level: int, root: GameState = None) -> (GameMove or None, int):
     """Compute the next move.
-    :param game_state: a valid game_state
+    :param game_state: a valid game_state, of any ruleset.
     :param level: the smartness level, must be in 0..2.
+    :param root: the normalized root of the game, only used for level 2. If given, the tree of this root is
+        taken from the tree registry. game_state must be a descendant of root.
     :return: result[0] the game-move
              result[1] game continues, int in [-1, 0, 1, 2, 3]
                        -1 : "You won". Occurs when input game_state contains exactly 1 match.
@@ -32,42 +72,54 @@ def solve(game_state: GameState, level: int) -> (GameMove or None, int):
                         1 : game continues -- no further information
                         2 : game continues -- you have a safe strategy to win.
                         3 : game continues -- your opponent (i.e. I) has a safe strategy to win
-    :raise: Error, if level invalid.
+    :raise: Error, if level invalid or if level is 2 and game_state is not a descendant of root.
     """
     Error.check(0 <= level <= 2, "level must be an integer in 0..2")
+    t = time.perf_counter()
     rows = game_state.get_rows()
+    ruleset = game_state.ruleset
 
     # sub functions
 
     def random_move() -> GameMove:
         """Choose randomly one of the possible moves."""
-        non_zeros = [k for k in range(5) if rows[k] > 0]  # all indices with value > 0
+        non_zeros = [k for k in range(len(rows)) if rows[k] > 0]  # all indices with value > 0
         row_index = rand.choice(non_zeros)  # choose such index
-        max_n = min(3, rows[row_index])  # max number of matches to be taken at this index
+        max_n = min(ruleset.max_take, rows[row_index])  # max number of matches to be taken at this index
         if len(non_zeros) == 1:  # special case: only this row has matches --> must not make_move all
             max_n = min(max_n, rows[row_index] - 1)
         match_count = rand.randint(1, max_n)  # choose number of matches at this index
-        return GameMove(row_index, match_count)
+        return GameMove(row_index, match_count, ruleset)
 
     def most_first() -> GameMove:
         """Choose a row with the most matches and take as many matches as possible."""
-        p = game_state.normalize()
-        sorted_rows = game_state.get_rows()
-        match_count = min(3, sorted_rows[4])  # max number of matches
-        if sorted_rows[3] == 0:  # special case: only this row has matches --> must not take all
-            match_count = min(match_count, sorted_rows[4] - 1)
-        row_index = p(4)
-        return GameMove(row_index, match_count)
+        normalized_state, row_map = canonical_tables.canonicalize(game_state)
+        sorted_rows = normalized_state.rows
+        last = len(sorted_rows) - 1
+        match_count = min(ruleset.max_take, sorted_rows[last])  # max number of matches
+        if last == 0 or sorted_rows[last - 1] == 0:  # special case: only this row has matches --> must not take all
+            match_count = min(match_count, sorted_rows[last] - 1)
+        row_index = row_map[last]
+        return GameMove(row_index, match_count, ruleset)
 
     def best_move() -> (GameMove, int):
         """Choose best possible move, if several exist, choose one randomly.
         Return also the winning flag of the resulting node.
         """
-        p = game_state.normalize()
-        node = current_tree().find(game_state)
+        if root is not None:
+            Error.check(root.ruleset == ruleset, f"root must have {ruleset}")
+            backend = tree_registry.registry().get(root)
+        else:
+            backend = get_backend()
+            if backend.ruleset not in [None, ruleset]:
+                backend = tree_registry.registry().get(GameState(list(ruleset.row_caps), ruleset))  # full game
+        normalized_state, row_map = canonical_tables.canonicalize(game_state)
+        Error.check(root is None or game_state.get_total_count() <= root.get_total_count(),
+                    "game state is not a descendant of the root")
+        node = backend.find(normalized_state)
+        Error.check(node is not None, "game state is not a descendant of the root")
         _game_move, _winning = node.select_move()
-        _game_move.row_index = p(_game_move.row_index)
-        return _game_move, _winning
+        return GameMove(row_map[_game_move.row_index], _game_move.match_count, ruleset), _winning
 
     # todo: new intermediate level between 1 and 2: start randomly, switch to best when more than half of
     # the matches have been taken.
@@ -87,7 +139,7 @@ def solve(game_state: GameState, level: int) -> (GameMove or None, int):
             game_move = most_first()
         else:
             game_move, winning = best_move()
-        assert 1 <= game_move.match_count <= min(3, rows[game_move.row_index])
+        assert 1 <= game_move.match_count <= min(ruleset.max_take, rows[game_move.row_index])
         # check whether I won or game continues
         assert sum(rows) - game_move.match_count > 0
         if sum(rows) - game_move.match_count > 1:
@@ -101,4 +153,5 @@ def solve(game_state: GameState, level: int) -> (GameMove or None, int):
     # you won
     else:
         assert sum(rows) == 1
+    SOLVE_SECONDS.observe(time.perf_counter() - t, LEVEL_LABELS[level])
     return game_move, game_continues
@@ -0,0 +1,75 @@
+"""Module for ranking normalized game-states, i.e. mapping them to dense integer indices and back.
+
+Given a normalized root game-state with rows r, the normalized game-states that can occur in its game are the
+sorted row lists s with s[k] <= r[k] for all k, see module game_trees. These are sorted multisets with per-row caps,
+therefore they can be enumerated in lexicographic order arithmetically, like the combinations of the combinatorial
+number system. The rank of s is its index in this enumeration. The rank is a perfect hash: the ranks of all
+such states form the range 0 .. size-1.
+Note: the range also contains the state with 0 matches, which has rank 0.
+
+Counting is done with the table counts:
+    counts[k][v] is the number of sorted sequences s[k], .., s[m-1] with v <= s[k] and s[j] <= r[j] for all j >= k,
+    where m is the number of rows.
+The number of sequences with a given prefix s[0], .., s[k-1] and s[k] < x is counts[k][s[k-1]] - counts[k][x].
+Summing these numbers for all k gives the rank.
+
+Example:
+    StateRanker([1, 2, 3, 4, 5]).rank([0, 0, 0, 0, 1]) == 1
+    StateRanker([1, 2, 3, 4, 5]).size == 132
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import List  # for type annotations
+
+from models.game_states import Rows
+
+
+class StateRanker:
+    """Ranks the normalized game-states of a game.
+
+    Attributes:
+        root_rows: Rows
+            The rows of the normalized root game-state, they are the caps of the ranked states.
+        size: int
+            Number of ranked states, including the state with 0 matches.
+        counts: List[List[int]]
+            The table of counts, see module doc. It has an additional line of ones for k == number of rows.
+    """
+
+    def __init__(self, root_rows: Rows):
+        assert all([root_rows[k] <= root_rows[k+1] for k in range(len(root_rows) - 1)])
+        self.root_rows: Rows = list(root_rows)
+        m = len(root_rows)
+        top = root_rows[-1]
+        # counts[k][v] for v in 0 .. top+1
+        self.counts: List[List[int]] = [[0] * (top + 2) for _ in range(m)] + [[1] * (top + 2)]
+        for k in range(m - 1, -1, -1):
+            for v in range(top, -1, -1):
+                self.counts[k][v] = self.counts[k][v+1] + (self.counts[k+1][v] if v <= root_rows[k] else 0)
+        self.size: int = self.counts[0][0]
+
+    def rank(self, rows: Rows) -> int or None:
+        """Return the rank of the normalized rows, None if rows is not sorted or exceeds the root rows."""
+        result = 0
+        prev = 0
+        for k, x in enumerate(rows):
+            if x < prev or x > self.root_rows[k]:
+                return None
+            counts = self.counts[k]
+            result += counts[prev] - counts[x]
+            prev = x
+        return result
+
+    def unrank(self, rank: int) -> Rows:
+        """Return the normalized rows with the given rank."""
+        assert 0 <= rank < self.size
+        rows = []
+        prev = 0
+        for counts in self.counts[:-1]:
+            x = prev
+            while counts[prev] - counts[x+1] <= rank:
+                x += 1
+            rank -= counts[prev] - counts[x]
+            rows.append(x)
+            prev = x
+        return rows
@@ -0,0 +1,182 @@
+"""Module for tournaments of self-play: the levels of solver.solve play against each other in process.
+
+A match is a series of games between 2 levels, the first level always makes the first move. Each move is computed
+by solver.solve, with the root of the game given, such that level 2 uses the solved tree of the root from the
+tree registry (see module tree_registry). Thus, the levels play exactly as in the app.
+A game ends, when the player to move finds exactly 1 match: this player has lost.
+
+A tournament plays a match for each ordered pair of levels. The games of a match are played in chunks of
+CHUNK_SIZE games. Before each chunk, the random generators of the solver modules are seeded with the seed of the
+tournament, the pair of levels and the index of the chunk. Therefore, the results only depend on the seed, and not
+on the number of processes: the chunks can be played in parallel by a pool of processes.
+
+Usage: python -m models.tournaments [--root 12345] [--levels 0,1,2] [--games 1000] [--seed 1] [--workers 1]
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import List, Tuple  # for type annotations
+
+import argparse
+import concurrent.futures
+import time
+
+from models import solver, game_trees, compact_trees
+from models.game_states import GameState
+from models.rulesets import Ruleset, STANDARD
+
+CHUNK_SIZE = 1000
+# Number of games played with 1 seed, see module doc.
+
+
+class MatchResult:
+    """Models the result of the games between 2 levels.
+
+    Attributes:
+        first_level: int
+            The level making the first move of each game.
+        second_level: int
+            The other level.
+        games: int
+            Number of games played.
+        first_wins: int
+            Number of games won by the first level.
+        moves: int
+            Total number of moves of all games.
+        seconds: float
+            Time used for playing the games, summed up over all processes.
+    """
+
+    def __init__(self, first_level: int, second_level: int):
+        self.first_level: int = first_level
+        self.second_level: int = second_level
+        self.games: int = 0
+        self.first_wins: int = 0
+        self.moves: int = 0
+        self.seconds: float = 0.0
+
+    def merge(self, other: MatchResult) -> None:
+        """Add the games of other, which must be a result of the same levels."""
+        assert (other.first_level, other.second_level) == (self.first_level, self.second_level)
+        self.games += other.games
+        self.first_wins += other.first_wins
+        self.moves += other.moves
+        self.seconds += other.seconds
+
+    def win_rate(self) -> float:
+        """Return the rate of games won by the first level."""
+        return self.first_wins / self.games if self.games > 0 else 0.0
+
+    def average_length(self) -> float:
+        """Return the average number of moves of a game."""
+        return self.moves / self.games if self.games > 0 else 0.0
+
+    def games_per_second(self) -> float:
+        return self.games / self.seconds if self.seconds > 0 else 0.0
+
+
+def seed(value: str) -> None:
+    """Seed the random generators of the modules used by solver.solve."""
+    for module in [solver, game_trees, compact_trees]:
+        module.rand.seed(value)
+
+
+def play_game(root: GameState, first_level: int, second_level: int) -> Tuple[int, int]:
+    """Play a game starting with root.
+    :return: 0: index of the winner, 0 for the first level, 1 for the second level
+             1: number of moves
+    """
+    levels = (first_level, second_level)
+    game_state = root
+    moves = 0
+    while True:
+        player = moves % 2
+        game_move, game_continues = solver.solve(game_state, levels[player], root)
+        if game_continues == -1:  # the player found 1 match
+            return 1 - player, moves
+        moves += 1
+        if game_continues == 0:  # the player left 1 match
+            return player, moves
+        game_state = game_state.make_move(game_move)
+
+
+def play_chunk(root: GameState, first_level: int, second_level: int, games: int, chunk_seed: str) -> MatchResult:
+    """Play games between 2 levels with a seed, see module doc. This function also runs in the processes of the pool.
+    :return: the result of the games.
+    """
+    seed(chunk_seed)
+    result = MatchResult(first_level, second_level)
+    t = time.perf_counter()
+    for _ in range(games):
+        winner, moves = play_game(root, first_level, second_level)
+        result.games += 1
+        result.first_wins += 1 - winner
+        result.moves += moves
+    result.seconds = time.perf_counter() - t
+    return result
+
+
+def play_tournament(root: GameState, levels: List[int], games: int, tournament_seed: int = 1, workers: int = 1) \
+        -> List[MatchResult]:
+    """Play a match of games games for each ordered pair of levels.
+    :param root: the normalized game-state, where all games start.
+    :param workers: number of processes, 1 for playing in this process.
+    :return: the results of the matches.
+    """
+    assert root.is_normalized()
+    tasks = [(first_level, second_level, min(CHUNK_SIZE, games - start), f"{tournament_seed}:{first_level}:"
+              f"{second_level}:{start // CHUNK_SIZE}")
+             for first_level in levels for second_level in levels for start in range(0, games, CHUNK_SIZE)]
+    if workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(play_chunk, root, *task) for task in tasks]
+            chunk_results = [future.result() for future in futures]
+    else:
+        chunk_results = [play_chunk(root, *task) for task in tasks]
+    results = [MatchResult(first_level, second_level) for first_level in levels for second_level in levels]
+    for chunk_result in chunk_results:
+        results[levels.index(chunk_result.first_level) * len(levels) + levels.index(chunk_result.second_level)] \
+            .merge(chunk_result)
+    return results
+
+
+def report(results: List[MatchResult], seconds: float = None) -> str:
+    """Return a table of the results.
+    :param seconds: the wall clock time of the tournament, if given, the total games per second are added.
+    """
+    lines = [f"{'first':>6}{'second':>8}{'games':>10}{'first wins':>12}{'win rate':>10}{'avg moves':>11}"
+             f"{'games/s':>10}"]
+    for result in results:
+        lines.append(f"{result.first_level:>6}{result.second_level:>8}{result.games:>10}{result.first_wins:>12}"
+                     f"{result.win_rate():>10.3f}{result.average_length():>11.2f}{result.games_per_second():>10.0f}")
+    if seconds is not None:
+        games = sum([result.games for result in results])
+        lines.append(f"total: {games} games in {seconds:.2f} s, {games / seconds:.0f} games/s")
+    return "\n".join(lines)
+
+
+def main(args=None):
+    """Play a tournament and print its report, see module doc."""
+    parser = argparse.ArgumentParser(description="Play the levels of the solver against each other.")
+    parser.add_argument('--root', default='12345', help="rows of the normalized root, e.g. 12345 or 1,2,3,4,5")
+    parser.add_argument('--caps', help="row capacities of the ruleset, e.g. 12345 (default: 1, 2, .. per row)")
+    parser.add_argument('--take', type=int, default=STANDARD.max_take, help="max take of the ruleset")
+    parser.add_argument('--levels', default='0,1,2', help="the levels playing, e.g. 0,2")
+    parser.add_argument('--games', type=int, default=1000, help="number of games per pair of levels")
+    parser.add_argument('--seed', type=int, default=1, help="seed of the tournament")
+    parser.add_argument('--workers', type=int, default=1, help="number of processes")
+    args = parser.parse_args(args)
+
+    def to_list(text: str) -> List[int]:
+        return [int(c) for c in (text.split(',') if ',' in text else text)]
+
+    root_rows = to_list(args.root)
+    ruleset = Ruleset(to_list(args.caps), args.take) if args.caps else Ruleset.triangle(len(root_rows), args.take)
+    root = GameState(root_rows, ruleset).normalized()[0]
+    t = time.perf_counter()
+    results = play_tournament(root, to_list(args.levels), args.games, args.seed, args.workers)
+    print(f"root {root}, {ruleset}, seed {args.seed}")
+    print(report(results, time.perf_counter() - t))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""Module for writing solved game-trees to binary files and loading them.
+
+Solving the game at every startup of the app is not necessary: a tree can be solved once, written to a file,
+and every process of the app just reads the file. The file contains the arrays of a CompactTree,
+i.e. the states, the winning flags, the edges and the candidates for the next moves of all nodes.
+
+File format, all integers little-endian:
+    header:    magic b'MTTF', format version (2 bytes), row count (2 bytes), node count (4 bytes),
+               max take of the ruleset (2 bytes), 2 pad bytes
+    row caps:  the row capacities of the ruleset, 1 byte per row
+    root rows: 1 byte per row
+    arrays:    for each array of CompactTree.ARRAY_NAMES:
+                   typecode (1 byte), 3 pad bytes, item count (4 bytes), the items
+    checksum:  crc32 of all preceding bytes (4 bytes)
+Each part is padded with zero bytes to a multiple of 8 bytes, thus all arrays are aligned in the file.
+
+A file is "stale", if it cannot be used for the requested game: its format version differs from FORMAT_VERSION,
+it is damaged (checksum) or it contains the tree of another root or ruleset.
+
+A tree file can also be mapped into memory instead of being read, see map_tree. Then the arrays of the tree are
+views on the pages of the file, which are shared by all processes mapping the file. When the app runs with several
+worker processes (e.g. gunicorn --preload), the memory used by the tree does not grow with the number of workers,
+and since the arrays are no Python objects, reference counting never writes to these pages.
+
+To build the file of the standard game from the command line (the current dir must be the project dir):
+    $ python -m models.tree_files
+    $ python -m models.tree_files --root 01234 data/tree_01234.bin
+    $ python -m models.tree_files --root 1,2,3,4,5,6,7,8 --take 4 data/tree_12345678_4.bin
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import List, Tuple  # for type annotations
+
+import argparse
+import array
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from models.game_states import GameState, Rows
+from models.rulesets import Ruleset, STANDARD
+from models.game_trees import GameTree
+from models.compact_trees import CompactTree
+
+import logging
+
+MAGIC = b'MTTF'
+FORMAT_VERSION = 2
+# Increment, when the format or the semantics of the contents change. Files with other versions are stale.
+
+DEFAULT_FILENAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tree_12345.bin')
+# The file of the standard game.
+
+_HEADER = struct.Struct('<4sHHIH2x')
+_ARRAY_HEADER = struct.Struct('<c3xI')
+_CHECKSUM = struct.Struct('<I')
+ALIGNMENT = 8
+
+
+class Error(Exception):
+    """Class for exceptions of this module, raised when a file is stale."""
+
+    @classmethod
+    def check(cls, condition, *args):
+        if not condition:
+            raise cls(*args)
+
+
+def _padding(n: int) -> bytes:
+    """Return the zero bytes needed to pad n bytes to a multiple of ALIGNMENT."""
+    return bytes(-n % ALIGNMENT)
+
+
+def _array_bytes(a: array.array) -> bytes:
+    """Return the items of array a as little-endian bytes."""
+    if sys.byteorder == 'big':
+        a = array.array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def dumps(tree: CompactTree) -> bytes:
+    """Return the file contents for tree."""
+    root_rows = tree.get_rows(tree.root_id)
+    parts = [_HEADER.pack(MAGIC, FORMAT_VERSION, tree.row_count, tree.node_count, tree.ruleset.max_take),
+             bytes(tree.ruleset.row_caps) + _padding(tree.row_count),
+             bytes(root_rows) + _padding(tree.row_count)]
+    for a in tree.get_arrays():
+        data = _array_bytes(a)
+        parts.append(_ARRAY_HEADER.pack(a.typecode.encode(), len(a)))
+        parts.append(data + _padding(len(data)))
+    contents = b''.join(parts)
+    return contents + _CHECKSUM.pack(zlib.crc32(contents))
+
+
+def parse(buffer, root_rows: Rows = None, ruleset: Ruleset = None) -> Tuple[Ruleset, Rows, List[tuple]]:
+    """Check the file contents in buffer and return the positions of its parts.
+    :param buffer: the file contents, any object supporting the buffer protocol.
+    :param root_rows: the rows of the expected root, None if any root is accepted.
+    :param ruleset: the expected ruleset, None if any ruleset is accepted.
+    :return: 0: the ruleset
+             1: the rows of the root
+             2: for each array of CompactTree.ARRAY_NAMES a triple (typecode, start, count),
+                where the items of the array are at buffer[start:start + count * itemsize].
+    :raise: Error, if the contents are stale.
+    """
+    view = memoryview(buffer)
+    Error.check(len(view) >= _HEADER.size + _CHECKSUM.size, "file is truncated")
+    magic, version, row_count, node_count, max_take = _HEADER.unpack_from(view, 0)
+    Error.check(magic == MAGIC, "file is not a tree file")
+    Error.check(version == FORMAT_VERSION, f"file has format version {version}, expected {FORMAT_VERSION}")
+    end = len(view) - _CHECKSUM.size
+    Error.check(zlib.crc32(view[:end]) == _CHECKSUM.unpack_from(view, end)[0], "file has a wrong checksum")
+    pos = _HEADER.size
+    file_ruleset = Ruleset(list(view[pos:pos + row_count]), max_take)
+    Error.check(ruleset is None or file_ruleset == ruleset, f"file contains the tree of {file_ruleset}")
+    pos += row_count + len(_padding(row_count))
+    file_root_rows = list(view[pos:pos + row_count])
+    Error.check(root_rows is None or file_root_rows == list(root_rows),
+                f"file contains the tree of root {file_root_rows}")
+    pos += row_count + len(_padding(row_count))
+    positions = []
+    for _ in CompactTree.ARRAY_NAMES:
+        code, count = _ARRAY_HEADER.unpack_from(view, pos)
+        code = code.decode()
+        pos += _ARRAY_HEADER.size
+        size = count * array.array(code).itemsize
+        Error.check(pos + size <= end, "file is truncated")
+        positions.append((code, pos, count))
+        pos += size + len(_padding(size))
+    Error.check(pos == end, "file has trailing bytes")
+    Error.check(positions[1][2] == node_count, "file has a wrong node count")
+    return file_ruleset, file_root_rows, positions
+
+
+def loads(buffer, root_rows: Rows = None, ruleset: Ruleset = None) -> CompactTree:
+    """Return the tree in the file contents buffer, see parse."""
+    file_ruleset, file_root_rows, positions = parse(buffer, root_rows, ruleset)
+    arrays = []
+    for code, start, count in positions:
+        a = array.array(code)
+        a.frombytes(buffer[start:start + count * a.itemsize])
+        if sys.byteorder == 'big':
+            a.byteswap()
+        arrays.append(a)
+    return CompactTree.from_arrays(file_ruleset, file_root_rows, arrays)
+
+
+def map_tree(filename: str, root_rows: Rows = None, ruleset: Ruleset = None) -> CompactTree:
+    """Map the file filename read-only into memory and return the tree whose arrays are views on the mapping.
+    Note: the mapping is closed, when the tree (or, if the file is stale, the exception) is garbage collected.
+        On big-endian platforms, the arrays are copied.
+    :raise: Error, if the file is stale, OSError, if it cannot be mapped.
+    """
+    if sys.byteorder == 'big':
+        return read_tree(filename, root_rows, ruleset)
+    with open(filename, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)  # the mapping stays valid after closing f
+    file_ruleset, file_root_rows, positions = parse(buffer, root_rows, ruleset)
+    view = memoryview(buffer)
+    arrays = [view[start:start + count * array.array(code).itemsize].cast(code) for code, start, count in positions]
+    return CompactTree.from_arrays(file_ruleset, file_root_rows, arrays)
+
+
+def write_tree(tree: CompactTree, filename: str) -> None:
+    """Write tree to the file filename. The file is replaced atomically, so concurrent readers never see
+    a partially written file.
+    """
+    dirname = os.path.dirname(filename)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_filename, 'wb') as f:
+        f.write(dumps(tree))
+    os.replace(temp_filename, filename)
+
+
+def read_tree(filename: str, root_rows: Rows = None, ruleset: Ruleset = None) -> CompactTree:
+    """Read the tree in the file filename.
+    :raise: Error, if the file is stale, OSError, if it cannot be read.
+    """
+    with open(filename, 'rb') as f:
+        return loads(f.read(), root_rows, ruleset)
+
+
+def build_tree(game_state: GameState) -> CompactTree:
+    """Solve the game with root game_state and return its compact tree."""
+    return CompactTree(GameTree(game_state, iterative=True))
+
+
+def load_or_build(filename: str, game_state: GameState, shared: bool = False) -> CompactTree:
+    """Return the tree with root game_state read from the file filename.
+    If the file is missing or stale, the tree is built and written to the file.
+    :param shared: if True, the file is mapped into memory instead of being read, see map_tree.
+        If the file cannot be written, the built tree is returned, which is not shared.
+    """
+    load = map_tree if shared else read_tree
+    try:
+        return load(filename, game_state.rows, game_state.ruleset)
+    except (OSError, Error) as e:
+        logging.warning(f"cannot use tree file {filename}: {e}, building the tree")
+    tree = build_tree(game_state)
+    try:
+        write_tree(tree, filename)
+    except OSError as e:
+        logging.warning(f"cannot write tree file {filename}: {e}")
+        return tree
+    return load(filename, game_state.rows, game_state.ruleset) if shared else tree
+
+
+def main(args=None):
+    """Build a tree file, see module doc."""
+    parser = argparse.ArgumentParser(description="Solve a game and write its tree file.")
+    parser.add_argument('filename', nargs='?', default=DEFAULT_FILENAME, help="the tree file to write")
+    parser.add_argument('--root', default='12345', help="rows of the normalized root, e.g. 12345 or 1,2,3,4,5")
+    parser.add_argument('--caps', help="row capacities of the ruleset, e.g. 12345 (default: 1, 2, .. per row)")
+    parser.add_argument('--take', type=int, default=STANDARD.max_take, help="max take of the ruleset")
+    args = parser.parse_args(args)
+
+    def to_list(text: str) -> List[int]:
+        return [int(c) for c in (text.split(',') if ',' in text else text)]
+
+    root_rows = to_list(args.root)
+    ruleset = Ruleset(to_list(args.caps), args.take) if args.caps else Ruleset.triangle(len(root_rows), args.take)
+    game_state = GameState(root_rows, ruleset)
+    tree = build_tree(game_state)
+    write_tree(tree, args.filename)
+    print(f"{args.filename}: root {game_state}, {tree.node_count} nodes, {os.path.getsize(args.filename)} bytes")
+
+
+if __name__ == '__main__':
+    main()
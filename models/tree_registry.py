@@ -0,0 +1,142 @@
+"""Module with a registry of solved game-trees.
+
+The current tree (see game_trees.set_current_tree) is the tree of 1 game. To serve games with other roots or
+rulesets, a process needs more trees. The registry builds the tree of a game, when it is used for the first time,
+and keeps it for later use. The trees are keyed by the root game-state and its ruleset.
+
+The memory used by the trees is bounded by a budget: when it is exceeded after building a tree, the least recently
+used trees are evicted, but never the tree just built.
+A tree is built outside the lock of the registry, thus requests for other games are not blocked by a build.
+Concurrent requests for the same new game wait for the future of its build, so its tree is built only once.
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import Callable, Dict, Tuple  # for type annotations
+
+import collections
+import concurrent.futures
+import threading
+import time
+
+from models.game_states import GameState
+from models.rulesets import Ruleset
+from models.compact_trees import CompactTree
+from models import tree_files
+from utils import metrics
+
+import logging
+
+Key = Tuple[Tuple[int, ...], Ruleset]
+# The key of a tree: the key of its root game-state and its ruleset.
+
+MAX_RAW_STATES = 100000
+# Maximal number of raw game-states of a ruleset requested by a client, see canonical_tables.raw_state_count.
+# Requests for another ruleset build the tree of its game, this limits the size of the tree.
+
+BUILD_SECONDS = metrics.Histogram("matchtaker_registry_build_seconds", "Time used for building a tree of the registry.",
+                                  buckets=(0.01, 0.1, 1.0, 10.0, 100.0))
+# See also the metrics at the end of the module.
+
+
+class TreeRegistry:
+    """Models a registry of solved trees.
+
+    Attributes:
+        max_bytes: int
+            The memory budget for all trees, see memory_size of GameTree and CompactTree.
+        builder: Callable[[GameState], CompactTree]
+            Builds the tree of a normalized root game-state.
+        hits: int
+            Number of trees found in the registry.
+        misses: int
+            Number of trees built.
+        evictions: int
+            Number of trees evicted.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024,
+                 builder: Callable[[GameState], CompactTree] = tree_files.build_tree):
+        self.max_bytes: int = max_bytes
+        self.builder: Callable[[GameState], CompactTree] = builder
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._trees: collections.OrderedDict = collections.OrderedDict()  # key -> (tree, size)
+        self._builds: Dict[Key, concurrent.futures.Future] = {}  # the trees being built
+        self._lock = threading.Lock()  # for _trees, _builds and the statistics, not held while building
+
+    def get(self, root: GameState) -> CompactTree:
+        """Return the tree of the normalized root, build it if necessary."""
+        assert root.is_normalized()
+        key = (root.key(), root.ruleset)
+        with self._lock:
+            item = self._trees.get(key)
+            if item is not None:
+                self.hits += 1
+                self._trees.move_to_end(key)
+                return item[0]
+            future = self._builds.get(key)
+            building = future is None
+            if building:
+                self.misses += 1
+                future = self._builds[key] = concurrent.futures.Future()
+        if not building:  # another thread builds the tree
+            return future.result()
+        try:
+            t = time.perf_counter()
+            tree = self.builder(root)
+            BUILD_SECONDS.observe(time.perf_counter() - t)
+        except BaseException as e:
+            with self._lock:
+                del self._builds[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._builds[key]
+            self._trees[key] = (tree, tree.memory_size())
+            logging.info(f"tree registry: built tree of root {root}, {root.ruleset}")
+            self._evict()
+        future.set_result(tree)
+        return tree
+
+    def _evict(self) -> None:
+        """Evict the least recently used trees, until the budget is kept or only 1 tree is left."""
+        while self.memory_size() > self.max_bytes and len(self._trees) > 1:
+            key, _ = self._trees.popitem(last=False)
+            self.evictions += 1
+            logging.info(f"tree registry: evicted tree of root {key[0]}, {key[1]}")
+
+    def memory_size(self) -> int:
+        """Return the number of bytes used by all trees."""
+        return sum([size for _, size in self._trees.values()])
+
+    def info(self) -> Dict[str, int]:
+        """Return the statistics of the registry."""
+        return {'trees': len(self._trees), 'bytes': self.memory_size(), 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+_registry: TreeRegistry = TreeRegistry()
+# See registry.
+
+
+def registry() -> TreeRegistry:
+    """Return the registry used by solver.solve."""
+    return _registry
+
+
+def set_registry(tree_registry: TreeRegistry) -> None:
+    """Set the registry used by solver.solve."""
+    global _registry
+    _registry = tree_registry
+
+
+metrics.Callback("matchtaker_registry_trees", "Number of trees in the registry.", lambda: registry().info()["trees"])
+metrics.Callback("matchtaker_registry_bytes", "Memory used by the trees of the registry.",
+                 lambda: registry().memory_size())
+metrics.Callback("matchtaker_registry_hits_total", "Number of trees found in the registry.",
+                 lambda: registry().hits, 'counter')
+metrics.Callback("matchtaker_registry_misses_total", "Number of trees built by the registry.",
+                 lambda: registry().misses, 'counter')
+metrics.Callback("matchtaker_registry_evictions_total", "Number of trees evicted from the registry.",
+                 lambda: registry().evictions, 'counter')
@@ -0,0 +1,59 @@
+import unittest
+import logging
+import itertools
+
+from utils import mylogconfig
+from models.game_states import GameState
+from models.game_trees import GameTree
+from models.analytic_solver import AnalyticSolver, winning
+from models import solver
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestAnalyticSolver(unittest.TestCase):
+
+    def test_1winning(self):
+        logger.info("test_1winning")
+        tree = GameTree(GameState([1, 2, 3, 4, 5]))
+        count = 0
+        for rows in itertools.product(*[range(k + 2) for k in range(5)]):  # all states of the standard game
+            if sum(rows) == 0:
+                continue
+            game_state = GameState(list(rows)).normalized()[0]
+            self.assertEqual(winning(list(rows)), tree.find(game_state).winning)
+            count += 1
+        self.assertEqual(count, 6 * 5 * 4 * 3 * 2 - 1)
+
+    def test_2select_move(self):
+        logger.info("test_2select_move")
+        tree = GameTree(GameState([1, 2, 3, 4, 5]))
+        analytic_solver = AnalyticSolver()
+        for layer in tree.layers[2:]:
+            for node in layer.nodes:
+                analytic_node = analytic_solver.find(node.game_state)
+                self.assertEqual(analytic_node.winning, node.winning)
+                game_move, winning_flag = analytic_node.select_move()
+                new_game_state = node.game_state.make_move(game_move).normalized()[0]
+                self.assertEqual(tree.find(new_game_state).winning, winning_flag)
+                if node.winning == -1:
+                    self.assertEqual(game_move.match_count, 1)
+
+    def test_3backend(self):
+        logger.info("test_3backend")
+        solver.set_backend(AnalyticSolver())
+        try:
+            gm, cont = solver.solve(GameState([0, 2, 1, 1, 1]), 2)
+            self.assertTrue(gm.row_index == 1 and gm.match_count == 2 and cont == 3)
+            gm, cont = solver.solve(GameState([1, 2, 0, 4, 3]), 2)
+            self.assertTrue(gm.match_count == 1 and cont == 2)
+            gm, cont = solver.solve(GameState([0, 1, 0, 0, 1]), 2)
+            self.assertTrue(gm.match_count == 1 and cont == 0)
+        finally:
+            solver.set_backend(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
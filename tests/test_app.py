@@ -0,0 +1,54 @@
+import unittest
+import logging
+import json
+
+from utils import mylogconfig
+from models.game_states import GameState
+from models.game_trees import set_current_tree
+from models import tree_registry, canonical_tables
+import app
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestApp(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_current_tree(GameState([1, 2, 3, 4, 5]))
+
+    def test_1ruleset_limit(self):
+        logger.info("test_1ruleset_limit")
+        client = app.app.test_client()
+        misses = tree_registry.registry().info()['misses']
+        for url in ["/next_move/1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1/2?caps=1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1",
+                    "/next_move/1,2,3,4,5,6,7,8/2?caps=1,2,3,4,5,6,7,8&take=4",
+                    "/next_move/9,9,9,9,9,9/2?caps=255,255,255,255,255,255"]:
+            result = json.loads(client.get(url).data)
+            self.assertIn("at most", result.get("error", ""), url)
+        self.assertEqual(tree_registry.registry().info()['misses'], misses)  # nothing built
+        result = json.loads(client.get("/next_move/1,2,3,4,5,6,7/2?caps=1,2,3,4,5,6,7").data)
+        self.assertIn("gameContinues", result)
+        # the batch endpoint
+        for body, content_type in [(json.dumps([{"rows": [9] * 6, "level": 2}] * 1000), 'application/json'),
+                                   (bytes([9] * 6 + [2]) * 1000, 'application/octet-stream')]:
+            response = client.post("/next_moves?caps=255,255,255,255,255,255", data=body, content_type=content_type)
+            self.assertIn("at most", json.loads(response.data).get("error", ""))
+        self.assertEqual(tree_registry.registry().info()['misses'], misses + 1)  # only the tree of 1234567
+
+    def test_2canonical_tables(self):
+        logger.info("test_2canonical_tables")
+        client = app.app.test_client()
+        tables = dict(canonical_tables._tables)
+        for cap in range(5, 10):
+            for take in range(1, 10):
+                for level in [1, 2]:
+                    result = json.loads(client.get(f"/next_move/11111/{level}?caps=1234{cap}&take={take}").data)
+                    self.assertIn("gameContinues", result)
+        self.assertEqual(canonical_tables._tables, tables)  # no table for the rulesets of requests
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import logging
+import asyncio
+import json
+
+from utils import mylogconfig
+from models.game_states import GameState
+from models.game_trees import set_current_tree
+import app
+import asgi_app
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def call(method: str, url: str, body: bytes = b'', content_type: bytes = None):
+    """Send a request to asgi_app.app, return status, headers and content."""
+    path, _, query_string = url.partition('?')
+    headers = [(b'host', b'localhost')] + ([(b'content-type', content_type)] if content_type else [])
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query_string.encode(),
+             'headers': headers, 'scheme': 'http', 'root_path': ''}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi_app.app(scope, receive, send))
+    return messages[0]['status'], dict(messages[0]['headers']), messages[1]['body']
+
+
+class TestAsgiApp(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_current_tree(GameState([1, 2, 3, 4, 5]))
+
+    def check_same(self, method: str, url: str, body: bytes = b'', content_type: str = None):
+        status, headers, content = call(method, url, body, content_type.encode() if content_type else None)
+        response = app.app.test_client().open(url, method=method, data=body, content_type=content_type)
+        self.assertEqual(status, response.status_code, url)
+        self.assertEqual(headers[b'content-type'].decode(), response.headers['Content-Type'], url)
+        self.assertEqual(headers[b'content-length'].decode(), response.headers['Content-Length'], url)
+        self.assertEqual(headers.get(b'location', b'').decode(), response.headers.get('Location', ''), url)
+        self.assertEqual(headers.get(b'allow', b'').decode(), response.headers.get('Allow', ''), url)
+        if method != 'HEAD':
+            self.assertEqual(content, response.data, url)
+
+    def test_1pages(self):
+        logger.info("test_1pages")
+        for url in ['/', '/rules', '/settings', '/about', '/email', '/static/v0.15.0/base.css', '/static/nope',
+                    '/unknown', '/rules/']:
+            self.check_same('GET', url)
+        self.assertNotIn('nope', asgi_app._static_files)  # misses are not cached
+        self.check_same('HEAD', '/rules')
+        self.check_same('OPTIONS', '/next_move')
+        self.check_same('POST', '/next_move')
+
+    def test_2next_move(self):
+        logger.info("test_2next_move")
+        # deterministic responses only: levels 1 and 2 of a losing state, errors and redirects
+        for url in ['/next_move/12345/1', '/next_move/10340/1', '/next_move/00001/2', '/next_move/1,2,3/1?caps=123',
+                    '/next_move/10340/1?root=12345', '/next_move/9/1', '/next_move/12345/3', '/next_move/12345/0',
+                    '/next_move/12345', '/next_move/12345/0?root=12345', '/next_move/123/x']:
+            self.check_same('GET', url)
+        status, headers, content = call('GET', '/next_move/12345/2')
+        result = json.loads(content)
+        self.assertEqual(result["gameContinues"], 3)
+
+    def test_3next_moves(self):
+        logger.info("test_3next_moves")
+        body = json.dumps([{"rows": "10340", "level": 1}, {"rows": [0, 0, 0, 0, 1]}, {"rows": "x"}]).encode()
+        self.check_same('POST', '/next_moves', body, 'application/json')
+        self.check_same('POST', '/next_moves', b'not json', 'application/json')
+        self.check_same('POST', '/next_moves', bytes([1, 0, 3, 4, 0, 1, 0, 0, 0, 0, 1, 2]),
+                        'application/octet-stream')
+        self.check_same('GET', '/next_moves')
+
+
+if __name__ == "__main__":
+    unittest.main()
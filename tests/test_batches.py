@@ -0,0 +1,71 @@
+import unittest
+import logging
+
+from utils import mylogconfig
+from models.rulesets import Ruleset, STANDARD
+from models.game_states import GameState
+from models.game_trees import set_current_tree
+from models import batches, tree_registry
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestBatches(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_current_tree(GameState([1, 2, 3, 4, 5]))
+
+    def test_1items(self):
+        logger.info("test_1items")
+        results = batches.solve_items([([0, 0, 1, 0, 0], 2), ([0, 2, 1, 1, 1], 2), ([0, 0, 3, 0, 0], 1),
+                                       ([1, 2, 3, 4, 5], 3), ([1, 2, 3, 4, 6], 0), ([1, None, 3, 4, 5], 0)],
+                                      STANDARD)
+        self.assertEqual(results[0], {"gameContinues": -1})
+        self.assertEqual(results[1], {"gameContinues": 3, "rowIndex": 1, "numberOfMatches": 2})
+        self.assertEqual(results[2], {"gameContinues": 0, "rowIndex": 2, "numberOfMatches": 2})
+        self.assertEqual(list(results[3]), ["error"])  # invalid level
+        self.assertEqual(list(results[4]), ["error"])  # invalid state
+        self.assertEqual(list(results[5]), ["error"])
+        # json booleans are not integers
+        results = batches.solve_items([([1, 2, 3, 4, 5], True), ([True, 2, 3, 4, 5], 1), ([1, 2, 3, 4, 5], 2.0),
+                                       ([1, 2, 3, 4, 5], "2")], STANDARD)
+        self.assertEqual([list(result) for result in results], [["error"]] * 4)
+        batch_size = batches.MAX_BATCH_SIZE
+        batches.MAX_BATCH_SIZE = 2
+        try:
+            with self.assertRaises(batches.Error):
+                batches.solve_items([([0, 0, 1, 0, 0], 2)] * 3, STANDARD)
+        finally:
+            batches.MAX_BATCH_SIZE = batch_size
+
+    def test_2binary(self):
+        logger.info("test_2binary")
+        body = bytes([0, 0, 1, 0, 0, 2, 0, 2, 1, 1, 1, 2, 1, 2, 3, 4, 5, 3])
+        results = batches.solve_binary(body, STANDARD)
+        self.assertEqual(list(results), [255, 0, 0, 3, 1, 2, batches.ERROR % 256, 0, 0])
+        self.assertEqual(list(batches.RESULT.iter_unpack(results)), [(-1, 0, 0), (3, 1, 2), (batches.ERROR, 0, 0)])
+        with self.assertRaises(batches.Error):
+            batches.solve_binary(body[:-1], STANDARD)
+        # another ruleset and a root
+        ruleset = Ruleset([1, 2, 3], 2)
+        results = batches.solve_binary(bytes([0, 1, 3, 2, 1, 2, 3, 2]), ruleset, GameState([1, 2, 3], ruleset))
+        for game_continues, row_index, match_count in batches.RESULT.iter_unpack(results):
+            self.assertIn(game_continues, [1, 2, 3])
+            self.assertTrue(1 <= match_count <= 2)
+
+    def test_3ruleset_limit(self):
+        logger.info("test_3ruleset_limit")
+        ruleset = Ruleset([9] * 6, 9)
+        misses = tree_registry.registry().info()['misses']
+        with self.assertRaises(batches.Error):
+            batches.solve_items([([9] * 6, 2)], ruleset)
+        with self.assertRaises(batches.Error):
+            batches.solve_binary(bytes([9] * 6 + [2]), ruleset)
+        self.assertEqual(tree_registry.registry().info()['misses'], misses)  # nothing built
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import logging
+import itertools
+
+from utils import mylogconfig
+from models.rulesets import Ruleset, STANDARD
+from models.game_states import GameState
+from models import canonical_tables
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestCanonicalTables(unittest.TestCase):
+
+    def test_1table(self):
+        logger.info("test_1table")
+        table = canonical_tables.get_table(STANDARD)
+        self.assertIs(canonical_tables.get_table(STANDARD), table)
+        self.assertEqual(table.size, 6 * 5 * 4 * 3 * 2 - 1)
+        for rows in itertools.product(*[range(k + 2) for k in range(5)]):  # all states of the standard game
+            if sum(rows) == 0:
+                continue
+            game_state = GameState(list(rows))
+            normalized_state, p = game_state.normalized()
+            self.assertEqual(table.lookup(game_state), (normalized_state, tuple([p(k) for k in range(5)])))
+            self.assertEqual(canonical_tables.canonicalize(game_state), table.lookup(game_state))
+        self.assertEqual(table.lookup(GameState([1, 0, 3, 2, 1])), (GameState([0, 1, 1, 2, 3]), (1, 0, 4, 3, 2)))
+
+    def test_2no_table(self):
+        logger.info("test_2no_table")
+        ruleset = Ruleset.triangle(9, 5)
+        self.assertGreater(canonical_tables.raw_state_count(ruleset), canonical_tables.MAX_TABLE_SIZE)
+        self.assertIsNone(canonical_tables.get_table(ruleset))
+        game_state = GameState([1, 0, 3, 2, 1, 6, 0, 8, 2], ruleset)
+        normalized_state, p = game_state.normalized()
+        self.assertEqual(canonical_tables.canonicalize(game_state), (normalized_state, tuple([p(k) for k in range(9)])))
+
+
+if __name__ == "__main__":
+    unittest.main()
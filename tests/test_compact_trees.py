@@ -0,0 +1,58 @@
+import unittest
+import logging
+
+from utils import mylogconfig
+from models.game_states import GameState
+from models.game_trees import GameTree
+from models.compact_trees import CompactTree, pack, unpack
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestCompactTrees(unittest.TestCase):
+
+    def test_1pack(self):
+        logger.info("test_1pack")
+        self.assertEqual(unpack(pack([1, 2, 3, 4, 5])), [1, 2, 3, 4, 5])
+        self.assertEqual(unpack(pack([0, 0, 0, 0, 1])), [0, 0, 0, 0, 1])
+        self.assertTrue(pack([1, 0, 0, 4, 5]) < pack([1, 1, 0, 0, 0]))
+
+    def test_2CompactTree(self):
+        logger.info("test_2CompactTree")
+        for rows in [[0, 0, 0, 0, 1], [0, 0, 1, 2, 3], [1, 2, 3, 4, 5]]:
+            tree = GameTree(GameState(rows))
+            compact_tree = CompactTree(tree)
+            self.assertEqual(compact_tree.node_count, tree.node_count)
+            self.assertEqual(compact_tree.get_rows(compact_tree.root_id), rows)
+            for layer in tree.layers:
+                for node in layer.nodes:
+                    node_id = compact_tree.find_id(node.game_state)
+                    self.assertEqual(compact_tree.get_rows(node_id), node.game_state.get_rows())
+                    self.assertEqual(compact_tree.winning[node_id], node.winning)
+                    self.assertEqual([compact_tree.get_rows(child_id) for child_id in compact_tree.children(node_id)],
+                                     [child.game_state.get_rows() for child in node.children])
+        self.assertTrue(compact_tree.find(GameState([1, 2, 3, 4, 5])) is not None)
+        self.assertTrue(CompactTree(GameTree(GameState([0, 0, 1, 2, 3]))).find(GameState([0, 0, 0, 0, 5])) is None)
+
+    def test_3select_move(self):
+        logger.info("test_3select_move")
+        tree = GameTree(GameState([1, 2, 3, 4, 5]))
+        compact_tree = CompactTree(tree)
+        for layer in tree.layers[2:]:
+            for node in layer.nodes:
+                compact_node = compact_tree.find(node.game_state)
+                self.assertEqual(compact_node.winning, node.winning)
+                game_move, winning = compact_node.select_move()
+                new_game_state = node.game_state.make_move(game_move).normalized()[0]
+                new_node = tree.find(new_game_state)
+                self.assertEqual(new_node.winning, winning)
+                if node.winning == 1:
+                    self.assertEqual(winning, -1)
+                else:
+                    self.assertEqual(game_move.match_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,11 @@
 import unittest
 import logging
+import itertools
+import pickle
 
 from utils import mylogconfig
 from models.game_states import GameMove, GameState, Error
+from models.rulesets import Ruleset, STANDARD
 
 mylogconfig.standard_rot(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -52,11 +55,11 @@ class TestGameState(unittest.TestCase):
         self.assertEqual(gs.get_rows(), rows)
         self.assertEqual(str(gs), "[10321]")
         self.assertFalse(gs.is_normalized())
-        p = gs.normalize()
-        self.assertTrue(gs.is_normalized())
-        self.assertEqual(gs.get_rows(), [0, 1, 1, 2, 3])
-        gs.denormalize(p)
-        self.assertEqual(gs.get_rows(), rows)
+        normalized_gs, p = gs.normalized()
+        self.assertTrue(normalized_gs.is_normalized())
+        self.assertEqual(normalized_gs.get_rows(), [0, 1, 1, 2, 3])
+        self.assertEqual(gs.get_rows(), rows)  # immutable
+        self.assertIs(normalized_gs.denormalized(p), gs)
 
     def test_3ordering(self):
         logger.info("test_3ordering")
@@ -115,6 +118,46 @@ class TestGameState(unittest.TestCase):
         gs2 = GameState([1, 2, 2, 3, 4])
         self.assertEqual(gs1.get_move(gs2), GameMove(4, 3))
 
+    def test_6interning(self):
+        logger.info("test_6interning")
+        gs = GameState([1, 2, 3, 4, 5])
+        self.assertIs(GameState([1, 2, 3, 4, 5]), gs)
+        self.assertIs(GameState.from_key((1, 2, 3, 4, 5)), gs)
+        self.assertEqual(hash(gs), gs.code())
+        self.assertEqual(len({gs, GameState([1, 2, 3, 4, 5]), GameState([0, 2, 3, 4, 5])}), 2)
+        self.assertEqual(gs.rows, (1, 2, 3, 4, 5))
+        with self.assertRaises(AttributeError):
+            gs.rows = (0, 2, 3, 4, 5)
+        with self.assertRaises(AttributeError):
+            gs.extra = 1  # no __dict__
+        self.assertIs(pickle.loads(pickle.dumps(gs)), gs)
+        self.assertIs(GameMove(3, 2), GameMove(3, 2))
+        self.assertEqual(GameMove(3, 2).row_index, 3)
+        self.assertEqual(GameMove(3, 2).match_count, 2)
+        self.assertIs(pickle.loads(pickle.dumps(GameMove(3, 2))), GameMove(3, 2))
+
+    def test_7successors(self):
+        logger.info("test_7successors")
+        self.assertEqual([(gm, str(gs)) for gm, gs in GameState([0, 0, 1, 2, 2]).successors()],
+                         [(GameMove(2, 1), "[00022]"), (GameMove(3, 1), "[00112]"), (GameMove(3, 2), "[00012]")])
+        for ruleset in [STANDARD, Ruleset.triangle(7, 4)]:
+            for rows in itertools.product(*[range(cap + 1) for cap in ruleset.row_caps]):
+                if sum(rows) == 0 or list(rows) != sorted(rows):
+                    continue
+                gs = GameState(list(rows), ruleset)
+                # brute force: all moves, normalized and deduplicated in the order of their first occurrence
+                expected = []
+                for count in range(1, min(ruleset.max_take, sum(rows) - 1) + 1):
+                    for k in range(len(rows)):
+                        if rows[k] >= count:
+                            s_gs = gs.make_move(GameMove(k, count, ruleset)).normalized()[0]
+                            if s_gs not in expected:
+                                expected.append(s_gs)
+                successors = list(gs.successors())
+                self.assertEqual([s_gs for _, s_gs in successors], expected)
+                for gm, s_gs in successors:
+                    self.assertEqual(gs.get_move(s_gs), gm)
+
 
 if __name__ == "__main__":
     unittest.main()
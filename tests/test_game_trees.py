@@ -3,6 +3,7 @@ import logging
 
 from utils import mylogconfig
 from models.game_states import GameState
+from models import game_states, game_trees
 from models.game_trees import GameNode, GameLayer, GameTree
 
 mylogconfig.standard_rot(level=logging.INFO)
@@ -138,14 +139,14 @@ class TestGameTrees(unittest.TestCase):
         # 1st  move
         game_move, winning = tree.root_node.select_move()
         self.assertEqual(winning, 1)
-        new_game_state = tree.root_node.game_state.make_move(game_move)
+        new_game_state = tree.root_node.game_state.make_move(game_move).normalized()[0]
         new_node = tree.find(new_game_state)
         self.assertEqual(new_node.winning, 1)
         self.assertEqual(new_node.game_state.get_total_count(), tree.root_node.game_state.get_total_count() - 1)
         # 2nd move
         game_move, winning = new_node.select_move()
         self.assertEqual(winning, -1)
-        new_game_state = new_node.game_state.make_move(game_move)
+        new_game_state = new_node.game_state.make_move(game_move).normalized()[0]
         new_node = tree.find(new_game_state)
         self.assertEqual(new_node.winning, -1)
         # 12345
@@ -155,16 +156,85 @@ class TestGameTrees(unittest.TestCase):
         # 1st  move
         game_move, winning = tree.root_node.select_move()
         self.assertEqual(winning, -1)
-        new_game_state = tree.root_node.game_state.make_move(game_move)
+        new_game_state = tree.root_node.game_state.make_move(game_move).normalized()[0]
         new_node = tree.find(new_game_state)
         self.assertEqual(new_node.winning, -1)
         # 2nd move
         game_move, winning = new_node.select_move()
         self.assertEqual(winning, 1)
-        new_game_state = new_node.game_state.make_move(game_move)
+        new_game_state = new_node.game_state.make_move(game_move).normalized()[0]
         new_node = tree.find(new_game_state)
         self.assertEqual(new_node.winning, 1)
 
+    def test_5iterative(self):
+        logger.info("test_5iterative")
+        for rows in [[0, 0, 0, 0, 1], [0, 0, 0, 2, 3], [0, 1, 1, 2, 2], [0, 1, 2, 3, 4], [1, 2, 3, 4, 5]]:
+            tree1 = GameTree(GameState(rows))
+            tree2 = GameTree(GameState(rows), iterative=True)
+            self.assertEqual(tree1.node_count, tree2.node_count)
+            self.assertEqual(len(tree1.layers), len(tree2.layers))
+            for layer1, layer2 in zip(tree1.layers, tree2.layers):
+                self.assertEqual(layer1.nodes, layer2.nodes)
+                self.assertEqual([node.winning for node in layer1.nodes], [node.winning for node in layer2.nodes])
+                self.assertEqual([node.children for node in layer1.nodes], [node.children for node in layer2.nodes])
+            self.assertEqual(tree1.root_node.winning, tree2.root_node.winning)
+
+    def test_6parallel(self):
+        logger.info("test_6parallel")
+        parallel_min_states = game_trees.PARALLEL_MIN_STATES
+        game_trees.PARALLEL_MIN_STATES = 4  # use the pool also for the small layers of these trees
+        try:
+            self.check_parallel()
+        finally:
+            game_trees.PARALLEL_MIN_STATES = parallel_min_states
+
+    def check_parallel(self):
+        for rows in [[0, 0, 0, 0, 1], [0, 1, 2, 3, 4], [1, 2, 3, 4, 5]]:
+            tree1 = GameTree(GameState(rows), iterative=True)
+            tree2 = GameTree(GameState(rows), workers=2)
+            self.assertEqual(tree1.node_count, tree2.node_count)
+            for layer1, layer2 in zip(tree1.layers, tree2.layers):
+                self.assertEqual(layer1.nodes, layer2.nodes)
+                self.assertEqual([node.winning for node in layer1.nodes], [node.winning for node in layer2.nodes])
+                self.assertEqual([node.children for node in layer1.nodes], [node.children for node in layer2.nodes])
+            self.assertEqual(tree2.find(GameState(rows)), tree2.root_node)
+
+    def test_7moves(self):
+        logger.info("test_7moves")
+        for rows in [[0, 0, 0, 2, 3], [0, 1, 2, 3, 4], [1, 2, 3, 4, 5]]:
+            for tree in [GameTree(GameState(rows)), GameTree(GameState(rows), iterative=True),
+                         GameTree(GameState(rows), workers=2)]:
+                for layer in tree.layers:
+                    for node in layer.nodes:
+                        self.assertEqual(node.moves, [node.game_state.get_move(child.game_state)
+                                                      for child in node.children])
+        strict = game_states.STRICT
+        game_states.STRICT = True  # select_move verifies the stored moves
+        try:
+            tree = GameTree(GameState([1, 2, 3, 4, 5]))
+            for layer in tree.layers[2:]:
+                for node in layer.nodes:
+                    game_move, winning = node.select_move()
+                    self.assertEqual(tree.find(node.game_state.make_move(game_move).normalized()[0]).winning, winning)
+        finally:
+            game_states.STRICT = strict
+
+    def test_8candidates(self):
+        logger.info("test_8candidates")
+        for rows in [[0, 0, 0, 0, 1], [0, 1, 2, 3, 4], [1, 2, 3, 4, 5]]:
+            for tree in [GameTree(GameState(rows)), GameTree(GameState(rows), iterative=True),
+                         GameTree(GameState(rows), workers=2)]:
+                for layer in tree.layers:
+                    for node in layer.nodes:
+                        candidates = [node.children[k] for k in node.candidates]
+                        if node.winning == 1:
+                            expected = [child for child in node.children if child.winning == -1]
+                        else:
+                            n = node.game_state.get_total_count()
+                            expected = [child for child in node.children if child.game_state.get_total_count() == n - 1]
+                        self.assertEqual(candidates, expected)
+                        self.assertEqual(len(candidates) > 0, len(node.children) > 0)
+
 
 if __name__ == "__main__":
     unittest.main()
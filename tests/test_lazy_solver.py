@@ -0,0 +1,66 @@
+import unittest
+import logging
+
+from utils import mylogconfig
+from models.game_states import GameState
+from models.game_trees import GameTree
+from models.lazy_solver import LazySolver
+from models import solver
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestLazySolver(unittest.TestCase):
+
+    def test_1winning(self):
+        logger.info("test_1winning")
+        tree = GameTree(GameState([1, 2, 3, 4, 5]))
+        for max_size in [10, 1000]:
+            lazy_solver = LazySolver(max_size=max_size)
+            for layer in tree.layers:
+                for node in layer.nodes:
+                    self.assertEqual(lazy_solver.find(node.game_state).winning, node.winning)
+            info = lazy_solver.cache_info()
+            logger.info(f"cache info: {info}")
+            self.assertTrue(info['size'] <= max_size)
+            self.assertEqual(info['hits'] + info['misses'], lazy_solver.hits + lazy_solver.misses)
+        self.assertEqual(lazy_solver.misses, tree.node_count)  # big cache: each flag computed once
+
+    def test_2lazy(self):
+        logger.info("test_2lazy")
+        lazy_solver = LazySolver()
+        self.assertEqual(lazy_solver.find(GameState([0, 0, 1, 2, 3])).winning, -1)
+        self.assertEqual(lazy_solver.cache_info()['size'], 13)  # only the states below 00123
+        self.assertEqual(lazy_solver.find(GameState([1, 2, 3, 4, 5])).winning, 1)
+        self.assertTrue(lazy_solver.cache_info()['size'] < GameTree(GameState([1, 2, 3, 4, 5])).node_count)
+
+    def test_3select_move(self):
+        logger.info("test_3select_move")
+        tree = GameTree(GameState([1, 2, 3, 4, 5]))
+        lazy_solver = LazySolver(max_size=20)
+        for layer in tree.layers[2:]:
+            for node in layer.nodes:
+                game_move, winning = lazy_solver.find(node.game_state).select_move()
+                new_game_state = node.game_state.make_move(game_move).normalized()[0]
+                self.assertEqual(tree.find(new_game_state).winning, winning)
+                if node.winning == 1:
+                    self.assertEqual(winning, -1)
+                else:
+                    self.assertEqual(game_move.match_count, 1)
+
+    def test_4backend(self):
+        logger.info("test_4backend")
+        solver.set_backend(LazySolver(max_size=50))
+        try:
+            gm, cont = solver.solve(GameState([0, 2, 1, 1, 1]), 2)
+            self.assertTrue(gm.row_index == 1 and gm.match_count == 2 and cont == 3)
+            gm, cont = solver.solve(GameState([1, 2, 0, 4, 3]), 2)
+            self.assertTrue(gm.match_count == 1 and cont == 2)
+        finally:
+            solver.set_backend(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
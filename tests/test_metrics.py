@@ -0,0 +1,110 @@
+import unittest
+import logging
+import os
+import threading
+
+from utils import mylogconfig, metrics
+from models.game_states import GameState
+from models.game_trees import set_current_tree
+import app
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_1counter(self):
+        logger.info("test_1counter")
+        counter = metrics.Counter("test_counter_total", "Test \"counter\".", ["kind"])
+        with self.assertRaises(metrics.Error):
+            metrics.Counter("test_counter_total", "Duplicate.")
+
+        def record():
+            for k in range(1000):
+                counter.inc("even" if k % 2 == 0 else "odd\n")
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        record()
+        self.assertEqual(counter.values(), {("even",): 2500, ("odd\n",): 2500})
+        self.assertEqual(counter.render(), '# HELP test_counter_total Test "counter".\n'
+                                           '# TYPE test_counter_total counter\n'
+                                           'test_counter_total{kind="even"} 2500\n'
+                                           'test_counter_total{kind="odd\\n"} 2500\n')
+
+    def test_2histogram(self):
+        logger.info("test_2histogram")
+        histogram = metrics.Histogram("test_seconds", "Test histogram.", buckets=(0.1, 1.0))
+        for value in [0.05, 0.1, 0.5, 2.0]:
+            histogram.observe(value)
+        self.assertEqual(histogram.samples(), ['test_seconds_bucket{le="0.1"} 2', 'test_seconds_bucket{le="1"} 3',
+                                               'test_seconds_bucket{le="+Inf"} 4', 'test_seconds_sum 2.65',
+                                               'test_seconds_count 4'])
+        gauge = metrics.Callback("test_gauge", "Test gauge.", lambda: None)
+        self.assertEqual(gauge.samples(), [])
+        gauge.function = lambda: 3
+        self.assertEqual(gauge.render(), "# HELP test_gauge Test gauge.\n# TYPE test_gauge gauge\ntest_gauge 3\n")
+
+    def test_3endpoint(self):
+        logger.info("test_3endpoint")
+        set_current_tree(GameState([1, 2, 3, 4, 5]))
+        client = app.app.test_client()
+        before = app.REQUESTS.values().get(("next_move", "200"), 0)
+        errors = metrics._metrics["matchtaker_errors_total"].values().get(("solver.Error",), 0)
+        client.get("/next_move/12345/1?root=12345")
+        client.get("/next_move/12345/3")
+        client.get("/unknown")
+        self.assertEqual(app.REQUESTS.values()[("next_move", "200")], before + 2)
+        self.assertGreaterEqual(app.REQUESTS.values()[("none", "404")], 1)
+        self.assertEqual(metrics._metrics["matchtaker_errors_total"].values()[("solver.Error",)], errors + 1)
+        response = client.get("/metrics")
+        self.assertEqual(response.headers["Content-Type"], metrics.CONTENT_TYPE)
+        text = response.data.decode()
+        for line in ['# TYPE matchtaker_request_seconds histogram',
+                     'matchtaker_request_seconds_count{route="next_move"}',
+                     'matchtaker_solve_seconds_bucket{level="1",le="+Inf"}', 'matchtaker_tree_nodes 131',
+                     'matchtaker_registry_hits_total']:
+            self.assertIn(line, text)
+        precomputed = app.responses.LOOKUPS.values().get(("2",), 0)
+        client.get("/next_move/12345/2")
+        self.assertEqual(app.responses.LOOKUPS.values()[("2",)], precomputed + 1)
+
+    def test_4reclaim(self):
+        logger.info("test_4reclaim")
+        counter = metrics.Counter("test_reclaim_total", "Test reclaim.")
+        for _ in range(50):
+            threads = [threading.Thread(target=counter.inc) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertLessEqual(len(counter._shards), 10)
+        self.assertEqual(counter.values(), {(): 500})
+        self.assertEqual(len(counter._shards), 0)
+
+    def test_5processes(self):
+        logger.info("test_5processes")
+        self.assertIsNotNone(metrics._directory)  # shared by the app
+        histogram = metrics.Histogram("test_process_seconds", "Test processes.", buckets=(1.0,))
+        histogram.observe(0.5)
+        pid = os.fork()
+        if pid == 0:  # child, without the values of the parent
+            histogram.observe(2.0)
+            histogram.observe(3.0)
+            metrics.write_snapshot()
+            os._exit(0)
+        os.waitpid(pid, 0)
+        try:
+            self.assertEqual(histogram.local_values(), {(): [1, 0, 0.5]})
+            self.assertEqual(histogram.values(), {(): [1, 2, 5.5]})
+        finally:
+            os.remove(os.path.join(metrics._directory, f"{pid}.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import logging
+import gc
+import os
+import queue
+import tempfile
+import weakref
+from logging import handlers
+
+from utils import mylogconfig
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class ListHandler(logging.Handler):
+    """Collects the formatted records."""
+
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+class TestMylogconfig(unittest.TestCase):
+
+    def test_1sampling(self):
+        logger.info("test_1sampling")
+        sampled = logging.getLogger(__name__ + ".sampled")
+        sampled.propagate = False
+        handler = ListHandler()
+        sampled.addHandler(handler)
+        sampled.addFilter(mylogconfig.SamplingFilter(0.1))
+        for k in range(100):
+            sampled.info("info %d", k)
+        self.assertEqual(handler.lines, [f"INFO info {k}" for k in range(0, 100, 10)])
+        for k in range(5):
+            sampled.warning("warning %d", k)
+        self.assertEqual(len(handler.lines), 15)
+        none = mylogconfig.SamplingFilter(0.0)
+        self.assertFalse(any([none.filter(logging.makeLogRecord({'levelno': logging.INFO})) for _ in range(10)]))
+
+    def test_2deferring(self):
+        logger.info("test_2deferring")
+        queued = logging.getLogger(__name__ + ".queued")
+        queued.propagate = False
+        record_queue = queue.SimpleQueue()
+        queued.addHandler(mylogconfig.DeferringQueueHandler(record_queue))
+        handler = ListHandler()
+        listener = handlers.QueueListener(record_queue, handler)
+        args = [1, 2]
+        queued.info("args %s", args)
+        args.append(3)  # the message is computed in the logging thread
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            queued.exception("failed")
+        listener.start()
+        listener.stop()
+        self.assertEqual(handler.lines[0], "INFO args [1, 2]")
+        self.assertTrue(handler.lines[1].startswith("ERROR failed\nTraceback"))
+        self.assertIn("ZeroDivisionError", handler.lines[1])
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "needs os.fork")
+    def test_3fork(self):
+        logger.info("test_3fork")
+        forked = logging.getLogger(__name__ + ".forked")
+        forked.propagate = False
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "log.txt")
+            file_handler = logging.FileHandler(filename)
+            file_handler.setFormatter(logging.Formatter('%(message)s'))
+            handler = mylogconfig.ListeningQueueHandler(file_handler)
+            forked.addHandler(handler)
+            forked.warning("parent before fork")
+            pid = os.fork()
+            if pid == 0:  # child: as a worker of gunicorn --preload
+                status = 1
+                try:
+                    for k in range(5):
+                        forked.warning("child %d", k)
+                    handler.stop()
+                    status = 0
+                finally:
+                    os._exit(status)
+            _, status = os.waitpid(pid, 0)
+            self.assertEqual(status, 0)
+            forked.warning("parent after fork")
+            handler.close()
+            forked.removeHandler(handler)
+            file_handler.close()
+            with open(filename) as file:
+                lines = file.read().splitlines()
+        self.assertEqual(sorted(lines), sorted(["parent before fork", "parent after fork"] +
+                                               [f"child {k}" for k in range(5)]))
+        # a closed handler starts no listener in later forks, and the fork hook does not keep it alive
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if handler.listener is None else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(status, 0)
+        handler_ref = weakref.ref(handler)
+        del handler
+        gc.collect()
+        self.assertIsNone(handler_ref())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import logging
+
+from utils import mylogconfig
+from models.rulesets import Ruleset
+from models.game_states import GameState
+from models.game_trees import GameTree
+from models import numpy_solver, solver
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+@unittest.skipIf(numpy_solver.np is None, "numpy is not installed")
+class TestNumpySolver(unittest.TestCase):
+
+    def test_1enumerate(self):
+        logger.info("test_1enumerate")
+        for rows in [[0, 0, 0, 0, 1], [1, 1, 3, 4, 5], [1, 2, 3, 4, 5]]:
+            tree = GameTree(GameState(rows))
+            states = numpy_solver.enumerate_states(rows)
+            self.assertEqual(len(states), tree.ranker.size)
+            for rank, line in enumerate(states):
+                self.assertEqual(list(line), tree.ranker.unrank(rank))
+            self.assertEqual(list(numpy_solver.rank_states(tree.ranker, states)), list(range(len(states))))
+
+    def test_2winning(self):
+        logger.info("test_2winning")
+        for game_state in [GameState([0, 0, 0, 0, 1]), GameState([0, 1, 2, 3, 4]), GameState([1, 2, 3, 4, 5]),
+                           GameState(list(range(1, 8)), Ruleset.triangle(7, 4))]:
+            tree = GameTree(game_state, iterative=True)
+            numpy_tree = numpy_solver.NumpyTree(game_state)
+            self.assertEqual(numpy_tree.node_count, tree.node_count)
+            for layer in tree.layers:
+                for node in layer.nodes:
+                    self.assertEqual(numpy_tree.find(node.game_state).winning, node.winning)
+
+    def test_3backend(self):
+        logger.info("test_3backend")
+        solver.set_backend(numpy_solver.NumpyTree(GameState([1, 2, 3, 4, 5])))
+        try:
+            gm, cont = solver.solve(GameState([0, 2, 1, 1, 1]), 2)
+            self.assertTrue(gm.row_index == 1 and gm.match_count == 2 and cont == 3)
+            gm, cont = solver.solve(GameState([1, 2, 0, 4, 3]), 2)
+            self.assertTrue(gm.match_count == 1 and cont == 2)
+        finally:
+            solver.set_backend(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import logging
+import itertools
+import pickle
+
+from utils import mylogconfig
+from utils.permutations import Permutation
+from models.game_states import GameState
+from models.game_trees import set_current_tree
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestPermutations(unittest.TestCase):
+
+    def test_1init(self):
+        logger.info("test_1init")
+        self.assertEqual(Permutation([2, 0, 1, 3, 4]).p, (2, 0, 1))
+        self.assertIs(Permutation([2, 0, 1, 3, 4]), Permutation([2, 0, 1]))
+        self.assertIs(Permutation([0, 1, 2], check=False), Permutation.one())
+        self.assertIs(pickle.loads(pickle.dumps(Permutation([1, 2, 0]))), Permutation([1, 2, 0]))
+        with self.assertRaises(AssertionError):
+            Permutation([0, 0, 1])
+        with self.assertRaises(AssertionError):
+            Permutation((1, 0))
+
+    def test_2operations(self):
+        logger.info("test_2operations")
+        p = Permutation([2, 0, 1])
+        self.assertEqual([p(k) for k in range(5)], [2, 0, 1, 3, 4])
+        self.assertEqual(p.apply([1, 'a', 5.0, 8, "xxx"]), ['a', 5.0, 1, 8, "xxx"])
+        self.assertIs(p.inv(), Permutation([1, 2, 0]))
+        self.assertIs(p.inv().inv(), p)
+        self.assertIs(p.mul(p.inv()), Permutation.one())
+        self.assertEqual(Permutation.sorted([3, 5, 4, 2]), ([2, 3, 4, 5], Permutation([1, 3, 2, 0])))
+        self.assertEqual(Permutation.sorted([3, 5, 4, 2], reverse=True), ([5, 4, 3, 2], Permutation([2, 0, 1, 3])))
+        new_list, p = Permutation.sorted([1, 0, 1, 0])  # equal items keep their order
+        self.assertEqual(p, Permutation([2, 0, 3, 1]))
+        self.assertEqual(p.apply([1, 0, 1, 0]), new_list)
+
+    def test_3group(self):
+        logger.info("test_3group")
+        group4 = Permutation.group(4)
+        self.assertEqual(len(group4), 24)
+        self.assertEqual(Permutation.group(3), group4[:6])
+        group5 = Permutation.group(5)
+        self.assertEqual(group5[:24], group4)
+        self.assertEqual(sorted(group5), sorted([Permutation(list(p)) for p in itertools.permutations(range(5))]))
+        for p in group5:
+            for q in group5:
+                r = p.mul(q)
+                self.assertEqual([r(k) for k in range(5)], [p(q(k)) for k in range(5)])
+        # not tabled
+        p = Permutation([6, 0, 1, 2, 3, 4, 5])
+        self.assertEqual(p.mul(p.inv()), Permutation.one())
+        # tabled by set_current_tree for GameState.normalized
+        set_current_tree(GameState([1, 2, 3, 4, 5]))
+        normalized_state, p = GameState([1, 0, 3, 2, 1]).normalized()
+        self.assertIsNotNone(p._index)
+        self.assertEqual(normalized_state.denormalized(p), GameState([1, 0, 3, 2, 1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
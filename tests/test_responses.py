@@ -0,0 +1,70 @@
+import unittest
+import logging
+import itertools
+import json
+
+from utils import mylogconfig
+from models.rulesets import Ruleset, STANDARD
+from models.game_states import GameState, GameMove
+from models.game_trees import GameTree, set_current_tree
+from models.compact_trees import CompactTree
+from models import responses, solver
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestResponses(unittest.TestCase):
+
+    def check_table(self, table: responses.ResponseTable, tree: GameTree):
+        ruleset = table.ruleset
+        for rows in itertools.product(*[range(cap + 1) for cap in ruleset.row_caps]):
+            if sum(rows) == 0:
+                continue
+            rows_state = "".join([str(x) for x in rows])
+            game_state = GameState(list(rows), ruleset)
+            # level 1 is deterministic
+            self.assertEqual(table.lookup(rows_state, 1), responses.encode(*solver.solve(game_state, 1)))
+            # levels 0 and 2: all responses are valid
+            entry = table._entries[rows_state]
+            level0 = [response for group in entry[0] for response in group]
+            for level, possible in [(0, level0), (2, entry[2])]:
+                self.assertIn(table.lookup(rows_state, level), possible)
+                for response in possible:
+                    result = json.loads(response)
+                    if sum(rows) == 1:
+                        self.assertEqual(result, {"gameContinues": -1})
+                        continue
+                    game_move = GameMove(result["rowIndex"], result["numberOfMatches"], ruleset)
+                    self.assertTrue(game_state.is_possible_move(game_move))
+                    if level == 2:
+                        node = tree.find(game_state.normalized()[0])
+                        child = tree.find(game_state.make_move(game_move).normalized()[0])
+                        self.assertTrue(child.winning == -1 if node.winning == 1 else child.winning == 1)
+            self.assertEqual(len(level0), len(set(level0)))
+            if sum(rows) > 1:
+                self.assertEqual(len(level0), sum([min(ruleset.max_take, x, sum(rows) - 1) for x in rows]))
+
+    def test_1table(self):
+        logger.info("test_1table")
+        set_current_tree(GameState([1, 2, 3, 4, 5]))
+        table = responses.ResponseTable(STANDARD)
+        self.assertEqual(table.size, 719)
+        self.check_table(table, solver.get_backend())
+        for rows_state, level in [("12346", 0), ("1234", 1), ("123456", 1), ("abcde", 2), ("00000", 2),
+                                  ("12345", 3), ("1,2,3,4,5", 0)]:
+            self.assertIsNone(table.lookup(rows_state, level))
+
+    def test_2compact(self):
+        logger.info("test_2compact")
+        ruleset = Ruleset([1, 2, 3, 4], 2)
+        tree = GameTree(GameState([1, 2, 3, 4], ruleset))
+        table = responses.ResponseTable(ruleset, CompactTree(tree))
+        self.check_table(table, tree)
+        with self.assertRaises(responses.Error):
+            responses.ResponseTable(Ruleset([1, 2, 3, 4, 10]), CompactTree(tree))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import logging
+
+from utils import mylogconfig
+from models.rulesets import Ruleset, STANDARD, Error
+from models.game_states import GameState, GameMove
+from models import game_states
+from models.game_trees import GameTree, set_current_tree
+from models.compact_trees import CompactTree
+from models.lazy_solver import LazySolver
+from models.analytic_solver import AnalyticSolver
+from models import tree_files, solver
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestRulesets(unittest.TestCase):
+
+    def test_1init(self):
+        logger.info("test_1init")
+        self.assertEqual(STANDARD, Ruleset([1, 2, 3, 4, 5], 3))
+        self.assertEqual(hash(STANDARD), hash(Ruleset([1, 2, 3, 4, 5])))
+        self.assertNotEqual(STANDARD, Ruleset([1, 2, 3, 4, 5], 4))
+        self.assertEqual(Ruleset.triangle(3, 2).row_caps, (1, 2, 3))
+        self.assertEqual(Ruleset.triangle(3, 2).row_count, 3)
+        for row_caps, max_take in [([], 3), ([2, 1], 3), ([0, 1], 3), ([1, 2], 0), ([1, '2'], 3)]:
+            with self.assertRaises(Error):
+                Ruleset(row_caps, max_take)
+
+    def test_2game_states(self):
+        logger.info("test_2game_states")
+        ruleset = Ruleset([2, 2, 4, 6, 6, 10], 4)
+        gs = GameState([2, 0, 4, 1, 6, 10], ruleset)
+        self.assertEqual(str(gs), "[2,0,4,1,6,10]")
+        self.assertNotEqual(gs, GameState([1, 2, 3, 4, 5]))
+        with self.assertRaises(game_states.Error):
+            GameState([3, 0, 0, 0, 0, 0], ruleset)
+        with self.assertRaises(game_states.Error):
+            GameState([1, 2, 3, 4, 5], ruleset)
+        self.assertEqual(gs.make_move(GameMove(5, 4, ruleset)), GameState([2, 0, 4, 1, 6, 6], ruleset))
+        gs = gs.normalized()[0]
+        self.assertEqual(gs.get_rows(), [0, 1, 2, 4, 6, 10])
+        self.assertEqual(len(gs.normalized_successors()), 5 + 4 + 3 + 3)
+        for s_gs in gs.normalized_successors():
+            self.assertEqual(s_gs.ruleset, ruleset)
+            move = gs.get_move(s_gs)
+            self.assertTrue(1 <= move.match_count <= 4)
+
+    def test_3solvers(self):
+        logger.info("test_3solvers")
+        for ruleset in [Ruleset.triangle(6, 2), Ruleset.triangle(7, 4), Ruleset([1, 3, 3, 5, 8], 5)]:
+            root = GameState(list(ruleset.row_caps), ruleset)
+            tree = GameTree(root, iterative=True)
+            self.assertEqual(tree.node_count, GameTree(root).node_count)
+            compact_tree = tree_files.loads(tree_files.dumps(CompactTree(tree)), ruleset=ruleset)
+            lazy_solver = LazySolver(ruleset=ruleset)
+            analytic_solver = AnalyticSolver()
+            for layer in tree.layers:
+                for node in layer.nodes:
+                    self.assertEqual(compact_tree.find(node.game_state).winning, node.winning)
+                    self.assertEqual(lazy_solver.find(node.game_state).winning, node.winning)
+                    self.assertEqual(analytic_solver.find(node.game_state).winning, node.winning)
+            logger.info(f"{ruleset}: {tree.node_count} nodes, root winning {tree.root_node.winning}")
+
+    def test_4solve(self):
+        logger.info("test_4solve")
+        ruleset = Ruleset.triangle(8, 4)
+        gs = GameState([1, 0, 3, 4, 0, 6, 7, 8], ruleset)
+        for level in range(2):
+            gm, cont = solver.solve(gs, level)
+            self.assertTrue(1 <= gm.match_count <= 4 and cont == 1)
+        gm, cont = solver.solve(gs, 1)
+        self.assertTrue(gm.row_index == 7 and gm.match_count == 4)
+        set_current_tree(GameState([1, 2, 3, 4, 5]))
+        gm, cont = solver.solve(gs, 2)  # the current tree has the standard ruleset, the registry is used
+        self.assertTrue(1 <= gm.match_count <= 4 and cont in [2, 3])
+        solver.set_backend(AnalyticSolver())
+        try:
+            gm, cont = solver.solve(gs, 2)
+            self.assertTrue(1 <= gm.match_count <= 4 and cont in [2, 3])
+        finally:
+            solver.set_backend(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import logging
+import itertools
+
+from utils import mylogconfig
+from models.state_ranks import StateRanker
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestStateRanks(unittest.TestCase):
+
+    def test_1rank(self):
+        logger.info("test_1rank")
+        for root_rows in [[0, 0, 0, 0, 1], [0, 0, 1, 2, 3], [1, 1, 3, 4, 5], [1, 2, 3, 4, 5]]:
+            ranker = StateRanker(root_rows)
+            # all normalized states below the root, in lexicographic order
+            states = [list(rows) for rows in itertools.product(*[range(x + 1) for x in root_rows])
+                      if list(rows) == sorted(rows)]
+            self.assertEqual(ranker.size, len(states))
+            for k, rows in enumerate(states):
+                self.assertEqual(ranker.rank(rows), k)
+                self.assertEqual(ranker.unrank(k), rows)
+        ranker = StateRanker([1, 2, 3, 4, 5])
+        self.assertEqual(ranker.size, 132)
+        self.assertEqual(ranker.rank([0, 0, 0, 0, 1]), 1)
+        self.assertEqual(ranker.rank([1, 2, 3, 4, 5]), 131)
+        self.assertTrue(ranker.rank([0, 0, 0, 2, 1]) is None)  # not sorted
+        self.assertTrue(ranker.rank([0, 0, 0, 0, 6]) is None)  # exceeds the root
+        self.assertTrue(StateRanker([0, 0, 1, 2, 3]).rank([0, 0, 0, 0, 4]) is None)
+
+
+if __name__ == "__main__":
+    unittest.main()
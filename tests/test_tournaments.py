@@ -0,0 +1,56 @@
+import unittest
+import logging
+
+from utils import mylogconfig
+from models.rulesets import Ruleset
+from models.game_states import GameState
+from models import tournaments
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestTournaments(unittest.TestCase):
+
+    def test_1game(self):
+        logger.info("test_1game")
+        # the first player has a safe strategy to win the standard game
+        for _ in range(20):
+            winner, moves = tournaments.play_game(GameState([1, 2, 3, 4, 5]), 2, 2)
+            self.assertEqual(winner, 0)
+            self.assertEqual(moves % 2, 1)  # the first player makes the last move
+        # 00111 is lost for the player to move
+        self.assertEqual(tournaments.play_game(GameState([0, 0, 1, 1, 1]), 0, 0), (1, 2))
+
+    def test_2tournament(self):
+        logger.info("test_2tournament")
+        chunk_size = tournaments.CHUNK_SIZE
+        tournaments.CHUNK_SIZE = 7  # several chunks per match
+        try:
+            root = GameState([1, 2, 3, 4, 5])
+            results = tournaments.play_tournament(root, [0, 2], 20, tournament_seed=5)
+            self.assertEqual([(r.first_level, r.second_level, r.games) for r in results],
+                             [(0, 0, 20), (0, 2, 20), (2, 0, 20), (2, 2, 20)])
+            self.assertEqual(results[2].win_rate(), 1.0)
+            self.assertEqual(results[3].win_rate(), 1.0)
+            self.assertTrue(all([r.average_length() >= 5 for r in results]))
+            # the results only depend on the seed
+            for workers in [1, 2]:
+                other_results = tournaments.play_tournament(root, [0, 2], 20, tournament_seed=5, workers=workers)
+                self.assertEqual([(r.first_wins, r.moves) for r in other_results],
+                                 [(r.first_wins, r.moves) for r in results])
+            logger.info("\n" + tournaments.report(results))
+        finally:
+            tournaments.CHUNK_SIZE = chunk_size
+
+    def test_3ruleset(self):
+        logger.info("test_3ruleset")
+        ruleset = Ruleset([2, 3, 4], 2)
+        root = GameState([2, 3, 4], ruleset)
+        results = tournaments.play_tournament(root, [1, 2], 10)
+        self.assertEqual(sum([r.games for r in results]), 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import logging
+import os
+import tempfile
+
+from utils import mylogconfig
+from models import tree_files
+from models.game_states import GameState
+from models.game_trees import GameTree, set_current_tree, current_tree
+from models.compact_trees import CompactTree
+from models.solver import solve
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestTreeFiles(unittest.TestCase):
+
+    def assertTreesEqual(self, tree1, tree2):
+        self.assertEqual(tree1.node_count, tree2.node_count)
+        self.assertEqual(tree1.root_id, tree2.root_id)
+        for a1, a2 in zip(tree1.get_arrays(), tree2.get_arrays()):
+            self.assertEqual(list(a1), list(a2))
+
+    def test_1dumps_loads(self):
+        logger.info("test_1dumps_loads")
+        for rows in [[0, 0, 0, 0, 1], [0, 0, 1, 2, 3], [1, 2, 3, 4, 5]]:
+            tree = CompactTree(GameTree(GameState(rows)))
+            contents = tree_files.dumps(tree)
+            self.assertEqual(len(contents) % 8, 4)  # aligned parts and checksum
+            self.assertTreesEqual(tree_files.loads(contents, rows), tree)
+            self.assertTreesEqual(tree_files.loads(contents), tree)
+
+    def test_2stale(self):
+        logger.info("test_2stale")
+        contents = tree_files.dumps(CompactTree(GameTree(GameState([0, 0, 1, 2, 3]))))
+        with self.assertRaises(tree_files.Error):  # other root
+            tree_files.loads(contents, [1, 2, 3, 4, 5])
+        with self.assertRaises(tree_files.Error):  # damaged
+            tree_files.loads(contents[:20] + bytes([contents[20] ^ 1]) + contents[21:])
+        with self.assertRaises(tree_files.Error):  # other version
+            tree_files.loads(contents[:4] + bytes([tree_files.FORMAT_VERSION + 1]) + contents[5:])
+        with self.assertRaises(tree_files.Error):  # truncated
+            tree_files.loads(contents[:10])
+
+    def test_3load_or_build(self):
+        logger.info("test_3load_or_build")
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'trees', 'tree.bin')
+            game_state = GameState([0, 1, 2, 3, 4])
+            # missing
+            tree = tree_files.load_or_build(filename, game_state)
+            self.assertTrue(os.path.exists(filename))
+            self.assertTreesEqual(tree_files.read_tree(filename), tree)
+            # stale
+            other_tree = tree_files.load_or_build(filename, GameState([0, 0, 1, 2, 3]))
+            self.assertEqual(other_tree.get_rows(other_tree.root_id), [0, 0, 1, 2, 3])
+            self.assertEqual(tree_files.read_tree(filename).node_count, other_tree.node_count)
+
+    def test_4current_tree(self):
+        logger.info("test_4current_tree")
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'tree.bin')
+            set_current_tree(GameState([1, 2, 3, 4, 5]), filename=filename)
+            set_current_tree(GameState([1, 2, 3, 4, 5]), filename=filename)  # read
+            self.assertTrue(isinstance(current_tree(), CompactTree))
+            gm, cont = solve(GameState([0, 2, 1, 1, 1]), 2)
+            self.assertTrue(gm.row_index == 1 and gm.match_count == 2 and cont == 3)
+            gm, cont = solve(GameState([1, 2, 0, 4, 3]), 2)
+            self.assertTrue(gm.match_count == 1 and cont == 2)
+        set_current_tree(GameState([1, 2, 3, 4, 5]))
+
+    def test_5map_tree(self):
+        logger.info("test_5map_tree")
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'tree.bin')
+            tree = tree_files.load_or_build(filename, GameState([1, 2, 3, 4, 5]), shared=True)
+            self.assertTrue(isinstance(tree.winning, memoryview) and tree.winning.readonly)
+            self.assertTreesEqual(tree, tree_files.read_tree(filename))
+            with self.assertRaises(tree_files.Error):
+                tree_files.map_tree(filename, [0, 1, 2, 3, 4])
+            set_current_tree(GameState([1, 2, 3, 4, 5]), filename=filename, shared=True)
+            gm, cont = solve(GameState([0, 2, 1, 1, 1]), 2)
+            self.assertTrue(gm.row_index == 1 and gm.match_count == 2 and cont == 3)
+            del tree
+        set_current_tree(GameState([1, 2, 3, 4, 5]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import logging
+import threading
+
+from utils import mylogconfig
+from models.rulesets import Ruleset
+from models.game_states import GameState
+from models.tree_registry import TreeRegistry
+from models.game_trees import set_current_tree
+from models import tree_registry, solver, tree_files
+
+mylogconfig.standard_rot(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TestTreeRegistry(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_current_tree(GameState([1, 2, 3, 4, 5]))  # the backend of solver.solve
+
+    def test_1get(self):
+        logger.info("test_1get")
+        registry = TreeRegistry()
+        tree1 = registry.get(GameState([1, 2, 3, 4, 5]))
+        tree2 = registry.get(GameState([0, 1, 2, 3, 4]))
+        self.assertTrue(registry.get(GameState([1, 2, 3, 4, 5])) is tree1)
+        self.assertTrue(registry.get(GameState([0, 1, 2, 3, 4])) is tree2)
+        ruleset = Ruleset([1, 2, 3, 4, 5], 2)
+        tree3 = registry.get(GameState([1, 2, 3, 4, 5], ruleset))
+        self.assertTrue(tree3 is not tree1 and tree3.ruleset == ruleset)
+        info = registry.info()
+        logger.info(f"registry info: {info}")
+        self.assertEqual((info['trees'], info['hits'], info['misses'], info['evictions']), (3, 2, 3, 0))
+        self.assertEqual(info['bytes'], sum([tree.memory_size() for tree in [tree1, tree2, tree3]]))
+
+    def test_2evict(self):
+        logger.info("test_2evict")
+        roots = [GameState([0, 0, 1, 2, 3]), GameState([0, 1, 2, 3, 4]), GameState([1, 2, 3, 4, 5])]
+        sizes = [TreeRegistry().get(root).memory_size() for root in roots]
+        registry = TreeRegistry(max_bytes=sizes[1] + sizes[2])
+        for root in roots:
+            registry.get(root)
+        self.assertEqual(registry.info()['evictions'], 1)  # the tree of 00123
+        registry.get(roots[1])  # hit
+        registry.get(roots[0])  # rebuild, evicts the tree of 12345
+        self.assertEqual(registry.info()['evictions'], 2)
+        registry.get(roots[1])
+        self.assertEqual(registry.info()['misses'], 4)
+        registry = TreeRegistry(max_bytes=1)
+        registry.get(roots[2])
+        self.assertEqual(registry.info()['trees'], 1)  # the tree just built is never evicted
+
+    def test_3solve(self):
+        logger.info("test_3solve")
+        registry = TreeRegistry()
+        tree_registry.set_registry(registry)
+        try:
+            gm, cont = solver.solve(GameState([0, 1, 1, 0, 1]), 2, root=GameState([0, 1, 1, 2, 2]))
+            self.assertTrue(gm.match_count == 1 and cont == 2)
+            gm, cont = solver.solve(GameState([0, 2, 1, 1, 1]), 2, root=GameState([0, 1, 1, 2, 2]))
+            self.assertTrue(gm.row_index == 1 and gm.match_count == 2 and cont == 3)
+            self.assertEqual(registry.info()['misses'], 1)
+            with self.assertRaises(solver.Error):
+                solver.solve(GameState([0, 0, 0, 0, 5]), 2, root=GameState([0, 1, 1, 2, 2]))
+            with self.assertRaises(solver.Error):
+                solver.solve(GameState([1, 2, 3, 4, 5]), 2, root=GameState([0, 1, 1, 2, 2]))
+            ruleset = Ruleset.triangle(6, 2)
+            gm, cont = solver.solve(GameState([1, 2, 3, 4, 5, 6], ruleset), 2)
+            self.assertTrue(gm.match_count <= 2)
+            self.assertEqual(registry.info()['misses'], 2)
+        finally:
+            tree_registry.set_registry(TreeRegistry())
+
+    def test_4concurrent(self):
+        logger.info("test_4concurrent")
+        slow_root, fast_root = GameState([1, 2, 3, 4, 5]), GameState([0, 0, 1, 2, 3])
+        started, release = threading.Event(), threading.Event()
+        builds = []
+
+        def builder(root):
+            builds.append(root)
+            if root == slow_root:
+                started.set()
+                release.wait(10)
+            return tree_files.build_tree(root)
+
+        registry = TreeRegistry(builder=builder)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get(slow_root))) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(started.wait(10))
+        registry.get(fast_root)  # not blocked by the build of slow_root
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(builds, [slow_root, fast_root])  # slow_root is built once
+        self.assertTrue(len(results) == 3 and all([tree is results[0] for tree in results]))
+        self.assertEqual(registry.info()['misses'], 2)
+
+        def failing_builder(root):
+            raise MemoryError("too big")
+
+        registry = TreeRegistry(builder=failing_builder)
+        for _ in range(2):  # a failed build is not cached
+            with self.assertRaises(MemoryError):
+                registry.get(fast_root)
+        self.assertEqual(registry.info()['trees'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,327 @@
+"""Module for metrics of the app, exposed in the Prometheus text format, see the endpoint /metrics of the app.
+
+There are 3 kinds of metrics:
+    Counter: counts events, e.g. requests, by the values of its labels.
+    Histogram: counts observed values, e.g. latencies, in buckets, by the values of its labels.
+    Callback: a gauge or counter whose value is computed by a function on each scrape, e.g. the node count of a tree.
+A metric is created once, at import of the module recording it, and registered by its name, see render.
+
+Recording must be cheap: each thread records into its own shard, a dict of label values to counts, thus recording
+needs no lock. A scrape copies the shards (dict.copy is atomic) and sums them up. The shards of finished threads are
+folded into a base dict, when a new shard is created and on each scrape, thus servers starting a thread per request
+do not accumulate shards.
+
+The counters and histograms of several processes are aggregated, if share was called before the processes were
+forked, e.g. by the app, which is imported by the master of gunicorn --preload before it forks the workers:
+each process writes a snapshot of its values to a file in a shared directory every SNAPSHOT_INTERVAL seconds and at
+exit, and a scrape adds the snapshots of all other processes to its own values. Thus, the values of the other
+processes may lag by up to SNAPSHOT_INTERVAL seconds. Callbacks are computed by the scraped process only.
+
+Example:
+    REQUESTS = Counter("requests_total", "Number of requests.", ["route"])
+    REQUESTS.inc("next_move")
+    render() == '# HELP requests_total Number of requests.\\n# TYPE requests_total counter\\n'
+                'requests_total{route="next_move"} 1\\n'
+"""
+
+from __future__ import annotations  # for type annotations with forward references
+from typing import Callable, Dict, List, Sequence, Tuple  # for type annotations
+
+import atexit
+import bisect
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# The content type of the Prometheus text format.
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+# The default upper bounds of the buckets of a histogram, in seconds.
+
+SNAPSHOT_INTERVAL = 1.0
+# Seconds between the snapshots of a process, see module doc.
+
+
+class Error(Exception):
+    """Class for exceptions of this module."""
+
+    @classmethod
+    def check(cls, condition, *args):
+        """Check condition and raise exception if it does not hold."""
+        if not condition:
+            raise cls(*args)
+
+
+_metrics: Dict[str, Metric] = {}
+# The registered metrics by name, in the order of creation.
+
+
+class Metric:
+    """Base class of the metrics, see module doc.
+
+    Attributes:
+        name: str
+            The name of the metric, unique among all metrics.
+        help: str
+            The description of the metric.
+        kind: str
+            The Prometheus type of the metric: 'counter', 'histogram' or 'gauge'.
+        label_names: Tuple[str, ...]
+            The names of the labels, their values are given when recording.
+    """
+
+    def __init__(self, name: str, help: str, kind: str, label_names: Sequence[str] = ()):
+        Error.check(name not in _metrics, f"metric {name} exists already")
+        self.name: str = name
+        self.help: str = help
+        self.kind: str = kind
+        self.label_names: Tuple[str, ...] = tuple(label_names)
+        self.reset()
+        _metrics[name] = self
+
+    def reset(self) -> None:
+        """Remove all recorded values of this process, e.g. the values of the parent after a fork."""
+        self._base: dict = {}  # the values of the finished threads
+        self._shards: Dict[threading.Thread, dict] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()  # for _base and _shards, not needed for recording
+
+    def _shard(self) -> dict:
+        """Return the shard of the current thread, create it if necessary."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = {}
+            with self._lock:
+                self._reclaim()
+                self._shards[threading.current_thread()] = shard
+            self._local.shard = shard
+            return shard
+
+    def _reclaim(self) -> None:
+        """Fold the shards of the finished threads into the base, the lock must be held."""
+        for thread, shard in list(self._shards.items()):
+            if not thread.is_alive():
+                self._merge(self._base, shard)
+                del self._shards[thread]
+
+    def _merge(self, total: dict, values: dict) -> None:
+        """Add values to total, both map label values to recorded values."""
+        raise NotImplementedError
+
+    def local_values(self) -> dict:
+        """Return the values recorded by all threads of this process, by label values."""
+        with self._lock:
+            self._reclaim()
+            result = {}
+            self._merge(result, self._base)
+            for shard in list(self._shards.values()):
+                self._merge(result, shard.copy())
+        return result
+
+    def values(self) -> dict:
+        """Return the values recorded by all processes, see module doc."""
+        result = self.local_values()
+        for snapshot in _snapshots():
+            self._merge(result, {tuple(label_values): value for label_values, value in snapshot.get(self.name, [])})
+        return result
+
+    def labels(self, label_values: Tuple[str, ...], extra: str = None) -> str:
+        """Return the labels in the text format, extra is an additional label, e.g. le="0.1"."""
+        items = [f'{name}="{escape(value)}"' for name, value in zip(self.label_names, label_values)]
+        if extra is not None:
+            items.append(extra)
+        return "{" + ",".join(items) + "}" if items else ""
+
+    def samples(self) -> List[str]:
+        """Return the lines of the samples in the text format."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Return the metric in the text format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    """Counts events by the values of its labels."""
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help, 'counter', label_names)
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Count an event with the given label values."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        shard[label_values] = shard.get(label_values, 0) + amount
+
+    def _merge(self, total: Dict[Tuple[str, ...], float], values: Dict[Tuple[str, ...], float]) -> None:
+        for label_values, count in values.items():
+            total[label_values] = total.get(label_values, 0) + count
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self.labels(label_values)} {format_value(count)}"
+                for label_values, count in sorted(self.values().items())]
+
+
+class Histogram(Metric):
+    """Counts observed values in buckets by the values of its labels.
+
+    Attributes:
+        buckets: Tuple[float, ...]
+            The upper bounds of the buckets, increasing. The bucket +Inf is added implicitly.
+    """
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] =
+                 LATENCY_BUCKETS):
+        super().__init__(name, help, 'histogram', label_names)
+        self.buckets: Tuple[float, ...] = tuple(buckets)
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Count value in its bucket. A shard entry is [count of bucket 0, .., count of bucket +Inf, sum]."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        entry = shard.get(label_values)
+        if entry is None:
+            entry = shard[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect.bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def _merge(self, total: Dict[Tuple[str, ...], List[float]], values: Dict[Tuple[str, ...], List[float]]) \
+            -> None:
+        for label_values, entry in values.items():
+            entry_total = total.setdefault(label_values, [0] * len(entry))
+            for k, x in enumerate(list(entry)):  # copy, the entry might be changed by its thread
+                entry_total[k] += x
+
+    def samples(self) -> List[str]:
+        lines = []
+        for label_values, entry in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), entry):
+                cumulative += count
+                le = f'le="{format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{self.labels(label_values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self.labels(label_values)} {format_value(entry[-1])}")
+            lines.append(f"{self.name}_count{self.labels(label_values)} {cumulative}")
+        return lines
+
+
+class Callback(Metric):
+    """A gauge or counter without labels, whose value is computed on each scrape.
+
+    Attributes:
+        function: Callable[[], float or None]
+            Computes the value, None if there is no value, e.g. if the tree is not built yet.
+    """
+
+    def __init__(self, name: str, help: str, function: Callable[[], float or None], kind: str = 'gauge'):
+        assert kind in ['gauge', 'counter']
+        super().__init__(name, help, kind)
+        self.function: Callable[[], float or None] = function
+
+    def reset(self) -> None:
+        pass  # nothing recorded
+
+    def values(self) -> dict:
+        return {}
+
+    def samples(self) -> List[str]:
+        value = self.function()
+        return [f"{self.name} {format_value(value)}"] if value is not None else []
+
+
+def escape(value: str) -> str:
+    """Escape a label value for the text format."""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_value(value: float) -> str:
+    """Format a value for the text format, integers without decimal point."""
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render() -> str:
+    """Return all metrics in the Prometheus text format."""
+    return "".join([metric.render() for metric in _metrics.values()])
+
+
+_directory: str or None = None
+# The directory of the snapshots, None if the processes do not share their values, see share.
+
+
+def share(directory: str = None) -> str:
+    """Aggregate the values of this process and of all processes forked later, see module doc.
+    :param directory: the directory of the snapshots, default: a new temporary directory, which is removed at exit
+        of this process.
+    :return: the directory.
+    """
+    global _directory
+    Error.check(_directory is None, "the metrics are shared already")
+    _directory = directory or tempfile.mkdtemp(prefix="metrics-")
+    if directory is None:
+        atexit.register(shutil.rmtree, _directory, True)  # registered before write_snapshot, thus called after it
+    atexit.register(write_snapshot)
+    os.register_at_fork(after_in_child=_after_fork)
+    _start_writer()
+    return _directory
+
+
+def _after_fork() -> None:
+    """Start the forked process without the values of its parent."""
+    for metric in _metrics.values():
+        metric.reset()
+    _start_writer()
+
+
+def _start_writer() -> None:
+    """Start the thread writing the snapshots of this process."""
+    def write_periodically():
+        while True:
+            time.sleep(SNAPSHOT_INTERVAL)
+            write_snapshot()
+
+    threading.Thread(target=write_periodically, name="metrics snapshots", daemon=True).start()
+
+
+def write_snapshot() -> None:
+    """Write the values of this process to its file in the directory of the snapshots."""
+    if _directory is None:
+        return
+    snapshot = {name: [[list(label_values), value] for label_values, value in metric.local_values().items()]
+                for name, metric in _metrics.items() if not isinstance(metric, Callback)}
+    path = os.path.join(_directory, f"{os.getpid()}.json")
+    try:
+        with open(path + ".tmp", 'w') as file:
+            json.dump(snapshot, file)
+        os.replace(path + ".tmp", path)  # atomic, a scrape never reads a partial snapshot
+    except OSError:
+        pass  # e.g. the directory was removed at exit
+
+
+def _snapshots() -> List[Dict[str, list]]:
+    """Return the snapshots of the other processes, see write_snapshot."""
+    if _directory is None:
+        return []
+    own = f"{os.getpid()}.json"
+    result = []
+    for filename in os.listdir(_directory):
+        if filename.endswith(".json") and filename != own:
+            try:
+                with open(os.path.join(_directory, filename)) as file:
+                    result.append(json.load(file))
+            except (OSError, ValueError):
+                pass  # removed or being replaced
+    return result
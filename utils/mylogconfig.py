@@ -2,7 +2,15 @@
 Import this module in the "main" file and choose a config
 """
 
+from typing import Dict, List  # for type annotations
+
+import atexit
+import functools
+import itertools
 import logging
+import os
+import queue
+import weakref
 from logging import handlers
 
 
@@ -42,6 +50,13 @@ def standard_rot(filename='log.txt', level=logging.WARNING, max_bytes=16 * 1024,
     rlogger = logging.getLogger()
     # set its level
     rlogger.setLevel(level)
+    # add the handlers to the logger
+    for handler in rot_handlers(filename, level, max_bytes, backup_count):
+        rlogger.addHandler(handler)
+
+
+def rot_handlers(filename='log.txt', level=logging.WARNING, max_bytes=16 * 1024, backup_count=5) -> list:
+    """Return the handlers of standard_rot."""
     # create file handler with same level
     fh = handlers.RotatingFileHandler(filename, mode='a', maxBytes=max_bytes, backupCount=backup_count)
     fh.setLevel(level)
@@ -52,6 +67,104 @@ def standard_rot(filename='log.txt', level=logging.WARNING, max_bytes=16 * 1024,
     formatter = logging.Formatter('%(asctime)s | %(levelname)s |  %(module)s,%(lineno)d \n %(message)s')
     fh.setFormatter(formatter)
     ch.setFormatter(formatter)
-    # add the handlers to the logger
-    rlogger.addHandler(fh)
-    rlogger.addHandler(ch)
+    return [fh, ch]
+
+
+class SamplingFilter(logging.Filter):
+    """Passes only 1 of every n records below level WARNING, all other records pass.
+    Attach it to the logger of a hot path: dropped records are neither formatted nor queued.
+    """
+
+    def __init__(self, rate: float):
+        """:param rate: the fraction of records below WARNING passing, in 0..1."""
+        super().__init__()
+        self.n = round(1 / rate) if rate > 0 else 0  # 0: none passes
+        self._counter = itertools.count()  # next() is atomic, thus the filter is thread-safe
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        return self.n > 0 and next(self._counter) % self.n == 0
+
+
+class DeferringQueueHandler(handlers.QueueHandler):
+    """A QueueHandler leaving the formatting to the handlers of the listener thread.
+    Only the message is computed in the logging thread, since the arguments might change later.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class ListeningQueueHandler(DeferringQueueHandler):
+    """A DeferringQueueHandler with its own queue and listener thread in each process.
+    A forked process does not inherit the listener thread, e.g. a worker of gunicorn --preload, which forks after
+    the app has configured its logging. Thus, after a fork, the child gets a new queue and starts a new listener.
+    The records queued before the fork are written by the parent.
+
+    Attributes:
+        targets: List[logging.Handler]
+            The handlers of the listener, they format and write the records.
+        listener: handlers.QueueListener
+            The listener of the current process.
+    """
+
+    def __init__(self, *targets: logging.Handler):
+        super().__init__(queue.SimpleQueue())
+        self.targets: List[logging.Handler] = list(targets)
+        self.listener: handlers.QueueListener or None = None
+        self._closed: bool = False
+        self.start()
+        # the hooks cannot be unregistered, thus the hook must not keep the handler alive
+        os.register_at_fork(after_in_child=functools.partial(_start_in_child, weakref.ref(self)))
+
+    def start(self) -> None:
+        """Start the listener of the current process with a new queue, unless the handler is closed."""
+        if self._closed:
+            return
+        self.queue = queue.SimpleQueue()
+        self.listener = handlers.QueueListener(self.queue, *self.targets, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Stop the listener of the current process, after it has written the queued records."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def close(self) -> None:
+        self._closed = True
+        self.stop()
+        super().close()
+
+
+def _start_in_child(handler_ref: weakref.ref) -> None:
+    """Start the listener of a ListeningQueueHandler in a forked process, if the handler is still alive."""
+    handler = handler_ref()
+    if handler is not None:
+        handler.start()
+
+
+def queued(filename='log.txt', level=logging.WARNING, max_bytes=16 * 1024, backup_count=5,
+           sampling: Dict[str, float] = None) -> ListeningQueueHandler:
+    """Like standard_rot, with the same format, but the handlers run in a background thread.
+    The logging thread only puts the records into a queue, the listener thread formats and writes them.
+    Each process has its own listener, see ListeningQueueHandler. It is stopped at exit, after writing the queued
+    records.
+    :param sampling: the sampling rate by logger name, see SamplingFilter.
+        Example: {'app': 0.01} logs 1 of 100 records below WARNING of the logger 'app'.
+    :return: the handler added to the root logger.
+    """
+    rlogger = logging.getLogger()
+    rlogger.setLevel(level)
+    handler = ListeningQueueHandler(*rot_handlers(filename, level, max_bytes, backup_count))
+    rlogger.addHandler(handler)
+    for name, rate in (sampling or {}).items():
+        logging.getLogger(name).addFilter(SamplingFilter(rate))
+    atexit.register(handler.stop)
+    return handler
@@ -4,7 +4,7 @@ Version 0.2.0
 Derived from module permutation0.py, v0.1.0. That module uses a "dummy index 0".
 In this module, index 0 is not dummy.
 
-A permutation is represented by a list, e.g. (0,2,1) is represented by [0,2,1].
+A permutation is represented by a tuple, e.g. (0,2,1) is represented by (0,2,1). It is created from a list.
 Note: other than in most mathematical texts, the number 0 is also used.
 That is, permutations operate on the integers 0,1,2,... and not 1,2,3...
 
@@ -22,32 +22,56 @@ The identity is represented by (0) -- maybe () would be more consistent and more
 
 The lexicographic order ist defined for permutations, e.g. (1,3,2) < (2,1,3).
 Therefore, a list containing permutations can be sorted.
+
+Permutations are immutable and interned: creating an equal permutation again returns the existing instance.
+The inverse of a permutation is computed once and then kept. The permutations of 0..n-1 for small n can be
+tabled with Permutation.group(n): then mul of 2 tabled permutations is a lookup in a composition table, and they
+stay alive with their inverses. models.game_trees.set_current_tree tables the permutations of the rows of the
+current ruleset, thus GameState.normalized neither creates a permutation nor computes an inverse.
+Permutation(plist) checks plist, see check_list. On trusted internal paths, the check can be skipped with
+Permutation(plist, check=False).
 """
 
 from __future__ import annotations  # for type annotations with forward references
 from typing import List, Tuple  # for type annotations
 
-import copy 
 import functools
+import itertools
+import math
+import weakref
 
 
 PList = List[int]
 # List of integers representing a permutation.
 
+TABLE_MAX_SIZE = 6
+# Maximal n for Permutation.group(n). The composition table has (n!)**2 entries.
+
 
 @functools.total_ordering  # generates from == and < the other comparison operators
 class Permutation:
     """Models a permutation and its operations
 
     Attributes:
-        p: PList
-            A list of integers representing a permutation.
-            Note that this list must satisfy special conditions, see check_list.
+        p: Tuple[int, ...]
+            A tuple of integers representing a permutation.
+            Note that this tuple must satisfy special conditions, see check_list.
 
     Example:
         Permutation([1, 2, 0]) creates the permutation (1,2,0)
     """
-    
+
+    __slots__ = ('p', '_inv', '_index', '__weakref__')
+
+    _interned: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+    # All living permutations by their tuple.
+
+    _group: List[Permutation] = []
+    # The tabled permutations, see group. The index of a tabled permutation in this list is its attribute _index.
+
+    _products: List[int] = []
+    # The composition table: _products[i * len(_group) + j] is the index of _group[i].mul(_group[j]).
+
     @staticmethod
     def check_list(plist: PList) -> None:
         """ Check with assertions that plist is a list representing a permutation."""
@@ -60,55 +84,70 @@ class Permutation:
             assert 0 <= plist[k] <= n-1
             assert not occupied[plist[k]]
             occupied[plist[k]] = True
-    
-    def __init__(self, plist: PList):
-        self.check_list(plist)
-        self.p = copy.deepcopy(plist)
-        self._normalize()
-        
+
+    def __new__(cls, plist: PList, check: bool = True):
+        """Return the permutation represented by plist.
+        :param check: if False, plist is trusted to represent a permutation and not checked, see check_list.
+        """
+        if check:
+            cls.check_list(plist)
+        return cls._make(plist)
+
+    @classmethod
+    def _make(cls, plist) -> Permutation:
+        """Return the interned permutation represented by the list or tuple plist, which is not checked.
+        The representation is reduced as much as possible, e.g. (2,0,1,3,4) to (2,0,1).
+        """
+        n = len(plist) - 1
+        while (n > 0) and (plist[n] == n):
+            n -= 1
+        key = tuple(plist[:n+1])
+        perm = cls._interned.get(key)
+        if perm is None:
+            perm = object.__new__(cls)
+            perm.p = key
+            perm._inv = None
+            perm._index = None
+            cls._interned[key] = perm
+        return perm
+
     def __repr__(self):
-        return repr(self.p)
-        
+        return repr(list(self.p))
+
     def __str__(self):
         s = f"({self.p[0]}"
         for k in range(1, len(self.p)):
             s += f", {self.p[k]}"
         s += ")"
         return s
-    
+
     def __eq__(self, other):
         if isinstance(other, self.__class__):
             return self.p == other.p
         else:
             return NotImplemented
-        
+
     def __lt__(self, other):
         if isinstance(other, self.__class__):
             return self.p < other.p
         else:
             return NotImplemented
 
-    def _normalize(self) -> None:
-        """Reduce the length of the list as much as possible, e.g. (2,0,1,3,4) to (2,0,1)."""
-        n = len(self.p)-1
-        while (n > 0) and (self.p[n] == n):
-            n -= 1
-        if n < len(self. p)-1:
-            self.p = self.p[:n+1]
-            
+    def __hash__(self):
+        return hash(self.p)
+
+    def __reduce__(self):
+        return self.__class__._make, (self.p,)
+
     def __call__(self, n: int) -> int:
         """Return the value of the permutation at index n.
         Note: if n is >= "length" of the permutation, then returns n.
         """
-        assert isinstance(n, int)
-        assert n >= 0
-        if n < len(self.p):
-            return self.p[n]
-        else:
-            return n
+        p = self.p
+        return p[n] if n < len(p) else n
 
     def length(self) -> int:
-        """Return the length of the internal list representing the permutation.
+        """Return the length of the internal tuple representing the permutation.
         The identity permutation Permutation.one() has length 1.
         """
         return len(self.p)
@@ -119,48 +158,46 @@ class Permutation:
             p.lengthen(6) returns the list [1,2,0,3,4]
             p.lengthen(n) returns the list [1,2,0] for n <= 3
         """
-        if n > len(self.p):
-            p_new = self.p + [k for k in range(len(self.p), n)]
-            return p_new
-        else:
-            return copy.deepcopy(self.p)
-    
+        return list(self.p) + list(range(len(self.p), n))
+
     def mul(self, other) -> Permutation:
         """Return the "multiplication" of 2 permutations in the sense of composition of functions.
         The expression p.mul(q) means: first apply q then p  (-- note the reversed order!)
+        If both permutations are tabled (see group), this is a lookup.
         """
         assert isinstance(other, self.__class__)
+        if self._index is not None and other._index is not None:
+            group = Permutation._group
+            return group[Permutation._products[self._index * len(group) + other._index]]
         n = max(len(self.p), len(other.p))
         p = self.lengthen(n)
         q = other.lengthen(n)
-        assert len(p) == len(q)
-        r = [p[q[k]] for k in range(0, n)]
-        return Permutation(r)
-        
+        return Permutation._make([p[q[k]] for k in range(n)])
+
     def inv(self) -> Permutation:
-        """Return the inverse permutation."""
-        n = len(self.p)
-        p = [0 for _ in range(n)]
-        for k in range(n):
-            p[self.p[k]] = k
-        return Permutation(p)
+        """Return the inverse permutation. It is computed only once."""
+        if self._inv is None:
+            p = [0] * len(self.p)
+            for k, x in enumerate(self.p):
+                p[x] = k
+            self._inv = Permutation._make(p)
+            self._inv._inv = self
+        return self._inv
 
     def apply(self, a_list: list) -> list:
         """Apply the permutation to a_list and return the new list.
         The length of the permutation must be <= len(a_list).
         Example: Permutation([2, 0, 1]).apply([1, 'a', 5.0, 8, "xxx"]) returns ['a', 5.0, 1, 8, "xxx"]
         """
-        n = len(a_list)
-        assert self.length() <= n
-        p = self.inv()  # !!!
-        new_list = [a_list[p(k)] for k in range(n)]
-        return new_list
+        assert self.length() <= len(a_list)
+        q = self.inv().p  # !!!
+        return [a_list[k] for k in q] + a_list[len(q):]
 
     @classmethod
     def sorted(cls, a_list, key=None, reverse=False) -> Tuple[list, Permutation]:
         """Return a sorted copy of a_list and the permutation that when applied to a_list returns this copy.
         The parameters are as for the builtin function sorted, except that a_list must be a list,
-        other iterables are not (yet) allowed.
+        other iterables are not (yet) allowed. Equal items keep their order.
         Example: Permutation.sorted([3,5,4,2]) returns [2,3,4,5],(1,3,2,0)
                  Permutation.sorted([3,5,4,2], reverse=True) returns [5,4,3,2],(2,0,1,3)
         """
@@ -169,26 +206,37 @@ class Permutation:
         n = len(a_list)
         if n == 0:
             return [], cls.one()
-        new_list = sorted(a_list, key=key, reverse=reverse)
-        # generate the permutation
-        p_list = []
-        occupied = [False for _ in new_list]
-        for item in a_list:
-            indices = [k for k in range(n) if item == new_list[k] and not occupied[k]]
-            assert len(indices) > 0
-            index = indices[0]
-            occupied[index] = True
-            p_list.append(index)
-        p = Permutation(p_list)
-        # check
-        assert len(p_list) == n
-        for k in range(n):
-            assert a_list[k] == new_list[p(k)]
-        assert p.apply(a_list) == new_list
-        assert a_list == p.inv().apply(new_list)
-        # result
-        return new_list, p
-        
+        # order[k] is the index in a_list of the item at index k in the sorted list
+        item_key = a_list.__getitem__ if key is None else lambda k: key(a_list[k])
+        order = sorted(range(n), key=item_key, reverse=reverse)
+        new_list = [a_list[k] for k in order]
+        # the permutation is the inverse of order
+        return new_list, cls._make(order).inv()
+
     @classmethod
     def one(cls) -> Permutation:
-        return cls([0])
+        return cls._make([0])
+
+    @classmethod
+    def group(cls, n: int) -> List[Permutation]:
+        """Return all permutations of 0..n-1 and table them: their inverses are computed and the composition table
+        is built, such that mul is a lookup.
+        The permutations are ordered such that for all k <= n, the first k! ones are the permutations of 0..k-1.
+        Thus, the indices of tabled permutations do not change when a greater n is tabled later.
+        """
+        assert 1 <= n <= TABLE_MAX_SIZE
+        if len(cls._group) < math.factorial(n):
+            group = [cls._make(list(p)) for k in range(1, n + 1) for p in itertools.permutations(range(k))
+                     if k == 1 or p[k-1] != k-1]
+            indices = {perm.p: index for index, perm in enumerate(group)}
+            lists = [perm.lengthen(n) for perm in group]
+            products = [0] * (len(group) * len(group))
+            for i, p in enumerate(lists):
+                for j, q in enumerate(lists):
+                    products[i * len(group) + j] = indices[cls._make([p[q[k]] for k in range(n)]).p]
+            for index, perm in enumerate(group):
+                perm._index = index
+                perm.inv()
+            cls._group = group
+            cls._products = products
+        return cls._group[:math.factorial(n)]